@@ -0,0 +1,158 @@
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright (c) 2023 SciCat Project (https://github.com/SciCatProject/scitacean)
+"""Incremental decoding of large JSON documents."""
+
+from __future__ import annotations
+
+import codecs
+import json
+import re
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Tuple, TypeVar
+
+T = TypeVar("T")
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_NUMBER_CHARS = re.compile(r"[0-9.eE+-]*")
+
+
+class _Stream:
+    """Buffered reader of JSON tokens from chunks of UTF-8 encoded bytes.
+
+    Only the unconsumed part of the input is kept in memory.
+    """
+
+    def __init__(self, chunks: Iterable[bytes]) -> None:
+        self._chunks = iter(chunks)
+        self._utf8 = codecs.getincrementaldecoder("utf-8")()
+        self._decoder = json.JSONDecoder()
+        self._buffer = ""
+        self._pos = 0
+        self._eof = False
+
+    def _read_more(self) -> bool:
+        while not self._eof:
+            try:
+                chunk = next(self._chunks)
+            except StopIteration:
+                self._eof = True
+                text = self._utf8.decode(b"", final=True)
+            else:
+                text = self._utf8.decode(chunk)
+            if text:
+                self._buffer = self._buffer[self._pos :] + text
+                self._pos = 0
+                return True
+        return False
+
+    def peek(self) -> str:
+        """Return the next non-whitespace character or '' at the end of input."""
+        while True:
+            self._pos = _WHITESPACE.match(self._buffer, self._pos).end()  # type: ignore[union-attr]
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if not self._read_more():
+                return ""
+
+    def consume(self, *expected: str) -> str:
+        """Consume and return the next non-whitespace character.
+
+        It must be one of ``expected``.
+        """
+        char = self.peek()
+        if char not in expected or not char:
+            raise json.JSONDecodeError(
+                f"Expected one of {expected!r}", self._buffer, self._pos
+            )
+        self._pos += 1
+        return char
+
+    def value(self) -> Any:
+        """Decode and consume the next complete JSON value."""
+        self.peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError:
+                if not self._read_more():
+                    raise
+                continue
+            # A number that reaches the end of the buffer may continue in the
+            # next chunk, even if it only looks complete up to, e.g., '1.5e'.
+            if not self._may_continue(value, end) or not self._read_more():
+                self._pos = end
+                return value
+
+    def _may_continue(self, value: Any, end: int) -> bool:
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            return False
+        tail = _NUMBER_CHARS.match(self._buffer, end).end()  # type: ignore[union-attr]
+        return tail == len(self._buffer)
+
+
+def iter_objects_with_streamed_list(
+    chunks: Iterable[bytes],
+    *,
+    key: str,
+    convert: Callable[[Any, Dict[str, Any]], T],
+) -> Iterator[Tuple[Dict[str, Any], List[T]]]:
+    """Incrementally decode a JSON array of objects that contain long lists.
+
+    The input must encode an array of objects.
+    Items of the list stored under ``key`` in those objects are converted
+    one by one as they are decoded so that the decoded items are never
+    held in memory all at once.
+
+    Parameters
+    ----------
+    chunks:
+        UTF-8 encoded JSON document split into chunks of arbitrary sizes.
+    key:
+        Name of the list in each object to convert incrementally.
+    convert:
+        Called with each list item and the fields of the enclosing object
+        that have been decoded so far.
+
+    Yields
+    ------
+    :
+        For each object, all fields except ``key`` and the converted list items.
+        The list is empty if the object has no ``key``.
+    """
+    stream = _Stream(chunks)
+    if not stream.peek():
+        return
+    stream.consume("[")
+    if stream.peek() == "]":
+        stream.consume("]")
+        return
+    while True:
+        yield _decode_object(stream, key=key, convert=convert)
+        if stream.consume(",", "]") == "]":
+            return
+
+
+def _decode_object(
+    stream: _Stream, *, key: str, convert: Callable[[Any, Dict[str, Any]], T]
+) -> Tuple[Dict[str, Any], List[T]]:
+    fields: Dict[str, Any] = {}
+    items: List[T] = []
+    stream.consume("{")
+    if stream.peek() == "}":
+        stream.consume("}")
+        return fields, items
+    while True:
+        name = stream.value()
+        stream.consume(":")
+        if name == key and stream.peek() == "[":
+            stream.consume("[")
+            if stream.peek() == "]":
+                stream.consume("]")
+            else:
+                while True:
+                    items.append(convert(stream.value(), fields))
+                    if stream.consume(",", "]") == "]":
+                        break
+        else:
+            fields[name] = stream.value()
+        if stream.consume(",", "}") == "}":
+            return fields, items
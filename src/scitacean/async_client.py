@@ -0,0 +1,1065 @@
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright (c) 2023 SciCat Project (https://github.com/SciCatProject/scitacean)
+"""Asynchronous client to handle communication with SciCat servers.
+
+This module requires `httpx <https://www.python-httpx.org/>`_.
+Install it with ``pip install scitacean[async]``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import datetime
+import warnings
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+    TypeVar,
+    Union,
+)
+from urllib.parse import quote_plus
+
+import httpx
+
+from . import model
+from ._base_model import convert_download_to_user_model
+from .client import (
+    FileSelector,
+    _login_requests,
+    _make_orig_datablock,
+    _parse_login_response,
+    _raise_login_error,
+    _remove_up_to_date_local_files,
+    _select_files,
+    _strip_token,
+    _url_concat,
+)
+from .dataset import Dataset
+from .error import ScicatCommError
+from .logging import get_logger
+from .pid import PID
+from .transfer.util import _run_in_executor
+from .typing import AsyncDownloadConnection, AsyncFileTransfer, AsyncUploadConnection
+from .util.credentials import SecretStr, StrStorage
+
+T = TypeVar("T")
+
+
+class AsyncClient:
+    """Asynchronous SciCat client to communicate with a server.
+
+    This is the :mod:`asyncio` counterpart of :class:`scitacean.Client`.
+    All methods that communicate with SciCat or the file server are coroutines.
+    Many datasets can thus be processed concurrently without using threads,
+    e.g., with :func:`asyncio.gather`.
+
+    File transfers must implement :class:`scitacean.typing.AsyncFileTransfer`.
+    Use :class:`scitacean.transfer.util.ThreadedFileTransfer` to wrap a regular,
+    blocking file transfer.
+
+    Use :func:`AsyncClient.from_token` or :func:`AsyncClient.from_credentials`
+    to initialize a client instead of the constructor directly.
+
+    Examples
+    --------
+    .. code-block:: python
+
+        async with AsyncClient.from_token(url="...", token="...") as client:
+            datasets = await asyncio.gather(
+                *(client.get_dataset(pid) for pid in pids)
+            )
+    """
+
+    def __init__(
+        self,
+        *,
+        client: AsyncScicatClient,
+        file_transfer: Optional[AsyncFileTransfer],
+    ):
+        """Initialize a client.
+
+        Do not use directly, instead use :func:`AsyncClient.from_token`
+        or :func:`AsyncClient.from_credentials`!
+        The exception is wrapping a customized :class:`AsyncScicatClient`.
+        """
+        self._client = client
+        self._file_transfer = file_transfer
+
+    @classmethod
+    def from_token(
+        cls,
+        *,
+        url: str,
+        token: Union[str, StrStorage],
+        file_transfer: Optional[AsyncFileTransfer] = None,
+    ) -> AsyncClient:
+        """Create a new client and authenticate with a token.
+
+        Parameters
+        ----------
+        url:
+            URL of the SciCat api.
+        token:
+            User token to authenticate with SciCat.
+        file_transfer:
+            Handler for down-/uploads of files.
+
+        Returns
+        -------
+        :
+            A new client.
+        """
+        return AsyncClient(
+            client=AsyncScicatClient.from_token(url=url, token=token),
+            file_transfer=file_transfer,
+        )
+
+    @classmethod
+    async def from_credentials(
+        cls,
+        *,
+        url: str,
+        username: Union[str, StrStorage],
+        password: Union[str, StrStorage],
+        file_transfer: Optional[AsyncFileTransfer] = None,
+    ) -> AsyncClient:
+        """Create a new client and authenticate with username and password.
+
+        Parameters
+        ----------
+        url:
+            URL of the SciCat api.
+            It should include the suffix `api/vn` where `n` is a number.
+        username:
+            Name of the user.
+        password:
+            Password of the user.
+        file_transfer:
+            Handler for down-/uploads of files.
+
+        Returns
+        -------
+        :
+            A new client.
+        """
+        return AsyncClient(
+            client=await AsyncScicatClient.from_credentials(
+                url=url, username=username, password=password
+            ),
+            file_transfer=file_transfer,
+        )
+
+    @classmethod
+    def without_login(
+        cls, *, url: str, file_transfer: Optional[AsyncFileTransfer] = None
+    ) -> AsyncClient:
+        """Create a new client without authentication.
+
+        The client can only download public datasets and not upload at all.
+
+        Parameters
+        ----------
+        url:
+            URL of the SciCat api.
+            It should include the suffix `api/vn` where `n` is a number.
+        file_transfer:
+            Handler for down-/uploads of files.
+
+        Returns
+        -------
+        :
+            A new client.
+        """
+        return AsyncClient(
+            client=AsyncScicatClient.without_login(url=url),
+            file_transfer=file_transfer,
+        )
+
+    async def close(self) -> None:
+        """Close all network connections held by the client.
+
+        The client cannot be used to communicate with SciCat afterwards.
+        """
+        await self._client.close()
+
+    async def __aenter__(self) -> AsyncClient:
+        return self
+
+    async def __aexit__(self, *args: Any) -> None:
+        await self.close()
+
+    @property
+    def scicat(self) -> AsyncScicatClient:
+        """Low-level client for SciCat.
+
+        Should typically not be used by users of Scitacean!
+        """
+        return self._client
+
+    @property
+    def file_transfer(self) -> Optional[AsyncFileTransfer]:
+        """Stored handler for file down-/uploads."""
+        return self._file_transfer
+
+    async def get_dataset(
+        self,
+        pid: Union[str, PID],
+        strict_validation: bool = False,
+        attachments: bool = False,
+        *,
+        max_concurrency: int = 3,
+    ) -> Dataset:
+        """Download a dataset from SciCat.
+
+        Does not download any files.
+
+        The dataset, its orig datablocks, and its attachments are requested
+        concurrently from SciCat.
+
+        Parameters
+        ----------
+        pid:
+            ID of the dataset. Must include the prefix, i.e. have the form
+            ``prefix/dataset-id``.
+        strict_validation:
+            If ``True``, the dataset must pass validation.
+            If ``False``, a dataset is still returned if validation fails.
+            Note that some dataset fields may have a bad value or type.
+            A warning will be logged if validation fails.
+        attachments:
+            Select whether to download attachments.
+            If this is ``False``, the attachments of the returned dataset are ``None``.
+        max_concurrency:
+            Maximum number of requests to SciCat that run at the same time.
+            Use ``1`` to send the requests one after the other.
+
+        Returns
+        -------
+        :
+            A new dataset.
+        """
+        pid = PID.parse(pid)
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def get_orig_datablocks(
+            dataset_id: PID,
+        ) -> Optional[List[model.DownloadOrigDatablock]]:
+            try:
+                return await self.scicat.get_orig_datablocks(
+                    dataset_id, strict_validation=strict_validation
+                )
+            except ScicatCommError:
+                # See Client.get_dataset
+                return None
+
+        # Wait for all requests and raise errors in a fixed order
+        # to match the semantics of Client.get_dataset.
+        (
+            dataset_result,
+            orig_datablocks_result,
+            attachments_result,
+        ) = await asyncio.gather(
+            _bounded(
+                semaphore,
+                self.scicat.get_dataset_model(pid, strict_validation=strict_validation),
+            ),
+            _bounded(semaphore, get_orig_datablocks(pid)),
+            _bounded(semaphore, self.scicat.get_attachments_for_dataset(pid))
+            if attachments
+            else _none(),
+            return_exceptions=True,
+        )
+        dataset = _unwrap(dataset_result)
+        orig_datablocks = _unwrap(orig_datablocks_result)
+        attachment_models = _unwrap(attachments_result)
+
+        return Dataset.from_download_models(
+            dataset_model=dataset,
+            orig_datablock_models=orig_datablocks or [],
+            attachment_models=attachment_models,
+        )
+
+    async def upload_new_dataset_now(
+        self, dataset: Dataset, *, max_concurrency: int = 3
+    ) -> Dataset:
+        """Upload a dataset as a new entry to SciCat immediately.
+
+        See :meth:`scitacean.Client.upload_new_dataset_now`
+        for the details of the procedure.
+
+        Parameters
+        ----------
+        dataset:
+            The dataset to upload.
+        max_concurrency:
+            Maximum number of orig datablocks or attachments that are created
+            in SciCat at the same time.
+
+        Returns
+        -------
+        :
+            A copy of the input dataset with fields adjusted
+            according to the response of the server.
+
+        Raises
+        ------
+        scitacean.ScicatCommError
+            If the upload to SciCat fails.
+        RuntimeError
+            If the file upload fails or if a critical error is encountered
+            and some files or a partial dataset are left on the servers.
+            Note the error message if that happens.
+        """
+        dataset, finalized_model = await self._upload_files_and_dataset(dataset)
+        return await self._upload_dataset_metadata(
+            dataset, finalized_model, max_concurrency=max_concurrency
+        )
+
+    async def upload_new_datasets(
+        self,
+        datasets: Iterable[Dataset],
+        *,
+        max_file_uploads: int = 2,
+        max_concurrency: int = 3,
+    ) -> List[Union[Dataset, Exception]]:
+        """Upload many datasets as new entries to SciCat.
+
+        See :meth:`scitacean.Client.upload_new_datasets`
+        for the details of the procedure.
+
+        Parameters
+        ----------
+        datasets:
+            The datasets to upload.
+        max_file_uploads:
+            Maximum number of datasets whose files are uploaded at the same time.
+        max_concurrency:
+            Maximum number of datasets whose orig datablocks and attachments
+            are created at the same time.
+
+        Returns
+        -------
+        :
+            For each input dataset in the same order, either a copy of the
+            dataset with fields adjusted according to the response of the server
+            or the exception that made the upload fail.
+        """
+        file_semaphore = asyncio.Semaphore(max_file_uploads)
+        metadata_semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def upload(dataset: Dataset) -> Dataset:
+            async with file_semaphore:
+                uploaded, finalized_model = await self._upload_files_and_dataset(
+                    dataset
+                )
+            async with metadata_semaphore:
+                return await self._upload_dataset_metadata(
+                    uploaded, finalized_model, max_concurrency=1
+                )
+
+        results = await asyncio.gather(
+            *(upload(dataset) for dataset in datasets), return_exceptions=True
+        )
+        return [_as_exception(result) for result in results]
+
+    async def _upload_files_and_dataset(
+        self, dataset: Dataset
+    ) -> Tuple[Dataset, model.DownloadDataset]:
+        dataset = dataset.replace(
+            source_folder=self._expect_file_transfer().source_folder_for(dataset)
+        )
+        dataset.validate()
+        async with self._connect_for_file_upload(dataset) as con:
+            uploaded_files = await con.upload_files(*dataset.files)
+            dataset = dataset.replace_files(*uploaded_files)
+            try:
+                finalized_model = await self.scicat.create_dataset_model(
+                    dataset.make_upload_model()
+                )
+            except ScicatCommError:
+                await con.revert_upload(*uploaded_files)
+                raise
+        return dataset, finalized_model
+
+    async def _upload_dataset_metadata(
+        self,
+        dataset: Dataset,
+        finalized_model: model.DownloadDataset,
+        *,
+        max_concurrency: int,
+    ) -> Dataset:
+        with_new_pid = dataset.replace(_read_only={"pid": finalized_model.pid})
+        finalized_orig_datablocks = await self._upload_orig_datablocks(
+            with_new_pid.make_datablock_upload_models().orig_datablocks,
+            max_concurrency=max_concurrency,
+        )
+        finalized_attachments = await self._upload_attachments_for_dataset(
+            with_new_pid.make_attachment_upload_models(),
+            dataset_id=with_new_pid.pid,  # type: ignore[arg-type]
+            max_concurrency=max_concurrency,
+        )
+
+        return Dataset.from_download_models(
+            dataset_model=finalized_model,
+            orig_datablock_models=finalized_orig_datablocks,
+            attachment_models=finalized_attachments,
+        )
+
+    async def _upload_orig_datablocks(
+        self,
+        orig_datablocks: Optional[List[model.UploadOrigDatablock]],
+        *,
+        max_concurrency: int,
+    ) -> List[model.DownloadOrigDatablock]:
+        if not orig_datablocks:
+            return []
+
+        try:
+            return await _create_all(
+                [
+                    self.scicat.create_orig_datablock(orig_datablock)
+                    for orig_datablock in orig_datablocks
+                ],
+                max_concurrency=max_concurrency,
+            )
+        except ScicatCommError as exc:
+            raise RuntimeError(
+                "Failed to upload original datablocks for SciCat dataset "
+                f"{orig_datablocks[0].datasetId}:"
+                f"\n{exc.args}\nThe dataset and data files were successfully uploaded "
+                "but are not linked with each other. Please fix the dataset manually!"
+            ) from exc
+
+    async def _upload_attachments_for_dataset(
+        self,
+        attachments: List[model.UploadAttachment],
+        *,
+        dataset_id: PID,
+        max_concurrency: int,
+    ) -> List[model.DownloadAttachment]:
+        try:
+            return await _create_all(
+                [
+                    self.scicat.create_attachment_for_dataset(
+                        attachment, dataset_id=dataset_id
+                    )
+                    for attachment in attachments
+                ],
+                max_concurrency=max_concurrency,
+            )
+        except ScicatCommError as exc:
+            raise RuntimeError(
+                f"Failed to upload attachments for SciCat dataset {dataset_id}:"
+                f"\n{exc.args}\nThe dataset and data files were successfully uploaded "
+                "and will not be reverted. Please upload the attachments manually!"
+            ) from exc
+
+    @asynccontextmanager
+    async def _connect_for_file_upload(
+        self, dataset: Dataset
+    ) -> AsyncIterator[AsyncUploadConnection]:
+        async with self._expect_file_transfer().connect_for_upload(dataset) as con:
+            yield con
+
+    def _expect_file_transfer(self) -> AsyncFileTransfer:
+        if self.file_transfer is None:
+            raise ValueError(
+                "Cannot upload/download files because no file transfer is set. "
+                "Specify one when constructing a client."
+            )
+        return self.file_transfer
+
+    async def download_files(
+        self,
+        dataset: Dataset,
+        *,
+        target: Union[str, Path],
+        select: FileSelector = True,
+        checksum_algorithm: Optional[str] = None,
+        force: bool = False,
+    ) -> Dataset:
+        """Download files of a dataset.
+
+        See :meth:`scitacean.Client.download_files` for details.
+        Checksums of local files are computed in a worker thread.
+
+        Parameters
+        ----------
+        dataset:
+            Download files of this dataset.
+        target:
+            Files are stored to this path on the local filesystem.
+        select:
+            Select which files to download.
+        checksum_algorithm:
+            Select an algorithm for computing file checksums.
+        force:
+            If ``True``, download files regardless of whether they already exist
+            locally.
+
+        Returns
+        -------
+        :
+            A copy of the input dataset with files replaced to reflect the downloads.
+        """
+        if dataset.source_folder is None:
+            raise ValueError("Dataset has no source folder, cannot download files.")
+        target = Path(target)
+        target.mkdir(parents=True, exist_ok=True)
+        files = _select_files(select, dataset)
+        downloaded_files = [
+            f.downloaded(local_path=target / f.remote_path.to_local()) for f in files
+        ]
+        if not force:
+            to_download = await _run_in_executor(
+                None,
+                _remove_up_to_date_local_files,
+                downloaded_files,
+                checksum_algorithm=checksum_algorithm,
+            )
+        else:
+            to_download = downloaded_files
+
+        if not to_download:
+            return dataset.replace_files(*downloaded_files)
+
+        async with self._connect_for_file_download() as con:
+            await con.download_files(
+                remote=[
+                    p
+                    for f in to_download
+                    if (p := f.remote_access_path(dataset.source_folder)) is not None
+                ],
+                local=[f.local_path for f in to_download],  # type: ignore[misc]
+            )
+        for f in to_download:
+            await _run_in_executor(None, f.validate_after_download)
+        return dataset.replace_files(*downloaded_files)
+
+    @asynccontextmanager
+    async def _connect_for_file_download(
+        self,
+    ) -> AsyncIterator[AsyncDownloadConnection]:
+        if self.file_transfer is None:
+            raise ValueError(
+                "Cannot download files because no file transfer is set. "
+                "Specify one when constructing a client."
+            )
+        async with self.file_transfer.connect_for_download() as con:
+            yield con
+
+    async def download_attachments_for(self, target: Dataset) -> Dataset:
+        """Download all attachments for a given object.
+
+        See :meth:`scitacean.Client.download_attachments_for`.
+
+        Parameters
+        ----------
+        target:
+            Download attachments for this object.
+
+        Returns
+        -------
+        :
+            A copy of the input dataset with attachments replaced
+            with the downloaded models.
+        """
+        if target.pid is None:
+            raise ValueError(
+                "Cannot download attachments because the dataset has no PID."
+            )
+        if target.attachments is not None:
+            warnings.warn(
+                "Downloading attachments for a dataset that already has "
+                "attachments. The existing attachments will be overwritten.",
+                stacklevel=2,
+            )
+        return target.replace(
+            attachments=convert_download_to_user_model(
+                await self.scicat.get_attachments_for_dataset(target.pid)
+            )
+        )
+
+
+class AsyncScicatClient:
+    """Asynchronous low-level client to call the SciCat API.
+
+    This is the :mod:`asyncio` counterpart of :class:`scitacean.client.ScicatClient`.
+    The client owns a :class:`httpx.AsyncClient` which keeps a pool of
+    connections to the server alive.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        token: Optional[Union[str, StrStorage]],
+        timeout: Optional[datetime.timedelta],
+        *,
+        pool_size: int = 10,
+    ):
+        self._base_url = url[:-1] if url.endswith("/") else url
+        self._timeout = datetime.timedelta(seconds=10) if timeout is None else timeout
+        self._token: Optional[StrStorage] = (
+            SecretStr(token) if isinstance(token, str) else token
+        )
+        self._http = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=pool_size, max_keepalive_connections=pool_size
+            ),
+            timeout=self._timeout.total_seconds(),
+            verify=True,
+        )
+
+    @classmethod
+    def from_token(
+        cls,
+        url: str,
+        token: Union[str, StrStorage],
+        timeout: Optional[datetime.timedelta] = None,
+        *,
+        pool_size: int = 10,
+    ) -> AsyncScicatClient:
+        """Create a new low-level client and authenticate with a token.
+
+        Parameters
+        ----------
+        url:
+            URL of the SciCat api.
+        token:
+            User token to authenticate with SciCat.
+        timeout:
+            Timeout for all API requests.
+        pool_size:
+            Maximum number of concurrent connections to the server.
+
+        Returns
+        -------
+        :
+            A new low-level client.
+        """
+        return AsyncScicatClient(
+            url=url, token=token, timeout=timeout, pool_size=pool_size
+        )
+
+    @classmethod
+    async def from_credentials(
+        cls,
+        url: str,
+        username: Union[str, StrStorage],
+        password: Union[str, StrStorage],
+        timeout: Optional[datetime.timedelta] = None,
+        *,
+        pool_size: int = 10,
+    ) -> AsyncScicatClient:
+        """Create a new low-level client and authenticate with username and password.
+
+        Parameters
+        ----------
+        url:
+            URL of the SciCat api.
+            It should include the suffix `api/vn` where `n` is a number.
+        username:
+            Name of the user.
+        password:
+            Password of the user.
+        timeout:
+            Timeout for all API requests.
+        pool_size:
+            Maximum number of concurrent connections to the server.
+
+        Returns
+        -------
+        :
+            A new low-level client.
+        """
+        if not isinstance(username, StrStorage):
+            username = SecretStr(username)
+        if not isinstance(password, StrStorage):
+            password = SecretStr(password)
+        client = AsyncScicatClient(
+            url=url, token=None, timeout=timeout, pool_size=pool_size
+        )
+        try:
+            client._token = SecretStr(
+                await _get_token(
+                    url=url, username=username, password=password, http=client._http
+                )
+            )
+        except BaseException:
+            await client.close()
+            raise
+        return client
+
+    @classmethod
+    def without_login(
+        cls,
+        url: str,
+        timeout: Optional[datetime.timedelta] = None,
+        *,
+        pool_size: int = 10,
+    ) -> AsyncScicatClient:
+        """Create a new low-level client without authentication.
+
+        The client can only download public datasets and not upload at all.
+
+        Parameters
+        ----------
+        url:
+            URL of the SciCat api.
+            It should include the suffix `api/vn` where `n` is a number.
+        timeout:
+            Timeout for all API requests.
+        pool_size:
+            Maximum number of concurrent connections to the server.
+
+        Returns
+        -------
+        :
+            A new low-level client.
+        """
+        return AsyncScicatClient(
+            url=url, token=None, timeout=timeout, pool_size=pool_size
+        )
+
+    async def close(self) -> None:
+        """Close all connections in the pool.
+
+        The client cannot be used to communicate with SciCat afterwards.
+        """
+        await self._http.aclose()
+
+    async def __aenter__(self) -> AsyncScicatClient:
+        return self
+
+    async def __aexit__(self, *args: Any) -> None:
+        await self.close()
+
+    async def get_dataset_model(
+        self, pid: PID, strict_validation: bool = False
+    ) -> model.DownloadDataset:
+        """Fetch a dataset from SciCat.
+
+        Parameters
+        ----------
+        pid:
+            Unique ID of the dataset.
+            Must include the facility ID.
+        strict_validation:
+            If ``True``, the dataset must pass validation.
+            If ``False``, a dataset is still returned if validation fails.
+
+        Returns
+        -------
+        :
+            A model of the dataset.
+
+        Raises
+        ------
+        scitacean.ScicatCommError
+            If the dataset does not exist or communication fails for some other reason.
+        """
+        dset_json = await self._call_endpoint(
+            cmd="get",
+            url=f"datasets/{quote_plus(str(pid))}",
+            operation="get_dataset_model",
+        )
+        if not dset_json:
+            raise ScicatCommError(
+                f"Cannot get dataset with {pid=}, "
+                f"no such dataset in SciCat at {self._base_url}."
+            )
+        return model.construct(
+            model.DownloadDataset,
+            _strict_validation=strict_validation,
+            **dset_json,
+        )
+
+    async def get_orig_datablocks(
+        self, pid: PID, strict_validation: bool = False
+    ) -> List[model.DownloadOrigDatablock]:
+        """Fetch all orig datablocks from SciCat for a given dataset.
+
+        Parameters
+        ----------
+        pid:
+            Unique ID of the *dataset*.
+            Must include the facility ID.
+        strict_validation:
+            If ``True``, the datablocks must pass validation.
+            If ``False``, datablocks are still returned if validation fails.
+
+        Returns
+        -------
+        :
+            Models of the orig datablocks.
+
+        Raises
+        ------
+        scitacean.ScicatCommError
+            If communication fails.
+        """
+        dblock_json = await self._call_endpoint(
+            cmd="get",
+            url=f"datasets/{quote_plus(str(pid))}/origdatablocks",
+            operation="get_orig_datablocks",
+        )
+        return [
+            _make_orig_datablock(dblock, strict_validation=strict_validation)
+            for dblock in dblock_json
+        ]
+
+    async def get_attachments_for_dataset(
+        self, pid: PID, strict_validation: bool = False
+    ) -> List[model.DownloadAttachment]:
+        """Fetch all attachments from SciCat for a given dataset.
+
+        Parameters
+        ----------
+        pid:
+            Unique ID of the *dataset*.
+            Must include the facility ID.
+        strict_validation:
+            If ``True``, the attachments must pass validation.
+            If ``False``, attachments are still returned if validation fails.
+
+        Returns
+        -------
+        :
+            Models of the attachments.
+
+        Raises
+        ------
+        scitacean.ScicatCommError
+            If communication fails.
+        """
+        attachment_json = await self._call_endpoint(
+            cmd="get",
+            url=f"datasets/{quote_plus(str(pid))}/attachments",
+            operation="get_attachments_for_dataset",
+        )
+        return [
+            model.construct(
+                model.DownloadAttachment,
+                _strict_validation=strict_validation,
+                **attachment,
+            )
+            for attachment in attachment_json
+        ]
+
+    async def create_dataset_model(
+        self, dset: Union[model.UploadDerivedDataset, model.UploadRawDataset]
+    ) -> model.DownloadDataset:
+        """Create a new dataset in SciCat.
+
+        See :meth:`scitacean.client.ScicatClient.create_dataset_model`.
+
+        Parameters
+        ----------
+        dset:
+            Model of the dataset to create.
+
+        Returns
+        -------
+        :
+            The uploaded dataset as returned by SciCat.
+
+        Raises
+        ------
+        scitacean.ScicatCommError
+            If SciCat refuses the dataset or communication
+            fails for some other reason.
+        """
+        uploaded = await self._call_endpoint(
+            cmd="post", url="datasets", data=dset, operation="create_dataset_model"
+        )
+        return model.construct(
+            model.DownloadDataset, _strict_validation=False, **uploaded
+        )
+
+    async def create_orig_datablock(
+        self, dblock: model.UploadOrigDatablock
+    ) -> model.DownloadOrigDatablock:
+        """Create a new orig datablock in SciCat.
+
+        See :meth:`scitacean.client.ScicatClient.create_orig_datablock`.
+
+        Parameters
+        ----------
+        dblock:
+            Model of the orig datablock to create.
+
+        Raises
+        ------
+        scitacean.ScicatCommError
+            If SciCat refuses the datablock or communication
+            fails for some other reason.
+        """
+        uploaded = await self._call_endpoint(
+            cmd="post",
+            url="origdatablocks",
+            data=dblock,
+            operation="create_orig_datablock",
+        )
+        return model.construct(
+            model.DownloadOrigDatablock, _strict_validation=False, **uploaded
+        )
+
+    async def create_attachment_for_dataset(
+        self,
+        attachment: model.UploadAttachment,
+        *,
+        dataset_id: PID,
+    ) -> model.DownloadAttachment:
+        """Create a new attachment for a dataset in SciCat.
+
+        See :meth:`scitacean.client.ScicatClient.create_attachment_for_dataset`.
+
+        Parameters
+        ----------
+        attachment:
+            Model of the attachment to create.
+        dataset_id:
+            ID of the dataset to which the attachment belongs.
+
+        Raises
+        ------
+        scitacean.ScicatCommError
+            If SciCat refuses the attachment or communication
+            fails for some other reason.
+        """
+        uploaded = await self._call_endpoint(
+            cmd="post",
+            url=f"datasets/{quote_plus(str(dataset_id))}/attachments",
+            data=attachment,
+            operation="create_attachment",
+        )
+        if not uploaded:
+            raise ScicatCommError(
+                f"Failed to upload attachment for dataset with pid={dataset_id}. "
+                "The server reported success but did not return a finalized attachment."
+                " This likely means that there is no dataset with this ID."
+            )
+        return model.construct(
+            model.DownloadAttachment, _strict_validation=False, **uploaded
+        )
+
+    async def _send_to_scicat(
+        self, *, cmd: str, url: str, data: Optional[model.BaseModel] = None
+    ) -> httpx.Response:
+        if self._token is not None:
+            token = self._token.get_str()
+            params = {"access_token": token}
+            headers = {"Authorization": f"Bearer {token}"}
+        else:
+            token = ""
+            params = {}
+            headers = {}
+
+        if data is not None:
+            headers["Content-Type"] = "application/json"
+
+        try:
+            return await self._http.request(
+                method=cmd,
+                url=url,
+                content=data.model_dump_json(exclude_none=True)
+                if data is not None
+                else None,
+                params=params,
+                headers=headers,
+            )
+        except Exception as exc:
+            # See ScicatClient._send_to_scicat
+            raise type(exc)(
+                tuple(_strip_token(arg, token) for arg in exc.args)
+            ) from None
+
+    async def _call_endpoint(
+        self,
+        *,
+        cmd: str,
+        url: str,
+        data: Optional[model.BaseModel] = None,
+        operation: str,
+    ) -> Any:
+        full_url = _url_concat(self._base_url, url)
+        logger = get_logger()
+        logger.info("Calling SciCat API at %s for operation '%s'", full_url, operation)
+
+        response = await self._send_to_scicat(cmd=cmd, url=full_url, data=data)
+        if not response.is_success:
+            logger.error(
+                "SciCat API call to %s failed: %s %s: %s",
+                full_url,
+                response.status_code,
+                response.reason_phrase,
+                response.text,
+            )
+            raise ScicatCommError(
+                f"Error in operation '{operation}': {response.status_code} "
+                f"{response.reason_phrase}: {response.text}"
+            )
+        logger.info("API call successful for operation '%s'", operation)
+
+        return None if not response.text else response.json()
+
+
+async def _bounded(semaphore: asyncio.Semaphore, aw: Awaitable[T]) -> T:
+    async with semaphore:
+        return await aw
+
+
+async def _create_all(
+    creations: List[Awaitable[T]], *, max_concurrency: int
+) -> List[T]:
+    # Await all creations concurrently and return the results in order.
+    # All creations run to completion even if some fail.
+    # The error of the first failed creation is raised.
+    semaphore = asyncio.Semaphore(max_concurrency)
+    results = await asyncio.gather(
+        *(_bounded(semaphore, creation) for creation in creations),
+        return_exceptions=True,
+    )
+    return [_unwrap(result) for result in results]
+
+
+async def _none() -> None:
+    return None
+
+
+def _unwrap(result: Union[T, BaseException]) -> T:
+    if isinstance(result, BaseException):
+        raise result
+    return result
+
+
+def _as_exception(result: Union[T, BaseException]) -> Union[T, Exception]:
+    # Return exceptions as results but propagate, e.g., cancellation.
+    if isinstance(result, BaseException) and not isinstance(result, Exception):
+        raise result
+    return result
+
+
+async def _get_token(
+    url: str, username: StrStorage, password: StrStorage, http: httpx.AsyncClient
+) -> str:
+    """Log in using the provided username + password.
+
+    Returns a token for the given user.
+    """
+    for endpoint, endpoint_url, payload in _login_requests(url, username, password):
+        response = await http.post(endpoint_url, json=payload)
+        result = _parse_login_response(
+            endpoint, ok=response.is_success, content=response.json()
+        )
+        if result is not None:
+            return result[0]
+
+    _raise_login_error(response.json(), response.content)
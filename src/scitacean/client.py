@@ -6,24 +6,75 @@ from __future__ import annotations
 
 import dataclasses
 import datetime
+import functools
+import gzip
+import hashlib
+import json
+import logging
 import re
+import time
 import warnings
+from concurrent.futures import Future, ThreadPoolExecutor
 from contextlib import contextmanager
+from copy import deepcopy
 from pathlib import Path
-from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Union
-from urllib.parse import quote_plus
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    NoReturn,
+    Optional,
+    Set,
+    Tuple,
+    TypeVar,
+    Union,
+)
+from urllib.parse import quote_plus, urlencode
 
 import requests
 
 from . import model
 from ._base_model import convert_download_to_user_model
+from ._internal.json_stream import iter_objects_with_streamed_list
+from .datablock import OrigDatablock
 from .dataset import Dataset
 from .error import ScicatCommError, ScicatLoginError
 from .file import File
 from .logging import get_logger
 from .pid import PID
 from .typing import DownloadConnection, FileTransfer, UploadConnection
-from .util.credentials import SecretStr, StrStorage
+from .util.cache import MetadataCache, _CacheEntry
+from .util.credentials import RenewingStr, SecretStr, StrStorage
+from .util.instrumentation import (
+    CallStats,
+    Hook,
+    OperationStats,
+    RequestEvent,
+    _emit,
+    _record_transfer,
+)
+from .util.json_codec import JsonCodec, default_json_codec
+from .util.mirror import MetadataMirror, _filter_key, _format_time
+from .util.retry import (
+    CircuitBreaker,
+    RetryPolicy,
+    _is_server_failure,
+    _parse_retry_after,
+)
+from .util.token_cache import TokenCache
+
+T = TypeVar("T")
+U = TypeVar("U")
+
+# Number of bytes to read at once from streamed responses.
+_STREAM_CHUNK_SIZE = 64 * 1024
+# Trades compression ratio for speed, higher levels barely shrink JSON further.
+_GZIP_LEVEL = 6
+# Number of results requested at once when fetching models of many datasets.
+_INQ_PAGE_SIZE = 1000
 
 
 class Client:
@@ -50,10 +101,29 @@ class Client:
 
         Do not use directly, instead use :func:`Client.from_token`
         or :func:`Client.from_credentials`!
+        The exception is wrapping a customized :class:`ScicatClient`,
+        e.g., one with a non-default connection pool size.
         """
         self._client = client
         self._file_transfer = file_transfer
 
+    def close(self) -> None:
+        """Close all network connections held by the client.
+
+        This includes connections pooled by the file transfer if it has a
+        ``close`` method, e.g., :class:`scitacean.transfer.sftp.SFTPFileTransfer`.
+        The client cannot be used to communicate with SciCat afterwards.
+        """
+        self._client.close()
+        if (close := getattr(self._file_transfer, "close", None)) is not None:
+            close()
+
+    def __enter__(self) -> Client:
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
     @classmethod
     def from_token(
         cls,
@@ -92,6 +162,8 @@ class Client:
         username: Union[str, StrStorage],
         password: Union[str, StrStorage],
         file_transfer: Optional[FileTransfer] = None,
+        renew_token: bool = False,
+        token_cache: Optional[TokenCache] = None,
     ) -> Client:
         """Create a new client and authenticate with username and password.
 
@@ -106,6 +178,14 @@ class Client:
             Password of the user.
         file_transfer:
             Handler for down-/uploads of files.
+        renew_token:
+            If ``True``, log in again shortly before the token expires.
+            Use this for long-running programs.
+            See :meth:`ScicatClient.from_credentials`.
+        token_cache:
+            If given, share login tokens with other processes through this cache.
+            Use this for many short-lived programs.
+            See :class:`scitacean.util.token_cache.TokenCache`.
 
         Returns
         -------
@@ -114,7 +194,11 @@ class Client:
         """
         return Client(
             client=ScicatClient.from_credentials(
-                url=url, username=username, password=password
+                url=url,
+                username=username,
+                password=password,
+                renew_token=renew_token,
+                token_cache=token_cache,
             ),
             file_transfer=file_transfer,
         )
@@ -157,16 +241,51 @@ class Client:
         """Stored handler for file down-/uploads."""
         return self._file_transfer
 
+    def stats(self) -> Dict[str, OperationStats]:
+        """Return statistics of all calls to SciCat and the file server.
+
+        Includes requests to SciCat and file transfers.
+        Register hooks with :class:`ScicatClient` to receive individual events.
+
+        Returns
+        -------
+        :
+            Statistics for every operation, keyed by operation name.
+
+        Examples
+        --------
+        Print the median latency of every operation:
+
+        .. code-block:: python
+
+            for operation, stats in client.stats().items():
+                print(f"{operation}: {stats.count} calls, p50={stats.p50:.3f}s")
+        """
+        return self.scicat.stats()
+
     def get_dataset(
         self,
         pid: Union[str, PID],
         strict_validation: bool = False,
         attachments: bool = False,
+        *,
+        max_concurrency: int = 3,
+        lazy_files: bool = False,
+        fields: Optional[Iterable[str]] = None,
     ) -> Dataset:
         """Download a dataset from SciCat.
 
         Does not download any files.
 
+        The dataset, its orig datablocks, and its attachments are requested
+        concurrently from SciCat.
+        With ``lazy_files=True``, the orig datablocks, i.e., the list of files,
+        are only requested when the files of the dataset are first accessed,
+        e.g., through :attr:`Dataset.files`, :attr:`Dataset.size`,
+        or :attr:`Dataset.number_of_files`.
+        This requires the client to remain open until then.
+        Use :meth:`Client.load_files` to load the files of many datasets at once.
+
         Parameters
         ----------
         pid:
@@ -181,6 +300,18 @@ class Client:
             Select whether to download attachments.
             If this is ``False``, the attachments of the returned dataset are ``None``.
             They can be downloaded later using :meth:`Client.download_attachments_for`.
+        max_concurrency:
+            Maximum number of requests to SciCat that run at the same time.
+            Use ``1`` to send the requests one after the other.
+        lazy_files:
+            If ``True``, request the orig datablocks only when they are needed.
+        fields:
+            If given, only download these dataset fields.
+            Uses SciCat's field names, e.g., ``["datasetName", "owner"]``.
+            ``pid`` and ``type`` are always downloaded.
+            All other fields are ``None`` in the returned dataset
+            and listed in :attr:`Dataset.unfetched_fields`.
+            This avoids downloading large fields like ``scientificMetadata``.
 
         Returns
         -------
@@ -188,31 +319,449 @@ class Client:
             A new dataset.
         """
         pid = PID.parse(pid)
-        dataset = self.scicat.get_dataset_model(
-            pid, strict_validation=strict_validation
+        fields = _fields_to_fetch(fields)
+        load_orig_datablocks = functools.partial(
+            self._load_orig_datablocks, pid, strict_validation=strict_validation
+        )
+        with ThreadPoolExecutor(max_workers=max_concurrency) as executor:
+            dataset_future = executor.submit(
+                self.scicat.get_dataset_model,
+                pid,
+                strict_validation=strict_validation,
+                fields=fields,
+            )
+            orig_datablocks_future = (
+                executor.submit(load_orig_datablocks) if not lazy_files else None
+            )
+            attachments_future = (
+                executor.submit(self.scicat.get_attachments_for_dataset, pid)
+                if attachments
+                else None
+            )
+
+            dataset = dataset_future.result()
+            orig_datablocks = (
+                orig_datablocks_future.result()
+                if orig_datablocks_future is not None
+                else []
+            )
+            attachment_models = (
+                attachments_future.result() if attachments_future is not None else None
+            )
+
+        dset = Dataset.from_download_models(
+            dataset_model=dataset,
+            orig_datablock_models=orig_datablocks,
+            attachment_models=attachment_models,
+            fetched_fields=fields,
         )
+        if lazy_files:
+            dset._orig_datablock_loader = load_orig_datablocks
+        return dset
 
+    def _load_orig_datablocks(
+        self, pid: PID, *, strict_validation: bool
+    ) -> List[OrigDatablock]:
         try:
-            orig_datablocks = self.scicat.get_orig_datablocks(
-                pid, strict_validation=strict_validation
+            return list(
+                self.scicat.iter_orig_datablocks(
+                    pid, strict_validation=strict_validation
+                )
             )
         except ScicatCommError:
             # TODO more precise error handling. We only want to set to None if
             #   communication succeeded and the dataset exists but there simply
             #   are no datablocks.
-            orig_datablocks = None
+            return []
 
-        attachment_models = (
-            self.scicat.get_attachments_for_dataset(pid) if attachments else None
-        )
+    def load_files(
+        self,
+        *datasets: Dataset,
+        strict_validation: bool = False,
+        batch_size: int = 100,
+        max_concurrency: int = 3,
+    ) -> None:
+        """Load the files of lazily downloaded datasets.
 
-        return Dataset.from_download_models(
-            dataset_model=dataset,
-            orig_datablock_models=orig_datablocks or [],
-            attachment_models=attachment_models,
-        )
+        Requests the orig datablocks of all given datasets in batches of up to
+        ``batch_size`` datasets per request
+        instead of one request per dataset when accessing the files.
+        The datasets are modified in place.
+        Datasets whose files are already loaded are skipped.
+
+        See :meth:`Client.get_dataset` for how to download datasets lazily.
+
+        Parameters
+        ----------
+        datasets:
+            Datasets to load the files for.
+        strict_validation:
+            If ``True``, the orig datablocks must pass validation.
+            If ``False``, datablocks are still loaded if validation fails.
+            Note that some fields may have a bad value or type.
+            A warning will be logged if validation fails.
+        batch_size:
+            Maximum number of datasets per request.
+        max_concurrency:
+            Maximum number of requests to SciCat that run at the same time.
+
+        Raises
+        ------
+        scitacean.ScicatCommError
+            If a request fails.
+            All other batches are still loaded.
+        """
+        # Keyed by id because comparing datasets would load their files.
+        pending: Dict[PID, Dict[int, Dataset]] = {}
+        for dset in datasets:
+            if not dset.files_are_loaded and dset.pid is not None:
+                pending.setdefault(dset.pid, {})[id(dset)] = dset
+        pids = list(pending)
+        batches = [pids[i : i + batch_size] for i in range(0, len(pids), batch_size)]
+
+        def load_batch(batch: List[PID]) -> None:
+            orig_datablocks: Dict[PID, List[model.DownloadOrigDatablock]] = {
+                pid: [] for pid in batch
+            }
+            for dblock in self.scicat.get_orig_datablocks_for_datasets(
+                batch, strict_validation=strict_validation
+            ):
+                orig_datablocks.get(dblock.datasetId, []).append(  # type: ignore[arg-type]
+                    dblock
+                )
+            for pid, dblocks in orig_datablocks.items():
+                for dset in pending[pid].values():
+                    dset._set_loaded_orig_datablocks(
+                        OrigDatablock.from_download_model(dblock) for dblock in dblocks
+                    )
+
+        _create_all(load_batch, batches, max_concurrency=max_concurrency)
+
+    def get_datasets(
+        self,
+        pids: Iterable[Union[str, PID]],
+        strict_validation: bool = False,
+        attachments: bool = False,
+        *,
+        batch_size: int = 100,
+        max_concurrency: int = 3,
+        fields: Optional[Iterable[str]] = None,
+    ) -> List[Union[Dataset, Exception]]:
+        """Download multiple datasets from SciCat.
+
+        Does not download any files.
+
+        This is equivalent to calling :meth:`Client.get_dataset` for every ID
+        but requires far fewer requests.
+        The datasets are requested in batches of up to ``batch_size``
+        with one request per batch for datasets, orig datablocks, and attachments
+        each.
+
+        Failures are reported per dataset instead of aborting the whole download.
+        If a dataset does not exist or cannot be accessed, the corresponding
+        element of the result is a :class:`scitacean.ScicatCommError`.
+        If a request fails, the exception is reported for all datasets
+        in the affected batch.
 
-    def upload_new_dataset_now(self, dataset: Dataset) -> Dataset:
+        Parameters
+        ----------
+        pids:
+            IDs of the datasets. Must include the prefix, i.e. have the form
+            ``prefix/dataset-id``.
+        strict_validation:
+            If ``True``, the datasets must pass validation.
+            If ``False``, a dataset is still returned if validation fails.
+            Note that some dataset fields may have a bad value or type.
+            A warning will be logged if validation fails.
+            With strict validation, an invalid dataset causes a failure for
+            all datasets in its batch.
+        attachments:
+            Select whether to download attachments.
+            If this is ``False``, the attachments of the returned datasets are ``None``.
+            They can be downloaded later using :meth:`Client.download_attachments_for`.
+        batch_size:
+            Maximum number of datasets per request.
+        max_concurrency:
+            Maximum number of requests to SciCat that run at the same time.
+        fields:
+            If given, only download these dataset fields.
+            See :meth:`Client.get_dataset`.
+
+        Returns
+        -------
+        :
+            New datasets or exceptions in the same order as ``pids``.
+        """
+        fields = _fields_to_fetch(fields)
+        parsed_pids = [PID.parse(pid) for pid in pids]
+        unique_pids = list(dict.fromkeys(parsed_pids))
+        batches = [
+            unique_pids[i : i + batch_size]
+            for i in range(0, len(unique_pids), batch_size)
+        ]
+
+        with ThreadPoolExecutor(max_workers=max_concurrency) as executor:
+            futures = [
+                (
+                    batch,
+                    executor.submit(
+                        self.scicat.get_dataset_models,
+                        batch,
+                        strict_validation=strict_validation,
+                        fields=fields,
+                    ),
+                    executor.submit(
+                        self.scicat.get_orig_datablocks_for_datasets,
+                        batch,
+                        strict_validation=strict_validation,
+                    ),
+                    executor.submit(self.scicat.get_attachments_for_datasets, batch)
+                    if attachments
+                    else None,
+                )
+                for batch in batches
+            ]
+
+            models: Dict[PID, Union[_DatasetModels, Exception]] = {}
+            for batch, dset_future, dblock_future, attachment_future in futures:
+                try:
+                    batch_models = _group_dataset_models(
+                        dataset_models=dset_future.result(),
+                        orig_datablock_models=dblock_future.result(),
+                        attachment_models=attachment_future.result()
+                        if attachment_future is not None
+                        else None,
+                    )
+                except Exception as exc:
+                    models.update({pid: exc for pid in batch})
+                else:
+                    models.update(batch_models)
+
+        return [
+            _dataset_from_models(pid, models.get(pid), fetched_fields=fields)
+            for pid in parsed_pids
+        ]
+
+    def query_datasets(
+        self,
+        filter: Optional[Dict[str, Any]] = None,
+        *,
+        fields: Optional[Iterable[str]] = None,
+        page_size: int = 100,
+        order: Optional[str] = None,
+        prefetch: bool = True,
+        strict_validation: bool = False,
+    ) -> Iterator[Dataset]:
+        """Iterate over all datasets in SciCat that match a filter.
+
+        Does not download any files.
+
+        Results are requested lazily in pages of ``page_size`` datasets
+        together with the orig datablocks of each page.
+        So only one or two pages are held in memory at a time.
+
+        Parameters
+        ----------
+        filter:
+            Conditions that datasets must satisfy.
+            This is the ``where`` clause of a SciCat filter and uses
+            SciCat's field names, e.g., ``{"owner": "ridcully"}``.
+            If ``None``, all datasets are returned.
+        fields:
+            If given, only download these dataset fields.
+            Uses SciCat's field names, e.g., ``["pid", "sourceFolder"]``.
+            ``pid`` and ``type`` are always downloaded.
+            All other fields are ``None`` in the returned datasets
+            and listed in :attr:`Dataset.unfetched_fields`.
+        page_size:
+            Number of datasets to request at once.
+        order:
+            Sort order in the form ``"field:asc"`` or ``"field:desc"``.
+            Specifying an order ensures consistent pages if the database is
+            modified during iteration.
+        prefetch:
+            If ``True``, the next page is requested in the background
+            while the current page is being processed.
+        strict_validation:
+            If ``True``, the datasets must pass validation.
+            If ``False``, a dataset is still returned if validation fails.
+            Note that some dataset fields may have a bad value or type.
+            A warning will be logged if validation fails.
+
+        Yields
+        ------
+        :
+            New datasets that match the filter.
+
+        Examples
+        --------
+        Print the source folders of all datasets of an owner:
+
+        .. code-block:: python
+
+            for dset in client.query_datasets(
+                {"owner": "ridcully"}, fields=["sourceFolder"]
+            ):
+                print(dset.source_folder)
+        """
+        if page_size < 1:
+            raise ValueError(f"page_size must be positive, got {page_size}")
+        fields = _fields_to_fetch(fields)
+
+        def get_page(skip: int) -> List[Dataset]:
+            dataset_models = self.scicat.query_dataset_models(
+                filter,
+                fields=fields,
+                limit=page_size,
+                skip=skip,
+                order=order,
+                strict_validation=strict_validation,
+            )
+            orig_datablock_models = self.scicat.get_orig_datablocks_for_datasets(
+                [dset.pid for dset in dataset_models if dset.pid is not None],
+                strict_validation=strict_validation,
+            )
+            grouped = _group_dataset_models(
+                dataset_models=dataset_models,
+                orig_datablock_models=orig_datablock_models,
+                attachment_models=None,
+            )
+            return [
+                Dataset.from_download_models(
+                    dataset_model=dset,
+                    orig_datablock_models=grouped[dset.pid].orig_datablocks
+                    if dset.pid in grouped
+                    else [],
+                    fetched_fields=fields,
+                )
+                for dset in dataset_models
+            ]
+
+        skip = 0
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            next_page = None
+            while True:
+                datasets = get_page(skip) if next_page is None else next_page.result()
+                skip += page_size
+                has_more = len(datasets) == page_size
+                next_page = (
+                    executor.submit(get_page, skip) if has_more and prefetch else None
+                )
+                yield from datasets
+                if not has_more:
+                    return
+
+    def refresh_mirror(
+        self,
+        filter: Optional[Dict[str, Any]] = None,
+        *,
+        page_size: int = 100,
+        strict_validation: bool = False,
+    ) -> int:
+        """Download datasets that have changed since the last refresh into the mirror.
+
+        The first refresh with a given filter downloads all matching datasets
+        and their orig datablocks.
+        Subsequent refreshes with the same filter only download datasets
+        whose ``updatedAt`` is at or after the latest ``updatedAt`` of
+        the previous refresh.
+        Datasets are requested in pages ordered by ``updatedAt`` and ``pid``
+        where each page starts at the latest ``updatedAt`` of the previous page.
+        So datasets that are updated during the refresh are not skipped.
+        Datasets that have been deleted in SciCat are not removed from the mirror.
+
+        Requires a client with a :class:`scitacean.util.mirror.MetadataMirror`
+        that is not offline.
+
+        Parameters
+        ----------
+        filter:
+            Conditions that datasets must satisfy.
+            See :meth:`Client.query_datasets`.
+            Must not contain ``updatedAt``.
+        page_size:
+            Number of datasets to request at once.
+        strict_validation:
+            If ``True``, datasets and orig datablocks must pass validation.
+
+        Returns
+        -------
+        :
+            The number of downloaded datasets.
+
+        Raises
+        ------
+        ValueError
+            If the client has no mirror or the mirror is offline.
+        scitacean.ScicatCommError
+            If communication fails.
+        """
+        mirror = self.scicat.mirror
+        if mirror is None or mirror.offline:
+            raise ValueError("Refreshing requires a client with an online mirror.")
+        if page_size < 1:
+            raise ValueError(f"page_size must be positive, got {page_size}")
+        if filter is not None and "updatedAt" in filter:
+            raise ValueError("The filter must not contain 'updatedAt'.")
+
+        filter_key = _filter_key(filter)
+        latest = mirror._last_refresh(filter_key)
+        # Pids of downloaded datasets whose updatedAt equals `latest`.
+        # Pages overlap in those datasets because each page starts at `latest`
+        # instead of at an offset that shifts when datasets are updated.
+        seen_at_latest: Set[str] = set()
+
+        # Downloaded models are stored in the mirror by the ScicatClient.
+        n_downloaded = 0
+        while True:
+            where = dict(filter or {})
+            if latest is not None:
+                where["updatedAt"] = {"gte": latest}
+            # Request enough datasets to get past the ones already seen.
+            limit = page_size + len(seen_at_latest)
+            page = self.scicat.query_dataset_models(
+                where,
+                limit=limit,
+                order="updatedAt:asc,pid:asc",
+                strict_validation=strict_validation,
+            )
+            new = [
+                dset
+                for dset in page
+                if dset.pid is not None and str(dset.pid) not in seen_at_latest
+            ]
+            self.scicat.get_orig_datablocks_for_datasets(
+                [dset.pid for dset in new if dset.pid is not None],
+                strict_validation=strict_validation,
+            )
+            n_downloaded += len(new)
+
+            page_latest = max(
+                (
+                    updated_at
+                    for dset in page
+                    if (updated_at := _format_time(dset.updatedAt)) is not None
+                ),
+                default=latest,
+            )
+            if page_latest != latest:
+                latest = page_latest
+                seen_at_latest = set()
+            seen_at_latest.update(
+                str(dset.pid)
+                for dset in page
+                if dset.pid is not None and _format_time(dset.updatedAt) == latest
+            )
+            if len(page) < limit or not new:
+                break
+
+        if latest is not None:
+            mirror._set_last_refresh(filter_key, latest)
+        return n_downloaded
+
+    def upload_new_dataset_now(
+        self, dataset: Dataset, *, max_concurrency: int = 3
+    ) -> Dataset:
         """Upload a dataset as a new entry to SciCat immediately.
 
         The dataset is inserted as a new entry in the database and will
@@ -230,6 +779,9 @@ class Client:
         ----------
         dataset:
             The dataset to upload.
+        max_concurrency:
+            Maximum number of orig datablocks or attachments that are created
+            in SciCat at the same time.
 
         Returns
         -------
@@ -246,6 +798,84 @@ class Client:
             and some files or a partial dataset are left on the servers.
             Note the error message if that happens.
         """
+        dataset, finalized_model = self._upload_files_and_dataset(dataset)
+        return self._upload_dataset_metadata(
+            dataset, finalized_model, max_concurrency=max_concurrency
+        )
+
+    def upload_new_datasets(
+        self,
+        datasets: Iterable[Dataset],
+        *,
+        max_file_uploads: int = 2,
+        max_concurrency: int = 3,
+    ) -> List[Union[Dataset, Exception]]:
+        """Upload many datasets as new entries to SciCat.
+
+        This is equivalent to calling :meth:`Client.upload_new_dataset_now`
+        for every dataset but pipelines the uploads:
+        While the files of one dataset are uploaded, the orig datablocks and
+        attachments of previously uploaded datasets are created in SciCat.
+
+        The upload of each dataset proceeds in two stages:
+
+        1. Upload the files and create the dataset in SciCat.
+           If creating the dataset fails, the uploaded files are reverted.
+        2. Create the orig datablocks and attachments.
+
+        Each stage processes up to ``max_file_uploads`` and ``max_concurrency``
+        datasets at the same time, respectively.
+
+        Failures are reported per dataset instead of aborting all uploads.
+        The result contains the exception that
+        :meth:`Client.upload_new_dataset_now` would have raised for the
+        corresponding dataset.
+
+        Parameters
+        ----------
+        datasets:
+            The datasets to upload.
+        max_file_uploads:
+            Maximum number of datasets whose files are uploaded at the same time.
+        max_concurrency:
+            Maximum number of datasets whose orig datablocks and attachments
+            are created at the same time.
+
+        Returns
+        -------
+        :
+            For each input dataset in the same order, either a copy of the
+            dataset with fields adjusted according to the response of the server
+            or the exception that made the upload fail.
+        """
+        # Shut down the file executor first as its tasks submit to the other one.
+        with ThreadPoolExecutor(max_workers=max_concurrency) as metadata_executor:
+
+            def upload(dataset: Dataset) -> Future[Dataset]:
+                uploaded, finalized_model = self._upload_files_and_dataset(dataset)
+                return metadata_executor.submit(
+                    self._upload_dataset_metadata,
+                    uploaded,
+                    finalized_model,
+                    max_concurrency=1,
+                )
+
+            with ThreadPoolExecutor(max_workers=max_file_uploads) as file_executor:
+                futures = [
+                    file_executor.submit(upload, dataset) for dataset in datasets
+                ]
+
+            results: List[Union[Dataset, Exception]] = []
+            for future in futures:
+                try:
+                    results.append(future.result().result())
+                except Exception as exc:
+                    results.append(exc)
+        return results
+
+    def _upload_files_and_dataset(
+        self, dataset: Dataset
+    ) -> Tuple[Dataset, model.DownloadDataset]:
         dataset = dataset.replace(
             source_folder=self._expect_file_transfer().source_folder_for(dataset)
         )
@@ -254,23 +884,42 @@ class Client:
         with self._connect_for_file_upload(dataset) as con:
             # TODO check if any remote file is out of date.
             #  if so, raise an error. We never overwrite remote files!
-            uploaded_files = con.upload_files(*dataset.files)
+            with _record_transfer(
+                self.scicat._hooks,
+                "upload_files",
+                n_files=len(dataset.files),
+                bytes_sent=_total_size(dataset.files),
+            ):
+                uploaded_files = con.upload_files(*dataset.files)
             dataset = dataset.replace_files(*uploaded_files)
             try:
                 finalized_model = self.scicat.create_dataset_model(
                     dataset.make_upload_model()
                 )
             except ScicatCommError:
-                con.revert_upload(*uploaded_files)
+                with _record_transfer(
+                    self.scicat._hooks, "revert_upload", n_files=len(uploaded_files)
+                ):
+                    con.revert_upload(*uploaded_files)
                 raise
+        return dataset, finalized_model
 
+    def _upload_dataset_metadata(
+        self,
+        dataset: Dataset,
+        finalized_model: model.DownloadDataset,
+        *,
+        max_concurrency: int,
+    ) -> Dataset:
         with_new_pid = dataset.replace(_read_only={"pid": finalized_model.pid})
         finalized_orig_datablocks = self._upload_orig_datablocks(
-            with_new_pid.make_datablock_upload_models().orig_datablocks
+            with_new_pid.make_datablock_upload_models().orig_datablocks,
+            max_concurrency=max_concurrency,
         )
         finalized_attachments = self._upload_attachments_for_dataset(
             with_new_pid.make_attachment_upload_models(),
             dataset_id=with_new_pid.pid,  # type: ignore[arg-type]
+            max_concurrency=max_concurrency,
         )
 
         return Dataset.from_download_models(
@@ -280,16 +929,20 @@ class Client:
         )
 
     def _upload_orig_datablocks(
-        self, orig_datablocks: Optional[List[model.UploadOrigDatablock]]
+        self,
+        orig_datablocks: Optional[List[model.UploadOrigDatablock]],
+        *,
+        max_concurrency: int,
     ) -> List[model.DownloadOrigDatablock]:
         if not orig_datablocks:
             return []
 
         try:
-            return [
-                self.scicat.create_orig_datablock(orig_datablock)
-                for orig_datablock in orig_datablocks
-            ]
+            return _create_all(
+                self.scicat.create_orig_datablock,
+                orig_datablocks,
+                max_concurrency=max_concurrency,
+            )
         except ScicatCommError as exc:
             raise RuntimeError(
                 "Failed to upload original datablocks for SciCat dataset "
@@ -299,15 +952,20 @@ class Client:
             ) from exc
 
     def _upload_attachments_for_dataset(
-        self, attachments: List[model.UploadAttachment], *, dataset_id: PID
+        self,
+        attachments: List[model.UploadAttachment],
+        *,
+        dataset_id: PID,
+        max_concurrency: int,
     ) -> List[model.DownloadAttachment]:
         try:
-            return [
-                self.scicat.create_attachment_for_dataset(
-                    attachment, dataset_id=dataset_id
-                )
-                for attachment in attachments
-            ]
+            return _create_all(
+                functools.partial(
+                    self.scicat.create_attachment_for_dataset, dataset_id=dataset_id
+                ),
+                attachments,
+                max_concurrency=max_concurrency,
+            )
         except ScicatCommError as exc:
             raise RuntimeError(
                 f"Failed to upload attachments for SciCat dataset {dataset_id}:"
@@ -425,7 +1083,12 @@ class Client:
         if not to_download:
             return dataset.replace_files(*downloaded_files)
 
-        with self._connect_for_file_download() as con:
+        with self._connect_for_file_download() as con, _record_transfer(
+            self.scicat._hooks,
+            "download_files",
+            n_files=len(to_download),
+            bytes_received=sum(f._remote_size or 0 for f in to_download),
+        ):
             con.download_files(
                 remote=[
                     p
@@ -486,13 +1149,28 @@ class Client:
 
 
 class ScicatClient:
-    """Low-level client to call the SciCat API."""
+    """Low-level client to call the SciCat API.
+
+    The client owns a :class:`requests.Session` which keeps connections
+    to the server alive and reuses them for subsequent requests.
+    Call :meth:`ScicatClient.close` or use the client as a context manager
+    to release the connections when they are no longer needed.
+    """
 
     def __init__(
         self,
         url: str,
         token: Optional[Union[str, StrStorage]],
         timeout: Optional[datetime.timedelta],
+        *,
+        pool_size: int = 10,
+        cache: Optional[MetadataCache] = None,
+        retry: Optional[RetryPolicy] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+        json_codec: Optional[JsonCodec] = None,
+        hooks: Iterable[Hook] = (),
+        gzip_threshold: Optional[int] = None,
+        mirror: Optional[MetadataMirror] = None,
     ):
         # Need to add a final /
         self._base_url = url[:-1] if url.endswith("/") else url
@@ -500,6 +1178,15 @@ class ScicatClient:
         self._token: Optional[StrStorage] = (
             SecretStr(token) if isinstance(token, str) else token
         )
+        self._session = _make_session(pool_size=pool_size)
+        self._cache = cache
+        self._retry = retry
+        self._circuit_breaker = circuit_breaker
+        self._json_codec = default_json_codec() if json_codec is None else json_codec
+        self._stats = CallStats()
+        self._hooks: List[Hook] = [self._stats, *hooks]
+        self._gzip_threshold = gzip_threshold
+        self._mirror = mirror
 
     @classmethod
     def from_token(
@@ -507,6 +1194,15 @@ class ScicatClient:
         url: str,
         token: Union[str, StrStorage],
         timeout: Optional[datetime.timedelta] = None,
+        *,
+        pool_size: int = 10,
+        cache: Optional[MetadataCache] = None,
+        retry: Optional[RetryPolicy] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+        json_codec: Optional[JsonCodec] = None,
+        hooks: Iterable[Hook] = (),
+        gzip_threshold: Optional[int] = None,
+        mirror: Optional[MetadataMirror] = None,
     ) -> ScicatClient:
         """Create a new low-level client and authenticate with a token.
 
@@ -518,13 +1214,52 @@ class ScicatClient:
             User token to authenticate with SciCat.
         timeout:
             Timeout for all API requests.
+        pool_size:
+            Maximum number of connections to the server that are kept alive.
+        cache:
+            If given, responses to GET requests are stored in and reused from
+            this cache.
+        retry:
+            If given, failed GET requests are retried according to this policy.
+        circuit_breaker:
+            If given, requests are blocked while this breaker is open.
+            Can be shared between clients.
+        json_codec:
+            Codec for encoding request bodies and decoding responses.
+            Defaults to :func:`scitacean.util.json_codec.default_json_codec`.
+        hooks:
+            Callables that receive a
+            :class:`scitacean.util.instrumentation.RequestEvent`
+            for every request and a
+            :class:`scitacean.util.instrumentation.TransferEvent`
+            for every file transfer.
+        gzip_threshold:
+            Compress request bodies of at least this many bytes with gzip.
+            If ``None``, request bodies are never compressed.
+            Only use this if the server accepts compressed requests.
+        mirror:
+            If given, downloaded datasets and orig datablocks are stored in
+            this mirror.
+            If the mirror is offline, they are read from the mirror instead.
 
         Returns
         -------
         :
             A new low-level client.
         """
-        return ScicatClient(url=url, token=token, timeout=timeout)
+        return ScicatClient(
+            url=url,
+            token=token,
+            timeout=timeout,
+            pool_size=pool_size,
+            cache=cache,
+            retry=retry,
+            circuit_breaker=circuit_breaker,
+            json_codec=json_codec,
+            hooks=hooks,
+            gzip_threshold=gzip_threshold,
+            mirror=mirror,
+        )
 
     @classmethod
     def from_credentials(
@@ -533,6 +1268,17 @@ class ScicatClient:
         username: Union[str, StrStorage],
         password: Union[str, StrStorage],
         timeout: Optional[datetime.timedelta] = None,
+        *,
+        pool_size: int = 10,
+        cache: Optional[MetadataCache] = None,
+        retry: Optional[RetryPolicy] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+        json_codec: Optional[JsonCodec] = None,
+        hooks: Iterable[Hook] = (),
+        gzip_threshold: Optional[int] = None,
+        mirror: Optional[MetadataMirror] = None,
+        renew_token: bool = False,
+        token_cache: Optional[TokenCache] = None,
     ) -> ScicatClient:
         """Create a new low-level client and authenticate with username and password.
 
@@ -547,6 +1293,43 @@ class ScicatClient:
             Password of the user.
         timeout:
             Timeout for all API requests.
+        pool_size:
+            Maximum number of connections to the server that are kept alive.
+        cache:
+            If given, responses to GET requests are stored in and reused from
+            this cache.
+        retry:
+            If given, failed GET requests are retried according to this policy.
+        circuit_breaker:
+            If given, requests are blocked while this breaker is open.
+            Can be shared between clients.
+        json_codec:
+            Codec for encoding request bodies and decoding responses.
+            Defaults to :func:`scitacean.util.json_codec.default_json_codec`.
+        hooks:
+            Callables that receive a
+            :class:`scitacean.util.instrumentation.RequestEvent`
+            for every request and a
+            :class:`scitacean.util.instrumentation.TransferEvent`
+            for every file transfer.
+        gzip_threshold:
+            Compress request bodies of at least this many bytes with gzip.
+            If ``None``, request bodies are never compressed.
+            Only use this if the server accepts compressed requests.
+        mirror:
+            If given, downloaded datasets and orig datablocks are stored in
+            this mirror.
+            If the mirror is offline, they are read from the mirror instead.
+        renew_token:
+            If ``True``, log in again shortly before the token expires.
+            This keeps the username and password in memory for as long as the client
+            exists.
+            See :class:`scitacean.util.credentials.RenewingStr`.
+        token_cache:
+            If given, reuse a token from this cache if there is a valid one
+            and store new tokens in it.
+            The cache also remembers which login endpoint works for the user.
+            With ``renew_token=True``, renewals never reuse the token they replace.
 
         Returns
         -------
@@ -557,22 +1340,53 @@ class ScicatClient:
             username = SecretStr(username)
         if not isinstance(password, StrStorage):
             password = SecretStr(password)
-        return ScicatClient(
+        client = ScicatClient(
             url=url,
-            token=SecretStr(
-                _get_token(
-                    url=url,
-                    username=username,
-                    password=password,
-                    timeout=timeout if timeout else datetime.timedelta(seconds=10),
-                )
-            ),
+            token=None,
             timeout=timeout,
+            pool_size=pool_size,
+            cache=cache,
+            retry=retry,
+            circuit_breaker=circuit_breaker,
+            json_codec=json_codec,
+            hooks=hooks,
+            gzip_threshold=gzip_threshold,
+            mirror=mirror,
+        )
+        log_in = functools.partial(
+            _get_token_and_lifetime,
+            url=url,
+            username=username,
+            password=password,
+            timeout=client._timeout,
+            session=client._session,
+            token_cache=token_cache,
         )
+        try:
+            client._token = (
+                RenewingStr(renew=_without_stale_tokens(log_in))
+                if renew_token
+                else SecretStr(log_in()[0])
+            )
+        except Exception:
+            client.close()
+            raise
+        return client
 
     @classmethod
     def without_login(
-        cls, url: str, timeout: Optional[datetime.timedelta] = None
+        cls,
+        url: str,
+        timeout: Optional[datetime.timedelta] = None,
+        *,
+        pool_size: int = 10,
+        cache: Optional[MetadataCache] = None,
+        retry: Optional[RetryPolicy] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+        json_codec: Optional[JsonCodec] = None,
+        hooks: Iterable[Hook] = (),
+        gzip_threshold: Optional[int] = None,
+        mirror: Optional[MetadataMirror] = None,
     ) -> ScicatClient:
         """Create a new low-level client without authentication.
 
@@ -585,16 +1399,94 @@ class ScicatClient:
             It should include the suffix `api/vn` where `n` is a number.
         timeout:
             Timeout for all API requests.
+        pool_size:
+            Maximum number of connections to the server that are kept alive.
+        cache:
+            If given, responses to GET requests are stored in and reused from
+            this cache.
+        retry:
+            If given, failed GET requests are retried according to this policy.
+        circuit_breaker:
+            If given, requests are blocked while this breaker is open.
+            Can be shared between clients.
+        json_codec:
+            Codec for encoding request bodies and decoding responses.
+            Defaults to :func:`scitacean.util.json_codec.default_json_codec`.
+        hooks:
+            Callables that receive a
+            :class:`scitacean.util.instrumentation.RequestEvent`
+            for every request and a
+            :class:`scitacean.util.instrumentation.TransferEvent`
+            for every file transfer.
+        gzip_threshold:
+            Compress request bodies of at least this many bytes with gzip.
+            If ``None``, request bodies are never compressed.
+            Only use this if the server accepts compressed requests.
+        mirror:
+            If given, downloaded datasets and orig datablocks are stored in
+            this mirror.
+            If the mirror is offline, they are read from the mirror instead.
 
         Returns
         -------
         :
             A new low-level client.
         """
-        return ScicatClient(url=url, token=None, timeout=timeout)
+        return ScicatClient(
+            url=url,
+            token=None,
+            timeout=timeout,
+            pool_size=pool_size,
+            cache=cache,
+            retry=retry,
+            circuit_breaker=circuit_breaker,
+            json_codec=json_codec,
+            hooks=hooks,
+            gzip_threshold=gzip_threshold,
+            mirror=mirror,
+        )
+
+    def close(self) -> None:
+        """Close all connections in the pool.
+
+        The client cannot be used to communicate with SciCat afterwards.
+        """
+        self._session.close()
+
+    def __enter__(self) -> ScicatClient:
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+    @property
+    def mirror(self) -> Optional[MetadataMirror]:
+        """Local mirror of datasets and orig datablocks, if any."""
+        return self._mirror
+
+    def _offline_mirror(self) -> Optional[MetadataMirror]:
+        if self._mirror is not None and self._mirror.offline:
+            return self._mirror
+        return None
+
+    def stats(self) -> Dict[str, OperationStats]:
+        """Return statistics of all calls made by this client.
+
+        See :class:`scitacean.util.instrumentation.CallStats`.
+
+        Returns
+        -------
+        :
+            Statistics for every operation, keyed by operation name.
+        """
+        return self._stats.summary()
 
     def get_dataset_model(
-        self, pid: PID, strict_validation: bool = False
+        self,
+        pid: PID,
+        strict_validation: bool = False,
+        *,
+        fields: Optional[Iterable[str]] = None,
     ) -> model.DownloadDataset:
         """Fetch a dataset from SciCat.
 
@@ -608,6 +1500,9 @@ class ScicatClient:
             If ``False``, a dataset is still returned if validation fails.
             Note that some dataset fields may have a bad value or type.
             A warning will be logged if validation fails.
+        fields:
+            If given, only these fields are included in the returned model.
+            Uses SciCat's field names, e.g., ``["pid", "sourceFolder"]``.
 
         Returns
         -------
@@ -619,21 +1514,53 @@ class ScicatClient:
         scitacean.ScicatCommError
             If the dataset does not exist or communication fails for some other reason.
         """
-        dset_json = self._call_endpoint(
-            cmd="get",
+
+        def make_dataset(
+            dset_json: Any, strict_validation: bool
+        ) -> model.DownloadDataset:
+            if not dset_json:
+                raise ScicatCommError(
+                    f"Cannot get dataset with {pid=}, "
+                    f"no such dataset in SciCat at {self._base_url}."
+                )
+            if isinstance(dset_json, list):
+                # Response of a filtered query.
+                return make_dataset(
+                    dset_json[0] if dset_json else None, strict_validation
+                )
+            return model.construct(
+                model.DownloadDataset,
+                _strict_validation=strict_validation,
+                **dset_json,
+            )
+
+        if (mirror := self._offline_mirror()) is not None:
+            # The mirror always returns all fields.
+            mirrored = mirror.get_dataset_model(pid, strict_validation)
+            if mirrored is None:
+                raise ScicatCommError(
+                    f"Cannot get dataset with {pid=}, "
+                    "no such dataset in the offline mirror."
+                )
+            return mirrored
+        if fields is not None:
+            # Only the query endpoint supports selecting fields.
+            return self._get_models(
+                url="datasets",
+                params={"filter": _inq_filter("pid", [pid], fields=fields)},
+                operation="get_dataset_model",
+                construct=make_dataset,
+                strict_validation=strict_validation,
+            )
+        dset = self._get_models(
             url=f"datasets/{quote_plus(str(pid))}",
             operation="get_dataset_model",
+            construct=make_dataset,
+            strict_validation=strict_validation,
         )
-        if not dset_json:
-            raise ScicatCommError(
-                f"Cannot get dataset with {pid=}, "
-                f"no such dataset in SciCat at {self._base_url}."
-            )
-        return model.construct(
-            model.DownloadDataset,
-            _strict_validation=strict_validation,
-            **dset_json,
-        )
+        if self._mirror is not None:
+            self._mirror._store_datasets([dset])
+        return dset
 
     def get_orig_datablocks(
         self, pid: PID, strict_validation: bool = False
@@ -661,15 +1588,99 @@ class ScicatClient:
         scitacean.ScicatCommError
             If communication fails.
         """
-        dblock_json = self._call_endpoint(
-            cmd="get",
+        if (mirror := self._offline_mirror()) is not None:
+            mirrored = mirror.get_orig_datablocks(pid, strict_validation)
+            if mirrored is None:
+                raise ScicatCommError(
+                    f"Cannot get orig datablocks of dataset with {pid=}, "
+                    "they are not in the offline mirror."
+                )
+            return mirrored
+        dblocks = self._get_models(
             url=f"datasets/{quote_plus(str(pid))}/origdatablocks",
             operation="get_orig_datablocks",
+            construct=_make_orig_datablocks,
+            strict_validation=strict_validation,
         )
-        return [
-            _make_orig_datablock(dblock, strict_validation=strict_validation)
-            for dblock in dblock_json
-        ]
+        if self._mirror is not None:
+            self._mirror._store_orig_datablocks({str(pid): dblocks})
+        return dblocks
+
+    def iter_orig_datablocks(
+        self, pid: PID, strict_validation: bool = False
+    ) -> Iterator[OrigDatablock]:
+        """Fetch all orig datablocks for a given dataset and decode them incrementally.
+
+        Unlike :meth:`ScicatClient.get_orig_datablocks`, this function
+        does not load the entire response into memory.
+        Instead, it decodes the response while it is being downloaded and
+        constructs :class:`scitacean.File` objects from the file list on the fly.
+        This greatly reduces memory usage for datablocks with many files.
+
+        If the client has a cache or a mirror, the datablocks are instead
+        downloaded with :meth:`ScicatClient.get_orig_datablocks` in order to use
+        the cache or mirror.
+
+        Parameters
+        ----------
+        pid:
+            Unique ID of the *dataset*.
+            Must include the facility ID.
+        strict_validation:
+            If ``True``, the datablocks and files must pass validation.
+            If ``False``, datablocks are still returned if validation fails.
+            Note that some fields may have a bad value or type.
+            A warning will be logged if validation fails.
+
+        Yields
+        ------
+        :
+            The orig datablocks.
+
+        Raises
+        ------
+        scitacean.ScicatCommError
+            If communication fails.
+        """
+
+        def make_file(file_fields: Any, dblock_fields: Dict[str, Any]) -> File:
+            file_model = model.construct(
+                model.DownloadDataFile,
+                _strict_validation=strict_validation,
+                **file_fields,
+            )
+            return File.from_download_model(
+                file_model, checksum_algorithm=dblock_fields.get("chkAlg")
+            )
+
+        if self._cache is not None or self._mirror is not None:
+            yield from map(
+                OrigDatablock.from_download_model,
+                self.get_orig_datablocks(pid, strict_validation=strict_validation),
+            )
+            return
+
+        response = self._request_endpoint(
+            cmd="get",
+            url=f"datasets/{quote_plus(str(pid))}/origdatablocks",
+            operation="iter_orig_datablocks",
+            stream=True,
+        )
+        with response:
+            for fields, files in iter_objects_with_streamed_list(
+                response.iter_content(chunk_size=_STREAM_CHUNK_SIZE),
+                key="dataFileList",
+                convert=make_file,
+            ):
+                dblock_model = model.construct(
+                    model.DownloadOrigDatablock,
+                    _strict_validation=strict_validation,
+                    **fields,
+                )
+                yield OrigDatablock.from_download_model(
+                    dblock_model,
+                    files=_with_checksum_algorithm(files, dblock_model.chkAlg),
+                )
 
     def get_attachments_for_dataset(
         self, pid: PID, strict_validation: bool = False
@@ -697,19 +1708,236 @@ class ScicatClient:
         scitacean.ScicatCommError
             If communication fails.
         """
-        attachment_json = self._call_endpoint(
-            cmd="get",
+        return self._get_models(
             url=f"datasets/{quote_plus(str(pid))}/attachments",
             operation="get_attachments_for_dataset",
+            construct=_make_attachments,
+            strict_validation=strict_validation,
+        )
+
+    def get_dataset_models(
+        self,
+        pids: Iterable[PID],
+        strict_validation: bool = False,
+        *,
+        fields: Optional[Iterable[str]] = None,
+    ) -> List[model.DownloadDataset]:
+        """Fetch multiple datasets from SciCat with a single request.
+
+        Parameters
+        ----------
+        pids:
+            Unique IDs of the datasets.
+            Must include the facility ID.
+        strict_validation:
+            If ``True``, the datasets must pass validation.
+            If ``False``, datasets are still returned if validation fails.
+            Note that some dataset fields may have a bad value or type.
+            A warning will be logged if validation fails.
+        fields:
+            If given, only these fields are included in the returned models.
+            Uses SciCat's field names, e.g., ``["pid", "sourceFolder"]``.
+
+        Returns
+        -------
+        :
+            Models of the datasets.
+            Datasets that do not exist or that the user cannot access
+            are not included.
+            The order of models is unspecified.
+
+        Raises
+        ------
+        scitacean.ScicatCommError
+            If communication fails.
+        """
+        pids = list(pids)
+        if not pids:
+            return []
+        if (mirror := self._offline_mirror()) is not None:
+            # The mirror always returns all fields.
+            return [
+                mirrored
+                for pid in dict.fromkeys(pids)
+                if (mirrored := mirror.get_dataset_model(pid, strict_validation))
+                is not None
+            ]
+        dsets = self._get_models_in_pages(
+            url="datasets",
+            field="pid",
+            values=pids,
+            fields=fields,
+            order="pid:asc",
+            operation="get_dataset_models",
+            construct=_make_datasets,
+            strict_validation=strict_validation,
+        )
+        if self._mirror is not None and fields is None:
+            self._mirror._store_datasets(dsets)
+        return dsets
+
+    def query_dataset_models(
+        self,
+        filter: Optional[Dict[str, Any]] = None,
+        *,
+        fields: Optional[Iterable[str]] = None,
+        limit: Optional[int] = None,
+        skip: int = 0,
+        order: Optional[str] = None,
+        strict_validation: bool = False,
+    ) -> List[model.DownloadDataset]:
+        """Query SciCat for datasets that match a filter.
+
+        Parameters
+        ----------
+        filter:
+            Conditions that datasets must satisfy.
+            This is the ``where`` clause of a SciCat filter and uses
+            SciCat's field names, e.g., ``{"owner": "ridcully"}``.
+            If ``None``, all datasets are returned.
+        fields:
+            If given, only these fields are included in the returned models.
+            Uses SciCat's field names, e.g., ``["pid", "sourceFolder"]``.
+        limit:
+            Maximum number of datasets to return.
+        skip:
+            Number of matching datasets to skip.
+            Use together with ``limit`` to page through results.
+        order:
+            Sort order in the form ``"field:asc"`` or ``"field:desc"``.
+        strict_validation:
+            If ``True``, the datasets must pass validation.
+            If ``False``, datasets are still returned if validation fails.
+            Note that some dataset fields may have a bad value or type.
+            A warning will be logged if validation fails.
+
+        Returns
+        -------
+        :
+            Models of the matching datasets.
+
+        Raises
+        ------
+        scitacean.ScicatCommError
+            If communication fails.
+        """
+        dsets = self._get_models(
+            url="datasets",
+            params={
+                "filter": _query_filter(
+                    filter, fields=fields, limit=limit, skip=skip, order=order
+                )
+            },
+            operation="query_dataset_models",
+            construct=_make_datasets,
+            strict_validation=strict_validation,
+        )
+        if self._mirror is not None and fields is None:
+            self._mirror._store_datasets(dsets)
+        return dsets
+
+    def get_orig_datablocks_for_datasets(
+        self, pids: Iterable[PID], strict_validation: bool = False
+    ) -> List[model.DownloadOrigDatablock]:
+        """Fetch all orig datablocks of multiple datasets at once.
+
+        Requests the orig datablocks of all datasets together
+        and pages through the results.
+
+        Parameters
+        ----------
+        pids:
+            Unique IDs of the *datasets*.
+            Must include the facility ID.
+        strict_validation:
+            If ``True``, the datablocks must pass validation.
+            If ``False``, datablocks are still returned if validation fails.
+            Note that some fields may have a bad value or type.
+            A warning will be logged if validation fails.
+
+        Returns
+        -------
+        :
+            Models of the orig datablocks of all given datasets.
+            Use ``datasetId`` to associate them with their datasets.
+            The order of models is unspecified.
+
+        Raises
+        ------
+        scitacean.ScicatCommError
+            If communication fails.
+        """
+        pids = list(pids)
+        if not pids:
+            return []
+        if (mirror := self._offline_mirror()) is not None:
+            return [
+                dblock
+                for pid in dict.fromkeys(pids)
+                for dblock in mirror.get_orig_datablocks(pid, strict_validation) or ()
+            ]
+        dblocks = self._get_models_in_pages(
+            url="origdatablocks",
+            field="datasetId",
+            values=pids,
+            order="_id:asc",
+            operation="get_orig_datablocks_for_datasets",
+            construct=_make_orig_datablocks,
+            strict_validation=strict_validation,
+        )
+        if self._mirror is not None:
+            # Also record that datasets without orig datablocks have none.
+            grouped: Dict[str, List[model.DownloadOrigDatablock]] = {
+                str(pid): [] for pid in pids
+            }
+            for dblock in dblocks:
+                grouped.setdefault(str(dblock.datasetId), []).append(dblock)
+            self._mirror._store_orig_datablocks(grouped)
+        return dblocks
+
+    def get_attachments_for_datasets(
+        self, pids: Iterable[PID], strict_validation: bool = False
+    ) -> List[model.DownloadAttachment]:
+        """Fetch all attachments of multiple datasets at once.
+
+        Requests the attachments of all datasets together
+        and pages through the results.
+
+        Parameters
+        ----------
+        pids:
+            Unique IDs of the *datasets*.
+            Must include the facility ID.
+        strict_validation:
+            If ``True``, the attachments must pass validation.
+            If ``False``, attachments are still returned if validation fails.
+            Note that some fields may have a bad value or type.
+            A warning will be logged if validation fails.
+
+        Returns
+        -------
+        :
+            Models of the attachments of all given datasets.
+            Use ``datasetId`` to associate them with their datasets.
+            The order of models is unspecified.
+
+        Raises
+        ------
+        scitacean.ScicatCommError
+            If communication fails.
+        """
+        pids = list(pids)
+        if not pids:
+            return []
+        return self._get_models_in_pages(
+            url="attachments",
+            field="datasetId",
+            values=pids,
+            order="_id:asc",
+            operation="get_attachments_for_datasets",
+            construct=_make_attachments,
+            strict_validation=strict_validation,
         )
-        return [
-            model.construct(
-                model.DownloadAttachment,
-                _strict_validation=strict_validation,
-                **attachment,
-            )
-            for attachment in attachment_json
-        ]
 
     def create_dataset_model(
         self, dset: Union[model.UploadDerivedDataset, model.UploadRawDataset]
@@ -830,33 +2058,48 @@ class ScicatClient:
         )
 
     def _send_to_scicat(
-        self, *, cmd: str, url: str, data: Optional[model.BaseModel] = None
+        self,
+        *,
+        cmd: str,
+        url: str,
+        data: Optional[model.BaseModel] = None,
+        params: Optional[Dict[str, str]] = None,
+        headers: Optional[Dict[str, str]] = None,
+        stream: bool = False,
+        operation: str,
     ) -> requests.Response:
+        params = {} if params is None else dict(params)
+        headers = {} if headers is None else dict(headers)
         if self._token is not None:
             token = self._token.get_str()
-            params = {"access_token": token}
-            headers = {"Authorization": f"Bearer {token}"}
+            params["access_token"] = token
+            headers["Authorization"] = f"Bearer {token}"
         else:
             token = ""
-            params = {}
-            headers = {}
 
+        headers.setdefault("Accept-Encoding", "gzip, deflate")
+        body = None
         if data is not None:
             headers["Content-Type"] = "application/json"
+            body = self._json_codec.encode_model(data)
+            if self._gzip_threshold is not None and len(body) >= self._gzip_threshold:
+                body = gzip.compress(body, compresslevel=_GZIP_LEVEL)
+                headers["Content-Encoding"] = "gzip"
 
+        start = time.perf_counter()
+        response = None
         try:
-            return requests.request(
+            response = self._session.request(
                 method=cmd,
                 url=url,
-                data=data.model_dump_json(exclude_none=True)
-                if data is not None
-                else None,
+                data=body,
                 params=params,
                 headers=headers,
                 timeout=self._timeout.seconds,
-                stream=False,
+                stream=stream,
                 verify=True,
             )
+            return response
         except Exception as exc:
             # Remove concrete request function call from backtrace to hide the token.
             # Also modify the error message to strip out the token.
@@ -866,6 +2109,19 @@ class ScicatClient:
             raise type(exc)(
                 tuple(_strip_token(arg, token) for arg in exc.args)
             ) from None
+        finally:
+            _emit(
+                self._hooks,
+                RequestEvent(
+                    operation=operation,
+                    method=cmd.upper(),
+                    url=_url_template(self._base_url, url),
+                    status_code=None if response is None else response.status_code,
+                    bytes_sent=0 if body is None else len(body),
+                    bytes_received=_response_size(response, stream=stream),
+                    duration=time.perf_counter() - start,
+                ),
+            )
 
     def _call_endpoint(
         self,
@@ -873,13 +2129,144 @@ class ScicatClient:
         cmd: str,
         url: str,
         data: Optional[model.BaseModel] = None,
+        params: Optional[Dict[str, str]] = None,
         operation: str,
     ) -> Any:
+        # Cached GET requests go through _get_models.
+        try:
+            response = self._request_endpoint(
+                cmd=cmd, url=url, data=data, params=params, operation=operation
+            )
+        finally:
+            if cmd != "get" and self._cache is not None:
+                # Any modification may change the response to any GET request.
+                # The server may have applied the modification even if the
+                # request failed, e.g., because of a timeout.
+                self._cache.clear()
+        return self._decode_response(response)
+
+    def _get_models(
+        self,
+        *,
+        url: str,
+        params: Optional[Dict[str, str]] = None,
+        operation: str,
+        construct: Callable[[Any, bool], T],
+        strict_validation: bool,
+    ) -> T:
+        if self._cache is None:
+            content = self._call_endpoint(
+                cmd="get", url=url, params=params, operation=operation
+            )
+            return construct(content, strict_validation)
+
+        entry = self._get_cache_entry(url=url, params=params, operation=operation)
+        if (models := entry.models.get(strict_validation)) is None:
+            models = entry.models.setdefault(
+                strict_validation, construct(entry.content, strict_validation)
+            )
+        # Callers may modify the models, so they must not be shared.
+        return deepcopy(models)  # type: ignore[no-any-return]
+
+    def _get_models_in_pages(
+        self,
+        *,
+        url: str,
+        field: str,
+        values: List[Any],
+        fields: Optional[Iterable[str]] = None,
+        order: str,
+        operation: str,
+        construct: Callable[[Any, bool], List[T]],
+        strict_validation: bool,
+    ) -> List[T]:
+        # SciCat returns only one page of results if no limit is given.
+        # So request pages explicitly until a page is not full.
+        fields = list(fields) if fields is not None else None
+        models: List[T] = []
+        while True:
+            page = self._get_models(
+                url=url,
+                params={
+                    "filter": _inq_filter(
+                        field,
+                        values,
+                        fields=fields,
+                        limits={
+                            "skip": len(models),
+                            "limit": _INQ_PAGE_SIZE,
+                            "order": order,
+                        },
+                    )
+                },
+                operation=operation,
+                construct=construct,
+                strict_validation=strict_validation,
+            )
+            models.extend(page)
+            if len(page) < _INQ_PAGE_SIZE:
+                return models
+
+    def _get_cache_entry(
+        self, *, url: str, params: Optional[Dict[str, str]], operation: str
+    ) -> _CacheEntry:
+        cache: MetadataCache = self._cache  # type: ignore[assignment]
+        key = (self._cache_identity(), url, urlencode(sorted((params or {}).items())))
+        entry = cache._get(key)
+        if entry is not None and entry.is_fresh(time.monotonic()):
+            return entry
+
+        headers = {}
+        if entry is not None:
+            if entry.etag is not None:
+                headers["If-None-Match"] = entry.etag
+            if entry.last_modified is not None:
+                headers["If-Modified-Since"] = entry.last_modified
+        response = self._request_endpoint(
+            cmd="get", url=url, params=params, headers=headers, operation=operation
+        )
+        if entry is not None and response.status_code == 304:
+            cache._refresh(entry)
+            return entry
+        return cache._put(
+            key,
+            self._decode_response(response),
+            etag=response.headers.get("ETag"),
+            last_modified=response.headers.get("Last-Modified"),
+        )
+
+    def _cache_identity(self) -> str:
+        # Responses depend on the server and user.
+        # Include both in cache keys so that clients of different users
+        # can share a cache without seeing each other's datasets.
+        token = self._token.get_str() if self._token is not None else ""
+        token_hash = hashlib.sha256(token.encode("utf-8")).hexdigest()
+        return f"{self._base_url}#{token_hash}"
+
+    def _request_endpoint(
+        self,
+        *,
+        cmd: str,
+        url: str,
+        data: Optional[model.BaseModel] = None,
+        params: Optional[Dict[str, str]] = None,
+        headers: Optional[Dict[str, str]] = None,
+        stream: bool = False,
+        operation: str,
+    ) -> requests.Response:
         full_url = _url_concat(self._base_url, url)
         logger = get_logger()
         logger.info("Calling SciCat API at %s for operation '%s'", full_url, operation)
 
-        response = self._send_to_scicat(cmd=cmd, url=full_url, data=data)
+        response = self._send_with_retry(
+            cmd=cmd,
+            url=full_url,
+            data=data,
+            params=params,
+            headers=headers,
+            stream=stream,
+            operation=operation,
+        )
         if not response.ok:
             logger.error(
                 "SciCat API call to %s failed: %s %s: %s",
@@ -893,8 +2280,107 @@ class ScicatClient:
                 f"{response.reason}: {response.text}"
             )
         logger.info("API call successful for operation '%s'", operation)
+        return response
 
-        return None if not response.text else response.json()
+    def _decode_response(self, response: requests.Response) -> Any:
+        content = response.content
+        return self._json_codec.loads(content) if content else None
+
+    def _send_with_retry(
+        self,
+        *,
+        cmd: str,
+        url: str,
+        data: Optional[model.BaseModel],
+        params: Optional[Dict[str, str]],
+        headers: Optional[Dict[str, str]],
+        stream: bool,
+        operation: str,
+    ) -> requests.Response:
+        # Only GET requests are idempotent and can be repeated safely.
+        retry = self._retry if cmd == "get" else None
+        start = time.monotonic()
+        attempt = 1
+        while True:
+            if self._circuit_breaker is not None:
+                self._circuit_breaker._before_request(operation)
+            try:
+                response = self._send_to_scicat(
+                    cmd=cmd,
+                    url=url,
+                    data=data,
+                    params=params,
+                    headers=headers,
+                    stream=stream,
+                    operation=operation,
+                )
+            except (requests.ConnectionError, requests.Timeout) as exc:
+                if self._circuit_breaker is not None:
+                    self._circuit_breaker._record(failed=True)
+                delay = (
+                    retry._delay(
+                        attempt=attempt,
+                        elapsed=time.monotonic() - start,
+                        retry_after=None,
+                    )
+                    if retry is not None
+                    else None
+                )
+                if delay is None:
+                    raise
+                reason = str(exc)
+            except requests.RequestException:
+                if self._circuit_breaker is not None:
+                    self._circuit_breaker._record(failed=True)
+                raise
+            except BaseException:
+                # Not a failure of the server, e.g., an error in a hook.
+                # But a trial request must not block the breaker forever.
+                if self._circuit_breaker is not None:
+                    self._circuit_breaker._cancel_trial()
+                raise
+            else:
+                if self._circuit_breaker is not None:
+                    self._circuit_breaker._record(
+                        failed=_is_server_failure(response.status_code)
+                    )
+                if retry is None or response.status_code not in retry.retry_on_status:
+                    return response
+                delay = retry._delay(
+                    attempt=attempt,
+                    elapsed=time.monotonic() - start,
+                    retry_after=_parse_retry_after(response.headers.get("Retry-After")),
+                )
+                if delay is None:
+                    return response
+                reason = f"{response.status_code} {response.reason}"
+                response.close()
+
+            get_logger().warning(
+                "SciCat API call for operation '%s' failed (%s), "
+                "retrying in %.1fs (attempt %d)",
+                operation,
+                reason,
+                delay,
+                attempt,
+            )
+            time.sleep(delay)
+            attempt += 1
+
+
+def _make_session(pool_size: int) -> requests.Session:
+    # Connections are kept alive by the session and returned to the pool
+    # after each request.
+    # So keep-alive only needs an adapter that holds enough connections.
+    adapter = requests.adapters.HTTPAdapter(
+        pool_connections=2,  # API server and auth server
+        pool_maxsize=pool_size,
+    )
+    session = requests.Session()
+    session.headers["Connection"] = "keep-alive"
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
 
 
 def _url_concat(a: str, b: str) -> str:
@@ -905,6 +2391,73 @@ def _url_concat(a: str, b: str) -> str:
     return a + b
 
 
+def _url_template(base_url: str, url: str) -> str:
+    # Relative URL with dataset IDs replaced by a placeholder
+    # such that it identifies the endpoint.
+    relative = url[len(base_url) :].lstrip("/")
+    return re.sub(r"^datasets/[^/]+", "datasets/{pid}", relative)
+
+
+def _response_size(response: Optional[requests.Response], *, stream: bool) -> int:
+    if response is None:
+        return 0
+    if not stream:
+        return len(response.content)
+    try:
+        return int(response.headers.get("Content-Length", 0))
+    except ValueError:
+        return 0
+
+
+def _total_size(files: Iterable[File]) -> int:
+    return sum(f.size for f in files)
+
+
+def _fields_to_fetch(fields: Optional[Iterable[str]]) -> Optional[List[str]]:
+    # Scitacean needs the ID and type to construct datasets.
+    if fields is None:
+        return None
+    return list(dict.fromkeys(("pid", "type", *fields)))
+
+
+def _inq_filter(
+    field: str,
+    values: Iterable[Any],
+    *,
+    fields: Optional[Iterable[str]] = None,
+    limits: Optional[Dict[str, Any]] = None,
+) -> str:
+    # Loopback filter that matches all documents whose `field` is in `values`.
+    query: Dict[str, Any] = {
+        "where": {field: {"inq": [str(value) for value in values]}}
+    }
+    if fields is not None:
+        query["fields"] = list(fields)
+    if limits is not None:
+        query["limits"] = limits
+    return json.dumps(query)
+
+
+def _query_filter(
+    where: Optional[Dict[str, Any]],
+    *,
+    fields: Optional[Iterable[str]],
+    limit: Optional[int],
+    skip: int,
+    order: Optional[str],
+) -> str:
+    query: Dict[str, Any] = {"where": where or {}}
+    if fields is not None:
+        query["fields"] = list(fields)
+    limits: Dict[str, Any] = {"skip": skip}
+    if limit is not None:
+        limits["limit"] = limit
+    if order is not None:
+        limits["order"] = order
+    query["limits"] = limits
+    return json.dumps(query)
+
+
 def _strip_token(error: Any, token: str) -> str:
     err = str(error)
     err = re.sub(r"token=[\w\-./]+", "token=<HIDDEN>", err)
@@ -929,72 +2482,278 @@ def _make_orig_datablock(
     )
 
 
-def _log_in_via_users_login(
-    url: str, username: StrStorage, password: StrStorage, timeout: datetime.timedelta
-) -> requests.Response:
-    # Currently only used for functional accounts.
-    response = requests.post(
-        _url_concat(url, "Users/login"),
-        json={"username": username.get_str(), "password": password.get_str()},
-        stream=False,
-        verify=True,
-        timeout=timeout.seconds,
-    )
-    if not response.ok:
-        get_logger().info(
-            "Failed to log in via endpoint Users/login: %s", response.json()["error"]
+def _with_checksum_algorithm(
+    files: List[File], checksum_algorithm: Optional[str]
+) -> List[File]:
+    # Files are constructed before the checksum algorithm is known
+    # if it comes after the file list in the response.
+    return [
+        file
+        if file.checksum_algorithm == checksum_algorithm
+        else dataclasses.replace(file, checksum_algorithm=checksum_algorithm)
+        for file in files
+    ]
+
+
+def _make_orig_datablocks(
+    dblock_json: Any, strict_validation: bool
+) -> List[model.DownloadOrigDatablock]:
+    return [
+        _make_orig_datablock(dblock, strict_validation=strict_validation)
+        for dblock in dblock_json or ()
+    ]
+
+
+def _make_datasets(
+    dset_json: Any, strict_validation: bool
+) -> List[model.DownloadDataset]:
+    return [
+        model.construct(
+            model.DownloadDataset, _strict_validation=strict_validation, **dset
         )
-    return response
-
-
-def _log_in_via_auth_msad(
-    url: str, username: StrStorage, password: StrStorage, timeout: datetime.timedelta
-) -> requests.Response:
-    # Used for user accounts.
-    import re
-
-    # Strip the api/vn suffix
-    base_url = re.sub(r"/api/v\d+/?", "", url)
-    response = requests.post(
-        _url_concat(base_url, "auth/msad"),
-        json={"username": username.get_str(), "password": password.get_str()},
-        stream=False,
-        verify=True,
-        timeout=timeout.seconds,
-    )
-    if not response.ok:
-        get_logger().error(
-            "Failed to log in via auth/msad: %s", response.json()["error"]
+        for dset in dset_json or ()
+    ]
+
+
+def _make_attachments(
+    attachment_json: Any, strict_validation: bool
+) -> List[model.DownloadAttachment]:
+    return [
+        model.construct(
+            model.DownloadAttachment,
+            _strict_validation=strict_validation,
+            **attachment,
         )
-    return response
+        for attachment in attachment_json or ()
+    ]
 
 
 def _get_token(
-    url: str, username: StrStorage, password: StrStorage, timeout: datetime.timedelta
+    url: str,
+    username: StrStorage,
+    password: StrStorage,
+    timeout: datetime.timedelta,
+    session: requests.Session,
 ) -> str:
     """Log in using the provided username + password.
 
     Returns a token for the given user.
     """
+    return _get_token_and_lifetime(
+        url=url, username=username, password=password, timeout=timeout, session=session
+    )[0]
+
+
+def _get_token_and_lifetime(
+    url: str,
+    username: StrStorage,
+    password: StrStorage,
+    timeout: datetime.timedelta,
+    session: requests.Session,
+    token_cache: Optional[TokenCache] = None,
+    stale_token: Optional[str] = None,
+) -> Tuple[str, Optional[datetime.timedelta]]:
+    """Log in using the provided username + password.
+
+    Returns a token for the given user and its lifetime if the server reports it.
+    If a token cache is given, a cached token is returned if there is one
+    and it is not ``stale_token``.
+    Otherwise, the new token and the successful login endpoint are stored in the cache.
+    """
+    if token_cache is None:
+        token, lifetime, _ = _log_in(
+            url=url,
+            username=username,
+            password=password,
+            timeout=timeout,
+            session=session,
+        )
+        return token, lifetime
+
+    # Hold the lock while logging in so that other processes reuse our token.
+    with token_cache.lock():
+        cached = token_cache.get(url=url, username=username.get_str())
+        if (
+            cached is not None
+            and cached.token is not None
+            and cached.token != stale_token
+        ):
+            get_logger().info("Using cached login token for %s", url)
+            return cached.token, cached.lifetime
+        token, lifetime, endpoint = _log_in(
+            url=url,
+            username=username,
+            password=password,
+            timeout=timeout,
+            session=session,
+            first_endpoint=cached.login_endpoint if cached is not None else None,
+        )
+        token_cache.store(
+            url=url,
+            username=username.get_str(),
+            login_endpoint=endpoint,
+            token=token,
+            lifetime=lifetime,
+        )
+        return token, lifetime
+
+
+def _without_stale_tokens(
+    log_in: Callable[..., Tuple[str, Optional[datetime.timedelta]]],
+) -> Callable[[], Tuple[str, Optional[datetime.timedelta]]]:
+    """Wrap a login function for :class:`RenewingStr`.
+
+    A renewal must not return the token that is being renewed.
+    Otherwise, a token cache would keep returning the expiring token
+    as long as it has more than the cache's ``min_remaining`` left.
+    """
+    current: Optional[str] = None
+
+    def renew() -> Tuple[str, Optional[datetime.timedelta]]:
+        nonlocal current
+        token, lifetime = log_in(stale_token=current)
+        current = token
+        return token, lifetime
+
+    return renew
+
+
+def _log_in(
+    url: str,
+    username: StrStorage,
+    password: StrStorage,
+    timeout: datetime.timedelta,
+    session: requests.Session,
+    first_endpoint: Optional[str] = None,
+) -> Tuple[str, Optional[datetime.timedelta], str]:
+    for endpoint, endpoint_url, payload in _login_requests(
+        url, username, password, first_endpoint
+    ):
+        response = session.post(
+            endpoint_url,
+            json=payload,
+            stream=False,
+            verify=True,
+            timeout=timeout.seconds,
+        )
+        result = _parse_login_response(
+            endpoint, ok=response.ok, content=response.json()
+        )
+        if result is not None:
+            return (*result, endpoint.name)
+
+    _raise_login_error(response.json(), response.content)
+
+
+def _login_requests(
+    url: str,
+    username: StrStorage,
+    password: StrStorage,
+    first_endpoint: Optional[str] = None,
+) -> Iterator[Tuple[_LoginEndpoint, str, Dict[str, str]]]:
+    """Yield the endpoints, their URLs, and payloads to try for logging in.
+
+    This and the other ``_*login*`` functions implement logging in independently
+    of the HTTP library so that they can be shared by the synchronous and
+    asynchronous clients.
+    """
     # Users/login only works for functional accounts and auth/msad for regular users.
     # Try both and see what works. This is not nice but seems to be the only
     # feasible solution right now.
     get_logger().info("Logging in to %s", url)
+    for endpoint in _login_endpoints(first_endpoint):
+        yield endpoint, endpoint.url(url), _login_payload(username, password)
+
+
+def _parse_login_response(
+    endpoint: _LoginEndpoint, *, ok: bool, content: Any
+) -> Optional[Tuple[str, Optional[datetime.timedelta]]]:
+    """Return the token and its lifetime or ``None`` if the login failed."""
+    if ok:
+        return endpoint.parse(content)
+    endpoint.log_failure(content)
+    return None
+
+
+def _raise_login_error(content: Any, raw_content: bytes) -> NoReturn:
+    get_logger().error("Failed log in:  %s", content["error"])
+    raise ScicatLoginError(raw_content)
+
+
+@dataclasses.dataclass(frozen=True)
+class _LoginEndpoint:
+    """A SciCat login endpoint."""
+
+    name: str
+    token_key: str
+    """Key of the token in the response."""
+    lifetime_key: str
+    """Key of the token lifetime in seconds in the response."""
+    failure_log_level: int
+    strip_api_version: bool
+    """Whether the endpoint is relative to the server instead of the API."""
+
+    def url(self, api_url: str) -> str:
+        if self.strip_api_version:
+            # Strip the api/vn suffix
+            api_url = re.sub(r"/api/v\d+/?", "", api_url)
+        return _url_concat(api_url, self.name)
+
+    def parse(
+        self, content: Dict[str, Any]
+    ) -> Tuple[str, Optional[datetime.timedelta]]:
+        return str(content[self.token_key]), _token_lifetime(
+            content.get(self.lifetime_key)
+        )
+
+    def log_failure(self, content: Dict[str, Any]) -> None:
+        get_logger().log(
+            self.failure_log_level,
+            "Failed to log in via endpoint %s: %s",
+            self.name,
+            content["error"],
+        )
+
 
-    response = _log_in_via_users_login(
-        url=url, username=username, password=password, timeout=timeout
+_LOGIN_ENDPOINTS: Dict[str, _LoginEndpoint] = {
+    endpoint.name: endpoint
+    for endpoint in (
+        # Currently only used for functional accounts.
+        _LoginEndpoint(
+            name="Users/login",
+            token_key="id",  # noqa: S106
+            lifetime_key="ttl",
+            failure_log_level=logging.INFO,
+            strip_api_version=False,
+        ),
+        # Used for user accounts.
+        _LoginEndpoint(
+            name="auth/msad",
+            token_key="access_token",  # noqa: S106
+            lifetime_key="expires_in",
+            failure_log_level=logging.ERROR,
+            strip_api_version=True,
+        ),
     )
-    if response.ok:
-        return str(response.json()["id"])  # not sure if semantically correct
+}
 
-    response = _log_in_via_auth_msad(
-        url=url, username=username, password=password, timeout=timeout
+
+def _login_endpoints(first_endpoint: Optional[str] = None) -> List[_LoginEndpoint]:
+    """Return the login endpoints in the order in which to try them."""
+    return sorted(
+        _LOGIN_ENDPOINTS.values(), key=lambda endpoint: endpoint.name != first_endpoint
     )
-    if response.ok:
-        return str(response.json()["access_token"])
 
-    get_logger().error("Failed log in:  %s", response.json()["error"])
-    raise ScicatLoginError(response.content)
+
+def _login_payload(username: StrStorage, password: StrStorage) -> Dict[str, str]:
+    return {"username": username.get_str(), "password": password.get_str()}
+
+
+def _token_lifetime(seconds: Any) -> Optional[datetime.timedelta]:
+    try:
+        return datetime.timedelta(seconds=float(seconds))
+    except (TypeError, ValueError):
+        return None
 
 
 FileSelector = Union[
@@ -1002,6 +2761,69 @@ FileSelector = Union[
 ]
 
 
+def _create_all(
+    create: Callable[[U], T], items: List[U], *, max_concurrency: int
+) -> List[T]:
+    # Call `create` for all items concurrently and return the results in order.
+    # Concurrent calls all run to completion even if some fail.
+    # The error of the first failed item is raised.
+    if len(items) < 2 or max_concurrency < 2:
+        return [create(item) for item in items]
+    with ThreadPoolExecutor(max_workers=min(max_concurrency, len(items))) as executor:
+        futures = [executor.submit(create, item) for item in items]
+    return [future.result() for future in futures]
+
+
+@dataclasses.dataclass
+class _DatasetModels:
+    dataset: model.DownloadDataset
+    orig_datablocks: List[model.DownloadOrigDatablock]
+    attachments: Optional[List[model.DownloadAttachment]]
+
+
+def _group_dataset_models(
+    dataset_models: List[model.DownloadDataset],
+    orig_datablock_models: List[model.DownloadOrigDatablock],
+    attachment_models: Optional[List[model.DownloadAttachment]],
+) -> Dict[PID, _DatasetModels]:
+    grouped = {
+        dset.pid: _DatasetModels(
+            dataset=dset,
+            orig_datablocks=[],
+            attachments=None if attachment_models is None else [],
+        )
+        for dset in dataset_models
+        if dset.pid is not None
+    }
+    for dblock in orig_datablock_models:
+        if (models := grouped.get(dblock.datasetId)) is not None:  # type: ignore[arg-type]
+            models.orig_datablocks.append(dblock)
+    for attachment in attachment_models or ():
+        if (models := grouped.get(attachment.datasetId)) is not None:  # type: ignore[arg-type]
+            models.attachments.append(attachment)  # type: ignore[union-attr]
+    return grouped
+
+
+def _dataset_from_models(
+    pid: PID,
+    models: Union[_DatasetModels, Exception, None],
+    *,
+    fetched_fields: Optional[List[str]] = None,
+) -> Union[Dataset, Exception]:
+    if models is None:
+        return ScicatCommError(
+            f"Cannot get dataset with {pid=}, no such dataset in SciCat."
+        )
+    if isinstance(models, Exception):
+        return models
+    return Dataset.from_download_models(
+        dataset_model=models.dataset,
+        orig_datablock_models=models.orig_datablocks,
+        attachment_models=models.attachments,
+        fetched_fields=fetched_fields,
+    )
+
+
 def _file_selector(select: FileSelector) -> Callable[[File], bool]:
     if select is True:
         return lambda _: True
@@ -1027,6 +2849,14 @@ def _remove_up_to_date_local_files(
     files: List[File], checksum_algorithm: Optional[str]
 ) -> List[File]:
     def is_up_to_date(file: File) -> bool:
+        # Comparing sizes is cheap and catches incomplete files
+        # without computing a checksum.
+        if (
+            file._remote_size is not None
+            and file.local_path.stat().st_size  # type: ignore[union-attr]
+            != file._remote_size
+        ):
+            return False
         if checksum_algorithm is not None:
             file = dataclasses.replace(file, checksum_algorithm=checksum_algorithm)
         return file.local_is_up_to_date()
@@ -49,6 +49,8 @@ class OrigDatablock:
     def from_download_model(
         cls,
         orig_datablock_model: DownloadOrigDatablock,
+        *,
+        files: Optional[Iterable[File]] = None,
     ) -> OrigDatablock:
         """Construct a new OrigDatablock from pydantic models.
 
@@ -56,6 +58,9 @@ class OrigDatablock:
         ----------
         orig_datablock_model:
             Model of the orig datablock to construct.
+        files:
+            If given, use these files instead of the ``dataFileList``
+            of the model.
 
         Returns
         -------
@@ -77,7 +82,9 @@ class OrigDatablock:
             init_files=[
                 File.from_download_model(file, checksum_algorithm=dblock.chkAlg)
                 for file in dblock.dataFileList or ()
-            ],
+            ]
+            if files is None
+            else files,
         )
 
     @property
@@ -10,7 +10,9 @@ from datetime import datetime, timezone
 from pathlib import Path
 from typing import (
     Any,
+    Callable,
     Dict,
+    FrozenSet,
     Generator,
     Iterable,
     List,
@@ -42,12 +44,19 @@ from .pid import PID
 class Dataset(DatasetBase):
     """Metadata and linked data files for a measurement, simulation, or analysis."""
 
+    # Downloads the orig datablocks of a lazily loaded dataset.
+    # Set by scitacean.Client.get_dataset and cleared once the datablocks are loaded.
+    _orig_datablock_loader: Optional[Callable[[], Iterable[OrigDatablock]]] = None
+    _unfetched_fields: FrozenSet[str] = frozenset()
+
     @classmethod
     def from_download_models(
         cls,
         dataset_model: DownloadDataset,
-        orig_datablock_models: List[DownloadOrigDatablock],
+        orig_datablock_models: Iterable[Union[DownloadOrigDatablock, OrigDatablock]],
         attachment_models: Optional[Iterable[DownloadAttachment]] = None,
+        *,
+        fetched_fields: Optional[Iterable[str]] = None,
     ) -> Dataset:
         """Construct a new dataset from SciCat download models.
 
@@ -57,10 +66,16 @@ class Dataset(DatasetBase):
             Model of the dataset.
         orig_datablock_models:
             List of all associated original datablock models for the dataset.
+            Elements may also be already converted :class:`OrigDatablock` objects.
         attachment_models:
             List of all associated attachment models for the dataset.
             Use ``None`` if the attachments were not downloaded.
             Use an empty list if the attachments were downloaded, but there aren't any.
+        fetched_fields:
+            SciCat names of the fields that were downloaded
+            if ``dataset_model`` only contains a subset of fields.
+            All other fields are listed in :attr:`Dataset.unfetched_fields`.
+            If ``None``, all fields were downloaded.
 
         Returns
         -------
@@ -76,8 +91,13 @@ class Dataset(DatasetBase):
         )
         if orig_datablock_models is not None:
             dset._orig_datablocks.extend(
-                map(OrigDatablock.from_download_model, orig_datablock_models)
+                dblock
+                if isinstance(dblock, OrigDatablock)
+                else OrigDatablock.from_download_model(dblock)
+                for dblock in orig_datablock_models
             )
+        if fetched_fields is not None:
+            dset._unfetched_fields = _unfetched_fields(fetched_fields)
         return dset
 
     @classmethod
@@ -138,8 +158,11 @@ class Dataset(DatasetBase):
             getattr(self, field.name) == getattr(other, field.name)
             for field in Dataset.fields()
         )
+        # Do not load files here because that may require a (closed) client.
+        # Datasets with unloaded files are only equal if they share a loader.
         eq = (
             eq
+            and self._orig_datablock_loader is other._orig_datablock_loader
             and self._orig_datablocks == other._orig_datablocks
             and self._attachments == other._attachments
         )
@@ -153,7 +176,7 @@ class Dataset(DatasetBase):
 
         Corresponds to OrigDatablocks.
         """
-        return sum(len(tuple(dblock.files)) for dblock in self._orig_datablocks)
+        return sum(len(tuple(dblock.files)) for dblock in self._get_orig_datablocks())
 
     @property
     def number_of_files_archived(self) -> int:
@@ -183,7 +206,7 @@ class Dataset(DatasetBase):
         """Files linked with the dataset."""
         return tuple(
             itertools.chain.from_iterable(
-                dblock.files for dblock in self._orig_datablocks
+                dblock.files for dblock in self._get_orig_datablocks()
             )
         )
 
@@ -267,6 +290,7 @@ class Dataset(DatasetBase):
             as keyword arguments are replaced by the given values.
         """
         _read_only = _read_only or {}
+        unfetched_fields = self._unfetched_fields.difference(replacements, _read_only)
 
         def get_val(source: Dict[str, Any], name: str) -> Any:
             try:
@@ -293,12 +317,16 @@ class Dataset(DatasetBase):
         dset = Dataset(
             **kwargs,
         )
-        dset._orig_datablocks.extend(
-            _orig_datablocks if _orig_datablocks is not None else self._orig_datablocks
-        )
+        if _orig_datablocks is not None:
+            dset._orig_datablocks.extend(_orig_datablocks)
+        else:
+            # Do not trigger loading; the new dataset loads the files on demand.
+            dset._orig_datablocks.extend(self._orig_datablocks)
+            dset._orig_datablock_loader = self._orig_datablock_loader
         dset._attachments = list(attachments) if attachments is not None else None
         for key, val in read_only.items():
             setattr(dset, "_" + key, val)
+        dset._unfetched_fields = unfetched_fields
         return dset
 
     def as_new(self) -> Dataset:
@@ -392,7 +420,7 @@ class Dataset(DatasetBase):
         return self.replace(
             _orig_datablocks=[
                 dataclasses.replace(dblock, init_files=map(new_or_old, dblock.files))
-                for dblock in self._orig_datablocks
+                for dblock in self._get_orig_datablocks()
             ]
         )
 
@@ -413,12 +441,52 @@ class Dataset(DatasetBase):
         dblock = OrigDatablock(
             checksum_algorithm=checksum_algorithm, _dataset_id=self.pid
         )
-        self._orig_datablocks.append(dblock)
+        self._get_orig_datablocks().append(dblock)
         return dblock
 
+    @property
+    def unfetched_fields(self) -> FrozenSet[str]:
+        """Names of fields that were not downloaded from SciCat.
+
+        Datasets that were downloaded with a ``fields`` argument, e.g., by
+        :meth:`scitacean.Client.get_dataset`, only contain the requested fields.
+        All other fields are ``None`` (or empty for ``meta``)
+        regardless of their values in SciCat.
+        Fields that are assigned by :meth:`Dataset.replace` are
+        considered fetched.
+        """
+        return self._unfetched_fields
+
+    @property
+    def files_are_loaded(self) -> bool:
+        """Whether the files of the dataset are loaded.
+
+        This is ``False`` for datasets that were downloaded with
+        ``lazy_files=True`` until their files are accessed or loaded with
+        :meth:`scitacean.Client.load_files`.
+
+        Comparing datasets does not load their files.
+        Instead, a dataset whose files are not loaded compares unequal
+        to all datasets except for itself.
+        """
+        return self._orig_datablock_loader is None
+
+    def _get_orig_datablocks(self) -> List[OrigDatablock]:
+        if self._orig_datablock_loader is not None:
+            self._set_loaded_orig_datablocks(self._orig_datablock_loader())
+        return self._orig_datablocks
+
+    def _set_loaded_orig_datablocks(
+        self, orig_datablocks: Iterable[OrigDatablock]
+    ) -> None:
+        self._orig_datablocks.extend(orig_datablocks)
+        self._orig_datablock_loader = None
+
     def _lookup_orig_datablock(self, id_: str) -> OrigDatablock:
         try:
-            return next(db for db in self._orig_datablocks if db.datablock_id == id_)
+            return next(
+                db for db in self._get_orig_datablocks() if db.datablock_id == id_
+            )
         except StopIteration:
             raise KeyError(f"No OrigDatablock with id {id_}") from None
 
@@ -428,11 +496,11 @@ class Dataset(DatasetBase):
         if isinstance(key, str):
             return self._lookup_orig_datablock(key)
         # The 0th datablock is implicitly always there and created on demand.
-        if key in (0, -1) and not self._orig_datablocks:
+        if key in (0, -1) and not self._get_orig_datablocks():
             return self.add_orig_datablock(
                 checksum_algorithm=self._default_checksum_algorithm
             )
-        return self._orig_datablocks[key]
+        return self._get_orig_datablocks()[key]
 
     def make_upload_model(self) -> Union[UploadDerivedDataset, UploadRawDataset]:
         """Construct a SciCat upload model from self."""
@@ -474,7 +542,7 @@ class Dataset(DatasetBase):
             return DatablockUploadModels(orig_datablocks=None)
         return DatablockUploadModels(
             orig_datablocks=[
-                dblock.make_upload_model(self) for dblock in self._orig_datablocks
+                dblock.make_upload_model(self) for dblock in self._get_orig_datablocks()
             ]
         )
 
@@ -508,6 +576,16 @@ class Dataset(DatasetBase):
         self.make_upload_model()
 
 
+def _unfetched_fields(fetched_fields: Iterable[str]) -> FrozenSet[str]:
+    fetched = set(fetched_fields)
+    unfetched = {
+        field.name for field in Dataset.fields() if field.scicat_name not in fetched
+    }
+    if "scientificMetadata" not in fetched:
+        unfetched.add("meta")
+    return frozenset(unfetched)
+
+
 @dataclasses.dataclass
 class DatablockUploadModels:
     """Pydantic models for (orig) datablocks."""
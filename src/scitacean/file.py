@@ -196,6 +196,18 @@ class File:
             algorithm=self.checksum_algorithm,
         )
 
+    def _cache_checksum(
+        self, value: str, *, algorithm: str, computed_at: datetime
+    ) -> None:
+        # Used by file transfers that compute the checksum while uploading.
+        if self._checksum_cache is not None and self.local_path is not None:
+            self._checksum_cache.store(
+                path=self.local_path,
+                algorithm=algorithm,
+                value=value,
+                access_time=computed_at,
+            )
+
     def remote_access_path(
         self, source_folder: Union[RemotePath, str]
     ) -> Optional[RemotePath]:
@@ -418,6 +430,18 @@ class _Checksum:
             self._update(path=path, algorithm=algorithm)
         return self._value  # type: ignore[return-value]
 
+    def store(
+        self, *, path: Path, algorithm: str, value: str, access_time: datetime
+    ) -> None:
+        """Store a checksum that was computed elsewhere.
+
+        ``access_time`` must be the time when reading the file started.
+        """
+        self._value = value
+        self._path = path
+        self._algorithm = algorithm
+        self._access_time = access_time
+
     def _is_out_of_date(self, *, path: Path, algorithm: str) -> bool:
         return (
             self._access_time is None
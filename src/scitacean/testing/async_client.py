@@ -0,0 +1,182 @@
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright (c) 2023 SciCat Project (https://github.com/SciCatProject/scitacean)
+"""Fake asynchronous client for testing."""
+
+from __future__ import annotations
+
+import datetime
+from typing import Dict, List, Optional, Union
+
+from .. import model
+from ..async_client import AsyncClient, AsyncScicatClient
+from ..client import ScicatClient
+from ..pid import PID
+from ..typing import AsyncFileTransfer
+from ..util.credentials import StrStorage
+from .client import FakeScicatClient
+
+
+# Inherits from AsyncClient to satisfy type hints.
+class FakeAsyncClient(AsyncClient):
+    """Mimics an asynchronous client without accessing the internet.
+
+    This class is a stand in for :class:`scitacean.async_client.AsyncClient`
+    and the asynchronous counterpart of :class:`scitacean.testing.client.FakeClient`.
+    It stores and processes models in the same way as ``FakeClient``.
+    See there for details.
+
+    Examples
+    --------
+    Upload a dataset:
+
+    .. code-block:: python
+
+        client = FakeAsyncClient(
+            file_transfer=ThreadedFileTransfer(FakeFileTransfer())
+        )
+        finalized = await client.upload_new_dataset_now(dset)
+
+        # contains new dataset and datablock:
+        client.datasets[finalized.pid]
+        client.orig_datablocks[finalized.pid]
+
+    See Also
+    --------
+    scitacean.testing.client.FakeClient:
+        Blocking fake client.
+    scitacean.transfer.util.ThreadedFileTransfer:
+        Use a (fake) blocking file transfer with asynchronous clients.
+    """
+
+    def __init__(
+        self,
+        *,
+        file_transfer: Optional[AsyncFileTransfer] = None,
+        disable: Optional[Dict[str, Exception]] = None,
+    ) -> None:
+        """Initialize a fake client with empty dataset storage.
+
+        Parameters
+        ----------
+        file_transfer:
+            Typically a :class:`scitacean.testing.transfer.FakeFileTransfer`
+            wrapped in :class:`scitacean.transfer.util.ThreadedFileTransfer`
+            but may be a real file transfer.
+        disable:
+            ``dict`` of function names to exceptions.
+            Functions listed here raise the given exception
+            when called and do nothing else.
+        """
+        super().__init__(
+            client=FakeAsyncScicatClient(self), file_transfer=file_transfer
+        )
+
+        self.disabled = {} if disable is None else dict(disable)
+        self.datasets: Dict[PID, model.DownloadDataset] = {}
+        self.orig_datablocks: Dict[PID, List[model.DownloadOrigDatablock]] = {}
+        self.attachments: Dict[PID, List[model.DownloadAttachment]] = {}
+
+    @classmethod
+    def from_token(
+        cls,
+        *,
+        url: str,
+        token: Union[str, StrStorage],
+        file_transfer: Optional[AsyncFileTransfer] = None,
+    ) -> FakeAsyncClient:
+        """Create a new fake client.
+
+        All arguments except ``file_Transfer`` are ignored.
+        """
+        return FakeAsyncClient(file_transfer=file_transfer)
+
+    @classmethod
+    async def from_credentials(
+        cls,
+        *,
+        url: str,
+        username: Union[str, StrStorage],
+        password: Union[str, StrStorage],
+        file_transfer: Optional[AsyncFileTransfer] = None,
+    ) -> FakeAsyncClient:
+        """Create a new fake client.
+
+        All arguments except ``file_Transfer`` are ignored.
+        """
+        return FakeAsyncClient(file_transfer=file_transfer)
+
+    @classmethod
+    def without_login(
+        cls, *, url: str, file_transfer: Optional[AsyncFileTransfer] = None
+    ) -> FakeAsyncClient:
+        """Create a new fake client.
+
+        All arguments except ``file_Transfer`` are ignored.
+        """
+        return FakeAsyncClient(file_transfer=file_transfer)
+
+
+class FakeAsyncScicatClient(AsyncScicatClient):
+    """Mimics an AsyncScicatClient, to be used by FakeAsyncClient.
+
+    Delegates to :class:`scitacean.testing.client.FakeScicatClient`
+    which operates on the storage of the main client.
+    """
+
+    def __init__(self, main_client: FakeAsyncClient) -> None:
+        # Do not call super().__init__ because that would open an HTTP client.
+        self._base_url = ""
+        self._timeout = datetime.timedelta(seconds=60)
+        self._token = None
+        self.main = main_client
+        # FakeScicatClient only accesses the storage and `disabled`
+        # which FakeAsyncClient provides in the same way as FakeClient.
+        self._fake: ScicatClient = FakeScicatClient(
+            main_client  # type: ignore[arg-type]
+        )
+
+    async def close(self) -> None:
+        """Do nothing, the fake client holds no connections."""
+
+    async def get_dataset_model(
+        self, pid: PID, strict_validation: bool = False
+    ) -> model.DownloadDataset:
+        """Fetch a dataset from SciCat."""
+        return self._fake.get_dataset_model(pid, strict_validation=strict_validation)
+
+    async def get_orig_datablocks(
+        self, pid: PID, strict_validation: bool = False
+    ) -> List[model.DownloadOrigDatablock]:
+        """Fetch an orig datablock from SciCat."""
+        return self._fake.get_orig_datablocks(pid, strict_validation=strict_validation)
+
+    async def get_attachments_for_dataset(
+        self, pid: PID, strict_validation: bool = False
+    ) -> List[model.DownloadAttachment]:
+        """Fetch all attachments from SciCat for a given dataset."""
+        return self._fake.get_attachments_for_dataset(
+            pid, strict_validation=strict_validation
+        )
+
+    async def create_dataset_model(
+        self, dset: Union[model.UploadDerivedDataset, model.UploadRawDataset]
+    ) -> model.DownloadDataset:
+        """Create a new dataset in SciCat."""
+        return self._fake.create_dataset_model(dset)
+
+    async def create_orig_datablock(
+        self, dblock: model.UploadOrigDatablock
+    ) -> model.DownloadOrigDatablock:
+        """Create a new orig datablock in SciCat."""
+        return self._fake.create_orig_datablock(dblock)
+
+    async def create_attachment_for_dataset(
+        self,
+        attachment: model.UploadAttachment,
+        *,
+        dataset_id: PID,
+    ) -> model.DownloadAttachment:
+        """Create a new attachment for a dataset in SciCat."""
+        return self._fake.create_attachment_for_dataset(
+            attachment, dataset_id=dataset_id
+        )
@@ -8,14 +8,26 @@ import datetime
 import functools
 import uuid
 from copy import deepcopy
-from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
 
 from .. import model
 from ..client import Client, ScicatClient
+from ..datablock import OrigDatablock
 from ..error import ScicatCommError
 from ..pid import PID
 from ..typing import FileTransfer
 from ..util.credentials import StrStorage
+from ..util.token_cache import TokenCache
 
 
 def _conditionally_disabled(func: Callable[..., Any]) -> Callable[..., Any]:
@@ -149,6 +161,8 @@ class FakeClient(Client):
         username: Union[str, StrStorage],
         password: Union[str, StrStorage],
         file_transfer: Optional[FileTransfer] = None,
+        renew_token: bool = False,
+        token_cache: Optional[TokenCache] = None,
     ) -> FakeClient:
         """Create a new fake client.
 
@@ -176,14 +190,19 @@ class FakeScicatClient(ScicatClient):
 
     @_conditionally_disabled
     def get_dataset_model(
-        self, pid: PID, strict_validation: bool = False
+        self,
+        pid: PID,
+        strict_validation: bool = False,
+        *,
+        fields: Optional[Iterable[str]] = None,
     ) -> model.DownloadDataset:
         """Fetch a dataset from SciCat."""
         _ = strict_validation  # unused by fake
         try:
-            return self.main.datasets[pid]
+            dset = self.main.datasets[pid]
         except KeyError:
             raise ScicatCommError(f"Unable to retrieve dataset {pid}") from None
+        return _project_datasets([dset], fields)[0]
 
     @_conditionally_disabled
     def get_orig_datablocks(
@@ -198,6 +217,20 @@ class FakeScicatClient(ScicatClient):
                 f"Unable to retrieve orig datablock for dataset {pid}"
             ) from None
 
+    @_conditionally_disabled
+    def iter_orig_datablocks(
+        self, pid: PID, strict_validation: bool = False
+    ) -> Iterator[OrigDatablock]:
+        """Fetch all orig datablocks for a given dataset."""
+        _ = strict_validation  # unused by fake
+        try:
+            dblocks = self.main.orig_datablocks[pid]
+        except KeyError:
+            raise ScicatCommError(
+                f"Unable to retrieve orig datablock for dataset {pid}"
+            ) from None
+        return iter(list(map(OrigDatablock.from_download_model, dblocks)))
+
     @_conditionally_disabled
     def get_attachments_for_dataset(
         self, pid: PID, strict_validation: bool = False
@@ -206,6 +239,77 @@ class FakeScicatClient(ScicatClient):
         _ = strict_validation  # unused by fake
         return self.main.attachments.get(pid) or []
 
+    @_conditionally_disabled
+    def get_dataset_models(
+        self,
+        pids: Iterable[PID],
+        strict_validation: bool = False,
+        *,
+        fields: Optional[Iterable[str]] = None,
+    ) -> List[model.DownloadDataset]:
+        """Fetch multiple datasets from SciCat."""
+        _ = strict_validation  # unused by fake
+        return _project_datasets(
+            [self.main.datasets[pid] for pid in set(pids) if pid in self.main.datasets],
+            fields,
+        )
+
+    @_conditionally_disabled
+    def query_dataset_models(
+        self,
+        filter: Optional[Dict[str, Any]] = None,
+        *,
+        fields: Optional[Iterable[str]] = None,
+        limit: Optional[int] = None,
+        skip: int = 0,
+        order: Optional[str] = None,
+        strict_validation: bool = False,
+    ) -> List[model.DownloadDataset]:
+        """Query SciCat for datasets that match a filter.
+
+        The fake only supports filters that compare fields for equality.
+        """
+        _ = strict_validation  # unused by fake
+        matches = [
+            dset
+            for dset in self.main.datasets.values()
+            if all(
+                _field_equals(getattr(dset, key, None), value)
+                for key, value in (filter or {}).items()
+            )
+        ]
+        if order is not None:
+            key, _, direction = order.partition(":")
+            matches.sort(
+                key=lambda dset: str(getattr(dset, key)), reverse=direction == "desc"
+            )
+        matches = matches[skip : None if limit is None else skip + limit]
+        return _project_datasets(matches, fields)
+
+    @_conditionally_disabled
+    def get_orig_datablocks_for_datasets(
+        self, pids: Iterable[PID], strict_validation: bool = False
+    ) -> List[model.DownloadOrigDatablock]:
+        """Fetch all orig datablocks of multiple datasets from SciCat."""
+        _ = strict_validation  # unused by fake
+        return [
+            dblock
+            for pid in set(pids)
+            for dblock in self.main.orig_datablocks.get(pid, ())
+        ]
+
+    @_conditionally_disabled
+    def get_attachments_for_datasets(
+        self, pids: Iterable[PID], strict_validation: bool = False
+    ) -> List[model.DownloadAttachment]:
+        """Fetch all attachments of multiple datasets from SciCat."""
+        _ = strict_validation  # unused by fake
+        return [
+            attachment
+            for pid in set(pids)
+            for attachment in self.main.attachments.get(pid, ())
+        ]
+
     @_conditionally_disabled
     def create_dataset_model(
         self, dset: Union[model.UploadDerivedDataset, model.UploadRawDataset]
@@ -250,6 +354,26 @@ class FakeScicatClient(ScicatClient):
         return ingested
 
 
+def _project_datasets(
+    datasets: List[model.DownloadDataset], fields: Optional[Iterable[str]]
+) -> List[model.DownloadDataset]:
+    if fields is None:
+        return datasets
+    fields = list(fields)
+    return [
+        model.DownloadDataset.model_construct(
+            **{field: getattr(dset, field) for field in fields}
+        )
+        for dset in datasets
+    ]
+
+
+def _field_equals(field: Any, value: Any) -> bool:
+    if isinstance(field, PID):
+        return str(field) == str(value)
+    return bool(field == value)
+
+
 def _model_dict(mod: model.BaseModel) -> Dict[str, Any]:
     return {
         key: deepcopy(val)
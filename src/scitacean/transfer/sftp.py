@@ -2,11 +2,30 @@
 # Copyright (c) 2023 SciCat Project (https://github.com/SciCatProject/scitacean)
 """SFTP file transfer."""
 
+import hashlib
+import json
 import os
+import queue
+import re
+import string
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import contextmanager
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
-from typing import Callable, Iterator, List, Optional, Union
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    TypeVar,
+    Union,
+)
 
 from invoke.exceptions import UnexpectedExit
 from paramiko import SFTPAttributes, SFTPClient, SSHClient
@@ -14,10 +33,23 @@ from paramiko import SFTPAttributes, SFTPClient, SSHClient
 from ..dataset import Dataset
 from ..error import FileUploadError
 from ..file import File
-from ..filesystem import RemotePath
+from ..filesystem import RemotePath, _new_hash
 from ..logging import get_logger
 from .util import source_folder_for
 
+T = TypeVar("T")
+U = TypeVar("U")
+
+# Size of blocks read from and written to files.
+_CHUNK_SIZE = 1024 * 1024
+# Appended to the names of files while they are being transferred.
+_PARTIAL_SUFFIX = ".part"
+# Maximum size of byte ranges in striped downloads.
+# Connections take the next range when they are done with their current one.
+_STRIPE_SIZE = 64 * 1024 * 1024
+# Required on Windows to avoid newline translation in os.write.
+_O_BINARY: int = getattr(os, "O_BINARY", 0)
+
 
 class SFTPDownloadConnection:
     """Connection for downloading files with SFTP.
@@ -26,24 +58,131 @@ class SFTPDownloadConnection:
     :meth:`scitacean.transfer.sftp.SFTPFileTransfer.connect_for_download`.
     """
 
-    def __init__(self, *, sftp_client: SFTPClient, host: str) -> None:
+    def __init__(
+        self,
+        *,
+        sftp_client: SFTPClient,
+        host: str,
+        connect: Optional[Callable[[], SFTPClient]] = None,
+        release: Optional[Callable[[SFTPClient], None]] = None,
+        n_connections: int = 1,
+        resumable: bool = False,
+        stripe_threshold: Optional[int] = None,
+    ) -> None:
         self._sftp_client = sftp_client
         self._host = host
+        self._n_connections = n_connections
+        self._extra_clients = _ExtraClients(
+            connect, n_connections - 1, host=host, release=release
+        )
+        self._resumable = resumable
+        self._stripe_threshold = stripe_threshold
 
     def download_files(self, *, remote: List[RemotePath], local: List[Path]) -> None:
-        """Download files from the given remote path."""
-        for r, l in zip(remote, local):
-            self.download_file(remote=r, local=l)
+        """Download files from the given remote path.
+
+        If the connection was created with ``n_connections > 1``,
+        files are downloaded in parallel over multiple connections.
+        Files that are at least as large as the ``stripe_threshold``
+        are downloaded first, one after the other, each over all connections.
+        """
+        paths = list(zip(remote, local))
+        large = self._large_files(paths)
+        if large:
+            clients = [
+                self._sftp_client,
+                *self._extra_clients.get(self._n_connections - 1),
+            ]
+            for (remote_path, local_path), size in large.items():
+                self._download_file_striped(
+                    clients, remote=remote_path, local=local_path, size=size
+                )
+            paths = [p for p in paths if p not in large]
+
+        clients = [self._sftp_client, *self._extra_clients.get(len(paths) - 1)]
+        _, error = _map_over_clients(
+            lambda client, paths: self._download_file(client, *paths),
+            paths,
+            clients,
+        )
+        if error is not None:
+            raise error
 
     def download_file(self, *, remote: RemotePath, local: Path) -> None:
         """Download a file from the given remote path."""
+        self._download_file(self._sftp_client, remote, local)
+
+    def _download_file(
+        self, sftp_client: SFTPClient, remote: RemotePath, local: Path
+    ) -> None:
         get_logger().info(
             "Downloading file %s from host %s to %s",
             remote,
             self._host,
             local,
         )
-        self._sftp_client.get(remotepath=remote.posix, localpath=os.fspath(local))
+        if self._resumable:
+            _download_resumable(sftp_client, remote=remote, local=local)
+        else:
+            sftp_client.get(remotepath=remote.posix, localpath=os.fspath(local))
+
+    def _large_files(
+        self, paths: List[Tuple[RemotePath, Path]]
+    ) -> Dict[Tuple[RemotePath, Path], int]:
+        if (
+            self._stripe_threshold is None
+            or self._resumable
+            or self._n_connections == 1
+        ):
+            return {}
+        # Stat over all connections that the downloads will use anyway
+        # to not pay one round trip per file on a single connection.
+        clients = [self._sftp_client, *self._extra_clients.get(len(paths) - 1)]
+        sizes, error = _map_over_clients(
+            lambda client, path: client.stat(path[0].posix).st_size or 0,
+            paths,
+            clients,
+        )
+        if error is not None:
+            raise error
+        return {
+            paths[index]: size
+            for index, size in sorted(sizes.items())
+            if size >= self._stripe_threshold
+        }
+
+    def _download_file_striped(
+        self, clients: List[SFTPClient], *, remote: RemotePath, local: Path, size: int
+    ) -> None:
+        get_logger().info(
+            "Downloading file %s from host %s to %s using %d connections",
+            remote,
+            self._host,
+            local,
+            len(clients),
+        )
+        # Write to a temporary file to never leave a file with holes
+        # at the target path.
+        partial = local.with_name(local.name + _PARTIAL_SUFFIX)
+        fd = os.open(partial, os.O_RDWR | os.O_CREAT | os.O_TRUNC | _O_BINARY, 0o666)
+        try:
+            _preallocate(fd, size)
+            _, error = _map_over_clients(
+                lambda client, byte_range: _download_range(
+                    client, remote, fd, *byte_range
+                ),
+                _split_into_stripes(size, len(clients)),
+                clients,
+            )
+        finally:
+            os.close(fd)
+        if error is not None:
+            partial.unlink()
+            raise error
+        os.replace(partial, local)
+
+    def _close_extra_clients(self) -> None:
+        self._extra_clients.close()
 
 
 class SFTPUploadConnection:
@@ -54,11 +193,23 @@ class SFTPUploadConnection:
     """
 
     def __init__(
-        self, *, sftp_client: SFTPClient, source_folder: RemotePath, host: str
+        self,
+        *,
+        sftp_client: SFTPClient,
+        source_folder: RemotePath,
+        host: str,
+        connect: Optional[Callable[[], SFTPClient]] = None,
+        release: Optional[Callable[[SFTPClient], None]] = None,
+        n_connections: int = 1,
+        resumable: bool = False,
     ) -> None:
         self._sftp_client = sftp_client
         self._source_folder = source_folder
         self._host = host
+        self._extra_clients = _ExtraClients(
+            connect, n_connections - 1, host=host, release=release
+        )
+        self._resumable = resumable
 
     @property
     def source_folder(self) -> RemotePath:
@@ -78,17 +229,68 @@ class SFTPUploadConnection:
             ) from None
 
     def upload_files(self, *files: File) -> List[File]:
-        """Upload files to the remote folder."""
+        """Upload files to the remote folder.
+
+        If the connection was created with ``n_connections > 1``,
+        files are uploaded in parallel over multiple connections,
+        starting with the largest files.
+        If any upload fails, all files uploaded so far are removed.
+
+        If the connection was created with ``resumable=True``,
+        files are instead uploaded to temporary names with suffix ``.part``
+        and only renamed to their final names once all uploads have succeeded.
+        If any upload or renaming fails, the temporary files are kept, and uploading
+        the same files again continues where the previous attempt stopped.
+        """
         self._make_source_folder()
-        uploaded = []
-        try:
-            uploaded.extend(self._upload_file(file) for file in files)
-        except Exception:
-            self.revert_upload(*uploaded)
-            raise
-        return uploaded
-
-    def _upload_file(self, file: File) -> File:
+        clients = [self._sftp_client, *self._extra_clients.get(len(files) - 1)]
+        order = list(range(len(files)))
+        if len(clients) > 1:
+            # Small files fill the gaps at the end instead of a large file
+            # being uploaded on its own after all others are done.
+            order.sort(key=lambda i: files[i].size, reverse=True)
+        results, error = _map_over_clients(
+            self._upload_file, [files[i] for i in order], clients
+        )
+        uploaded = {order[i]: file for i, file in results.items()}
+        if error is not None:
+            if self._resumable:
+                get_logger().info(
+                    "Upload failed, keeping partial files in %s on host %s "
+                    "to resume later",
+                    self.source_folder,
+                    self._host,
+                )
+            else:
+                self.revert_upload(*uploaded.values())
+            raise error
+        uploaded_files = [uploaded[i] for i in range(len(files))]
+        if self._resumable:
+            self._rename_staged_files(uploaded_files)
+        return uploaded_files
+
+    def _rename_staged_files(self, files: List[File]) -> None:
+        remote_paths = [self.remote_path(file.remote_path) for file in files]
+        for i, remote_path in enumerate(remote_paths):
+            try:
+                self._sftp_client.posix_rename(
+                    _staged_path(remote_path).posix, remote_path.posix
+                )
+            except OSError as exc:
+                # Keep the remaining staged files so that the upload can be resumed.
+                renamed = ", ".join(path.posix for path in remote_paths[:i]) or "none"
+                staged = ", ".join(
+                    _staged_path(path).posix for path in remote_paths[i:]
+                )
+                raise FileUploadError(
+                    f"Failed to rename {_staged_path(remote_path)} to {remote_path} "
+                    f"on host {self._host}: {exc.args}\n"
+                    f"Renamed files: {renamed}\n"
+                    f"Files that are still staged: {staged}\n"
+                    "Upload the files again to finish the upload."
+                ) from None
+
+    def _upload_file(self, sftp_client: SFTPClient, file: File) -> File:
         if file.local_path is None:
             raise ValueError(
                 f"Cannot upload file to {file.remote_path}, "
@@ -101,9 +303,27 @@ class SFTPUploadConnection:
             remote_path,
             self._host,
         )
-        st = self._sftp_client.put(
-            remotepath=remote_path.posix, localpath=os.fspath(file.local_path)
-        )
+        started = datetime.now(tz=timezone.utc)
+        checksum: Optional[str] = None
+        if self._resumable or file.checksum_algorithm is not None:
+            # Compute the checksum while uploading to read the file only once.
+            st, checksum = _upload_streaming(
+                sftp_client,
+                local=file.local_path,
+                remote=_staged_path(remote_path) if self._resumable else remote_path,
+                checksum_algorithm=file.checksum_algorithm,
+                resume=self._resumable,
+            )
+        else:
+            st = sftp_client.put(
+                remotepath=remote_path.posix, localpath=os.fspath(file.local_path)
+            )
+        if checksum is not None:
+            file._cache_checksum(
+                checksum,
+                algorithm=file.checksum_algorithm,  # type: ignore[arg-type]
+                computed_at=started,
+            )
         return file.uploaded(
             remote_gid=str(st.st_gid),
             remote_uid=str(st.st_uid),
@@ -133,6 +353,9 @@ class SFTPUploadConnection:
                     exc.result,
                 )
 
+    def _close_extra_clients(self) -> None:
+        self._extra_clients.close()
+
     def _revert_upload_single(
         self, *, remote: RemotePath, local: Optional[Path]
     ) -> None:
@@ -251,6 +474,12 @@ class SFTPFileTransfer:
         port: int = 22,
         source_folder: Optional[Union[str, RemotePath]] = None,
         connect: Optional[Callable[[str, Optional[int]], SFTPClient]] = None,
+        n_connections: int = 1,
+        resumable: bool = False,
+        stripe_threshold: Optional[int] = None,
+        pool_size: int = 0,
+        idle_timeout: timedelta = timedelta(minutes=5),
+        keepalive_interval: Optional[timedelta] = timedelta(seconds=30),
     ) -> None:
         """Construct a new SFTP file transfer.
 
@@ -269,7 +498,74 @@ class SFTPFileTransfer:
             for the server instead of the builtin method.
             The function arguments are ``host`` and ``port`` as determined by the
             arguments to ``__init__`` shown above.
+        n_connections:
+            Maximum number of connections used to transfer multiple files
+            in parallel.
+            Uploads start with the largest files.
+            Each connection is a separate SFTP session that is created with
+            ``connect`` or the builtin method.
+            Additional connections are only opened when there are multiple files
+            to transfer and are closed together with the connection
+            returned by :meth:`SFTPFileTransfer.connect_for_download` or
+            :meth:`SFTPFileTransfer.connect_for_upload`.
+            If the server refuses to open more connections, the transfer
+            uses the connections that are already open.
+        resumable:
+            If ``True``, downloads and uploads can be resumed after they were
+            interrupted.
+            Files are downloaded to a temporary file next to the target,
+            with suffix ``.part``, which is renamed to the target once complete.
+            When downloading the same file again, the download continues from the
+            end of the partial file unless the remote file has changed since.
+            Uploads work the same way but all files are only renamed once all
+            uploads have succeeded, see
+            :meth:`SFTPUploadConnection.upload_files`.
+            Before resuming an upload, the already uploaded part is compared
+            to the local file using a SHA-256 hash.
+            Resuming uploads requires a fixed source folder.
+            So ``resumable=True`` cannot be combined with a ``source_folder``
+            that contains ``"{uid}"`` because that produces a new folder
+            for every upload.
+        stripe_threshold:
+            Size in bytes from which on files are downloaded over all
+            ``n_connections`` connections at once.
+            Such files are split into byte ranges which are downloaded concurrently
+            and written into a preallocated local file.
+            This speeds up downloads of single large files if one connection
+            cannot use the available bandwidth.
+            If ``None``, every file is downloaded over a single connection.
+            Has no effect if ``n_connections == 1`` or ``resumable`` is ``True``.
+        pool_size:
+            Maximum number of idle connections that are kept open after a transfer
+            to be reused by later transfers.
+            This avoids the connection setup and authentication in every call to
+            :meth:`SFTPFileTransfer.connect_for_download` and
+            :meth:`SFTPFileTransfer.connect_for_upload`.
+            Before a pooled connection is reused, it is checked with a
+            cheap request to the server and replaced if it is broken.
+            The default, 0, disables pooling.
+            Pooled connections must be closed with :meth:`SFTPFileTransfer.close`
+            or by using the file transfer as a context manager.
+            When the pool closes a connection, it also closes the underlying
+            SSH transport, so ``connect`` must open a new transport for every client.
+        idle_timeout:
+            Pooled connections that have been idle for longer than this are closed
+            instead of being reused.
+        keepalive_interval:
+            Interval of SSH keepalive messages on pooled connections.
+            These prevent servers and firewalls from closing idle connections.
+            If ``None``, no keepalive messages are sent.
         """
+        if n_connections < 1:
+            raise ValueError(f"n_connections must be positive, got {n_connections}")
+        if pool_size < 0:
+            raise ValueError(f"pool_size must not be negative, got {pool_size}")
+        if resumable and _has_uid_field(source_folder):
+            raise ValueError(
+                "Cannot resume uploads to a source_folder with a '{uid}' field "
+                "because it changes with every upload, "
+                f"got source_folder={source_folder}"
+            )
         self._host = host
         self._port = port
         self._source_folder_pattern = (
@@ -278,6 +574,35 @@ class SFTPFileTransfer:
             else source_folder
         )
         self._connect = connect
+        self._n_connections = n_connections
+        self._resumable = resumable
+        self._stripe_threshold = stripe_threshold
+        self._pool = (
+            _ConnectionPool(
+                lambda: _connect(self._host, self._port, connect=self._connect),
+                max_idle=pool_size,
+                idle_timeout=idle_timeout,
+                keepalive_interval=keepalive_interval,
+            )
+            if pool_size > 0
+            else None
+        )
+
+    def close(self) -> None:
+        """Close all pooled connections.
+
+        Does nothing if the file transfer has no connection pool.
+        The file transfer can still be used afterwards but
+        does not pool connections anymore.
+        """
+        if self._pool is not None:
+            self._pool.close()
+
+    def __enter__(self) -> "SFTPFileTransfer":
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        self.close()
 
     def source_folder_for(self, dataset: Dataset) -> RemotePath:
         """Return the source folder used for the given dataset."""
@@ -286,11 +611,21 @@ class SFTPFileTransfer:
     @contextmanager
     def connect_for_download(self) -> Iterator[SFTPDownloadConnection]:
         """Create a connection for downloads, use as a context manager."""
-        sftp_client = _connect(self._host, self._port, connect=self._connect)
+        sftp_client = self._open_client()
+        connection = SFTPDownloadConnection(
+            sftp_client=sftp_client,
+            host=self._host,
+            connect=self._open_client,
+            release=self._release_client,
+            n_connections=self._n_connections,
+            resumable=self._resumable,
+            stripe_threshold=self._stripe_threshold,
+        )
         try:
-            yield SFTPDownloadConnection(sftp_client=sftp_client, host=self._host)
+            yield connection
         finally:
-            sftp_client.close()
+            connection._close_extra_clients()
+            self._release_client(sftp_client)
 
     @contextmanager
     def connect_for_upload(self, dataset: Dataset) -> Iterator[SFTPUploadConnection]:
@@ -303,15 +638,435 @@ class SFTPFileTransfer:
             Used to determine the target folder.
         """
         source_folder = self.source_folder_for(dataset)
-        sftp_client = _connect(self._host, self._port, connect=self._connect)
+        sftp_client = self._open_client()
+        connection = SFTPUploadConnection(
+            sftp_client=sftp_client,
+            source_folder=source_folder,
+            host=self._host,
+            connect=self._open_client,
+            release=self._release_client,
+            n_connections=self._n_connections,
+            resumable=self._resumable,
+        )
         try:
-            yield SFTPUploadConnection(
-                sftp_client=sftp_client, source_folder=source_folder, host=self._host
-            )
+            yield connection
         finally:
+            connection._close_extra_clients()
+            self._release_client(sftp_client)
+
+    def _open_client(self) -> SFTPClient:
+        if self._pool is not None:
+            return self._pool.acquire()
+        return _connect(self._host, self._port, connect=self._connect)
+
+    def _release_client(self, sftp_client: SFTPClient) -> None:
+        if self._pool is not None:
+            self._pool.release(sftp_client)
+        else:
             sftp_client.close()
 
 
+class _ConnectionPool:
+    """Idle SFTP clients that can be reused by later transfers."""
+
+    def __init__(
+        self,
+        connect: Callable[[], SFTPClient],
+        *,
+        max_idle: int,
+        idle_timeout: timedelta,
+        keepalive_interval: Optional[timedelta],
+    ) -> None:
+        self._connect = connect
+        self._max_idle = max_idle
+        self._idle_timeout = idle_timeout.total_seconds()
+        self._keepalive_interval = keepalive_interval
+        # Pairs of client and the time when it was released.
+        self._idle: List[Tuple[SFTPClient, float]] = []
+        self._closed = False
+        self._lock = threading.Lock()
+
+    def acquire(self) -> SFTPClient:
+        """Return an idle client or open a new one."""
+        while (client := self._pop_idle()) is not None:
+            if _is_healthy(client):
+                return client
+            get_logger().info("Discarding broken pooled SFTP connection")
+            _close_client(client)
+        client = self._connect()
+        if self._keepalive_interval is not None:
+            _set_keepalive(client, self._keepalive_interval)
+        return client
+
+    def release(self, client: SFTPClient) -> None:
+        """Return a client to the pool or close it if the pool is full."""
+        with self._lock:
+            expired = self._remove_expired()
+            if not self._closed and len(self._idle) < self._max_idle:
+                self._idle.append((client, time.monotonic()))
+            else:
+                expired.append(client)
+        for c in expired:
+            _close_client(c)
+
+    def close(self) -> None:
+        """Close all idle clients and stop pooling."""
+        with self._lock:
+            self._closed = True
+            idle, self._idle = self._idle, []
+        for client, _ in idle:
+            _close_client(client)
+
+    def _pop_idle(self) -> Optional[SFTPClient]:
+        with self._lock:
+            expired = self._remove_expired()
+            # Reuse the most recently used client as it is the most likely
+            # to still be alive.
+            client = self._idle.pop()[0] if self._idle else None
+        for c in expired:
+            _close_client(c)
+        return client
+
+    def _remove_expired(self) -> List[SFTPClient]:
+        cutoff = time.monotonic() - self._idle_timeout
+        expired = [client for client, released in self._idle if released < cutoff]
+        self._idle = [(c, released) for c, released in self._idle if released >= cutoff]
+        return expired
+
+
+def _is_healthy(sftp_client: SFTPClient) -> bool:
+    channel = sftp_client.get_channel()
+    if channel is not None and (
+        channel.closed or not channel.get_transport().is_active()
+    ):
+        return False
+    try:
+        sftp_client.stat(".")
+    except Exception:
+        return False
+    return True
+
+
+def _close_client(sftp_client: SFTPClient) -> None:
+    # Closing the SFTP client only closes its channel but the pool owns the
+    # whole SSH connection.
+    channel = sftp_client.get_channel()
+    sftp_client.close()
+    if channel is not None:
+        channel.get_transport().close()
+
+
+def _set_keepalive(sftp_client: SFTPClient, interval: timedelta) -> None:
+    channel = sftp_client.get_channel()
+    if channel is not None:
+        channel.get_transport().set_keepalive(max(1, int(interval.total_seconds())))
+
+
+class _ExtraClients:
+    """Lazily opened SFTP clients for parallel transfers."""
+
+    def __init__(
+        self,
+        connect: Optional[Callable[[], SFTPClient]],
+        max_count: int,
+        host: str,
+        release: Optional[Callable[[SFTPClient], None]] = None,
+    ) -> None:
+        self._connect = connect
+        self._release = release
+        self._max_count = max_count if connect is not None else 0
+        self._host = host
+        self._clients: List[SFTPClient] = []
+
+    def get(self, n: int) -> List[SFTPClient]:
+        """Return up to ``n`` clients, opening new ones as needed."""
+        n = max(0, min(n, self._max_count))
+        while len(self._clients) < n:
+            try:
+                self._clients.append(self._connect())  # type: ignore[misc]
+            except Exception as exc:
+                # Servers often limit the number of sessions per user.
+                get_logger().warning(
+                    "Failed to open additional connection to host %s, "
+                    "continuing with %d connection(s): %s",
+                    self._host,
+                    len(self._clients) + 1,
+                    exc,
+                )
+                self._max_count = len(self._clients)
+                break
+        return self._clients[:n]
+
+    def close(self) -> None:
+        for client in self._clients:
+            if self._release is not None:
+                self._release(client)
+            else:
+                client.close()
+        self._clients.clear()
+
+
+def _map_over_clients(
+    func: Callable[[SFTPClient, T], U],
+    items: Sequence[T],
+    clients: Sequence[SFTPClient],
+) -> Tuple[Dict[int, U], Optional[Exception]]:
+    """Call ``func`` for every item using one thread per client.
+
+    Threads take the next item from a shared queue whenever they are done with
+    their current one.
+    So connections that are faster or get smaller items process more of them.
+    No new items are started after the first exception.
+
+    Returns the results of all successfully processed items keyed by their index
+    and the first exception or ``None``.
+    """
+    if len(clients) == 1 or len(items) <= 1:
+        results: Dict[int, U] = {}
+        for index, item in enumerate(items):
+            try:
+                results[index] = func(clients[0], item)
+            except Exception as exc:
+                return results, exc
+        return results, None
+
+    pending: "queue.SimpleQueue[Tuple[int, T]]" = queue.SimpleQueue()
+    for index, item in enumerate(items):
+        pending.put((index, item))
+    results = {}
+    errors: List[Exception] = []
+    lock = threading.Lock()
+
+    def work(client: SFTPClient) -> None:
+        while not errors:
+            try:
+                index, item = pending.get_nowait()
+            except queue.Empty:
+                return
+            try:
+                result = func(client, item)
+            except Exception as exc:
+                with lock:
+                    errors.append(exc)
+                return
+            with lock:
+                results[index] = result
+
+    with ThreadPoolExecutor(max_workers=len(clients)) as executor:
+        # Consume the iterator to wait for all threads.
+        list(executor.map(work, clients))
+    return results, errors[0] if errors else None
+
+
+def _download_resumable(
+    sftp_client: SFTPClient, *, remote: RemotePath, local: Path
+) -> None:
+    partial = local.with_name(local.name + _PARTIAL_SUFFIX)
+    progress_path = local.with_name(local.name + _PARTIAL_SUFFIX + ".json")
+    st = sftp_client.stat(remote.posix)
+    # Identifies the version of the remote file that the partial file belongs to.
+    source = {"remote": remote.posix, "size": st.st_size, "mtime": st.st_mtime}
+
+    offset = 0
+    if partial.exists() and _read_download_progress(progress_path) == source:
+        offset = partial.stat().st_size
+    if offset > (st.st_size or 0):
+        offset = 0
+    if offset:
+        get_logger().info(
+            "Resuming download of %s at byte %d of %s", remote, offset, st.st_size
+        )
+    else:
+        progress_path.write_text(json.dumps(source))
+
+    with sftp_client.open(remote.posix, "rb") as remote_file:
+        remote_file.seek(offset)
+        remote_file.prefetch(st.st_size)
+        with partial.open("ab" if offset else "wb") as local_file:
+            while chunk := remote_file.read(_CHUNK_SIZE):
+                local_file.write(chunk)
+
+    if st.st_size is not None and partial.stat().st_size != st.st_size:
+        raise OSError(
+            f"Download of {remote} is incomplete: got {partial.stat().st_size} "
+            f"of {st.st_size} bytes"
+        )
+    os.replace(partial, local)
+    progress_path.unlink()
+
+
+def _split_into_stripes(size: int, n_clients: int) -> List[Tuple[int, int]]:
+    stripe_size = max(1, min(_STRIPE_SIZE, -(-size // n_clients)))
+    return [
+        (start, min(start + stripe_size, size)) for start in range(0, size, stripe_size)
+    ]
+
+
+def _preallocate(fd: int, size: int) -> None:
+    # Reserve the space up front so that the download fails early if the disk
+    # is too small and the file is not fragmented by the concurrent writes.
+    if hasattr(os, "posix_fallocate") and size > 0:
+        try:
+            os.posix_fallocate(fd, 0, size)
+            return
+        except OSError:
+            pass  # Not supported by the file system.
+    os.ftruncate(fd, size)
+
+
+def _download_range(
+    sftp_client: SFTPClient, remote: RemotePath, fd: int, start: int, end: int
+) -> None:
+    with sftp_client.open(remote.posix, "rb") as remote_file:
+        remote_file.seek(start)
+        remote_file.prefetch(end)
+        offset = start
+        while offset < end and (
+            chunk := remote_file.read(min(_CHUNK_SIZE, end - offset))
+        ):
+            _pwrite(fd, chunk, offset)
+            offset += len(chunk)
+    if offset != end:
+        raise OSError(
+            f"Download of {remote} is incomplete: expected bytes {start} to {end} "
+            f"but got only up to {offset}"
+        )
+
+
+_pwrite_lock = threading.Lock()
+
+
+def _pwrite(fd: int, data: bytes, offset: int) -> None:
+    if hasattr(os, "pwrite"):
+        view = memoryview(data)
+        while view:
+            n_written = os.pwrite(fd, view, offset)
+            view = view[n_written:]
+            offset += n_written
+        return
+    # Windows has no positioned writes.
+    with _pwrite_lock:
+        os.lseek(fd, offset, os.SEEK_SET)
+        os.write(fd, data)
+
+
+def _read_download_progress(path: Path) -> Optional[Dict[str, object]]:
+    try:
+        return json.loads(path.read_text())  # type: ignore[no-any-return]
+    except (OSError, ValueError):
+        return None
+
+
+def _staged_path(remote: RemotePath) -> RemotePath:
+    return RemotePath(remote.posix + _PARTIAL_SUFFIX)
+
+
+def _upload_streaming(
+    sftp_client: SFTPClient,
+    *,
+    local: Path,
+    remote: RemotePath,
+    checksum_algorithm: Optional[str],
+    resume: bool,
+) -> Tuple[SFTPAttributes, Optional[str]]:
+    """Upload a file and compute its checksum from the same reads.
+
+    If ``resume`` is ``True``, continue a previous upload to ``remote``.
+    """
+    size = local.stat().st_size
+    file_hash = _new_hash(checksum_algorithm) if checksum_algorithm else None
+    offset = (
+        _resumable_upload_offset(
+            sftp_client, local=local, remote=remote, file_hash=file_hash
+        )
+        if resume
+        else 0
+    )
+    if offset:
+        get_logger().info("Resuming upload of %s at byte %d of %d", local, offset, size)
+    elif checksum_algorithm:
+        # Discard the prefix of a mismatching partial upload.
+        file_hash = _new_hash(checksum_algorithm)
+    with local.open("rb") as local_file, sftp_client.open(
+        remote.posix, "r+b" if offset else "wb"
+    ) as remote_file:
+        # Do not wait for the server to acknowledge every write.
+        remote_file.set_pipelined(True)
+        local_file.seek(offset)
+        remote_file.seek(offset)
+        while chunk := local_file.read(_CHUNK_SIZE):
+            if file_hash is not None:
+                file_hash.update(chunk)
+            remote_file.write(chunk)
+
+    st = sftp_client.stat(remote.posix)
+    if st.st_size != size:
+        raise OSError(
+            f"Upload of {local} is incomplete: got {st.st_size} of {size} bytes"
+        )
+    return st, file_hash.hexdigest() if file_hash is not None else None
+
+
+def _resumable_upload_offset(
+    sftp_client: SFTPClient, *, local: Path, remote: RemotePath, file_hash: Any
+) -> int:
+    try:
+        offset = sftp_client.stat(remote.posix).st_size or 0
+    except FileNotFoundError:
+        return 0
+    if offset == 0 or offset > local.stat().st_size:
+        return 0
+
+    local_hash = hashlib.sha256()
+    with local.open("rb") as local_file:
+        remaining = offset
+        while remaining and (chunk := local_file.read(min(_CHUNK_SIZE, remaining))):
+            local_hash.update(chunk)
+            if file_hash is not None:
+                file_hash.update(chunk)
+            remaining -= len(chunk)
+    if _remote_prefix_sha256(sftp_client, remote, offset) != local_hash.digest():
+        get_logger().warning(
+            "Partial upload %s does not match local file %s, uploading from scratch",
+            remote,
+            local,
+        )
+        return 0
+    return offset
+
+
+def _remote_prefix_sha256(
+    sftp_client: SFTPClient, remote: RemotePath, length: int
+) -> bytes:
+    with sftp_client.open(remote.posix, "rb") as remote_file:
+        try:
+            # Let the server compute the hash if it supports the
+            # 'check-file' extension to avoid downloading the data.
+            return remote_file.check("sha256", 0, length, 0)  # type: ignore[no-any-return]
+        except OSError:
+            pass
+        remote_hash = hashlib.sha256()
+        remote_file.prefetch(length)
+        remaining = length
+        while remaining and (chunk := remote_file.read(min(_CHUNK_SIZE, remaining))):
+            remote_hash.update(chunk)
+            remaining -= len(chunk)
+        return remote_hash.digest()
+
+
+def _has_uid_field(pattern: Optional[Union[str, RemotePath]]) -> bool:
+    if pattern is None:
+        return False
+    fields = (
+        field
+        for _, field, _, _ in string.Formatter().parse(
+            pattern.posix if isinstance(pattern, RemotePath) else pattern
+        )
+        if field is not None
+    )
+    return any(re.match(r"uid\b", field) is not None for field in fields)
+
+
 def _default_connect(host: str, port: int) -> SFTPClient:
     client = SSHClient()
     client.load_system_host_keys()
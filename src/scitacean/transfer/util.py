@@ -2,13 +2,34 @@
 # Copyright (c) 2023 SciCat Project (https://github.com/SciCatProject/scitacean)
 """Common utilities for file transfers."""
 
-from typing import Optional, Union
+from __future__ import annotations
+
+import asyncio
+import functools
+import sys
+from concurrent.futures import Executor
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import (
+    Any,
+    AsyncIterator,
+    Callable,
+    ContextManager,
+    List,
+    Optional,
+    TypeVar,
+    Union,
+)
 from uuid import uuid4
 
 from ..dataset import Dataset
+from ..file import File
 from ..filesystem import RemotePath
+from ..typing import DownloadConnection, FileTransfer, UploadConnection
 from ..util.formatter import DatasetPathFormatter
 
+T = TypeVar("T")
+
 
 def source_folder_for(
     dataset: Dataset, pattern: Optional[Union[str, RemotePath]]
@@ -42,3 +63,134 @@ def source_folder_for(
     return RemotePath(
         DatasetPathFormatter().format(pattern, dset=dataset, uid=str(uuid4()))
     )
+
+
+class ThreadedDownloadConnection:
+    """Asynchronous wrapper around a blocking download connection.
+
+    Should be created using :meth:`ThreadedFileTransfer.connect_for_download`.
+    """
+
+    def __init__(
+        self, connection: DownloadConnection, executor: Optional[Executor]
+    ) -> None:
+        self._connection = connection
+        self._executor = executor
+
+    async def download_files(
+        self, *, remote: List[RemotePath], local: List[Path]
+    ) -> None:
+        """Download files in a worker thread."""
+        await _run_in_executor(
+            self._executor, self._connection.download_files, remote=remote, local=local
+        )
+
+
+class ThreadedUploadConnection:
+    """Asynchronous wrapper around a blocking upload connection.
+
+    Should be created using :meth:`ThreadedFileTransfer.connect_for_upload`.
+    """
+
+    def __init__(
+        self, connection: UploadConnection, executor: Optional[Executor]
+    ) -> None:
+        self._connection = connection
+        self._executor = executor
+
+    async def upload_files(self, *files: File) -> List[File]:
+        """Upload files in a worker thread."""
+        return await _run_in_executor(
+            self._executor, self._connection.upload_files, *files
+        )
+
+    async def revert_upload(self, *files: File) -> None:
+        """Revert an upload in a worker thread."""
+        await _run_in_executor(self._executor, self._connection.revert_upload, *files)
+
+
+class ThreadedFileTransfer:
+    """Use a blocking file transfer with asynchronous clients.
+
+    Connections are opened, used, and closed in worker threads such that
+    the event loop is never blocked by file transfers.
+    This satisfies :class:`scitacean.typing.AsyncFileTransfer` for any
+    :class:`scitacean.typing.FileTransfer`, e.g.,
+    :class:`scitacean.transfer.sftp.SFTPFileTransfer`.
+
+    Examples
+    --------
+    .. code-block:: python
+
+        client = AsyncClient.from_token(
+            url="...",
+            token="...",
+            file_transfer=ThreadedFileTransfer(SFTPFileTransfer(host="fileserver")),
+        )
+    """
+
+    def __init__(
+        self, file_transfer: FileTransfer, *, executor: Optional[Executor] = None
+    ) -> None:
+        """Wrap a blocking file transfer.
+
+        Parameters
+        ----------
+        file_transfer:
+            The file transfer that performs the actual work.
+        executor:
+            Run blocking operations with this executor.
+            If ``None``, the event loop's default executor is used.
+        """
+        self._file_transfer = file_transfer
+        self._executor = executor
+
+    @property
+    def file_transfer(self) -> FileTransfer:
+        """The wrapped blocking file transfer."""
+        return self._file_transfer
+
+    def source_folder_for(self, dataset: Dataset) -> RemotePath:
+        """Return the source folder used for the given dataset."""
+        return self._file_transfer.source_folder_for(dataset)
+
+    @asynccontextmanager
+    async def connect_for_download(self) -> AsyncIterator[ThreadedDownloadConnection]:
+        """Create a connection for downloads, use as an async context manager."""
+        async with _enter_in_executor(
+            self._executor, self._file_transfer.connect_for_download()
+        ) as con:
+            yield ThreadedDownloadConnection(con, self._executor)
+
+    @asynccontextmanager
+    async def connect_for_upload(
+        self, dataset: Dataset
+    ) -> AsyncIterator[ThreadedUploadConnection]:
+        """Create a connection for uploads, use as an async context manager."""
+        async with _enter_in_executor(
+            self._executor, self._file_transfer.connect_for_upload(dataset)
+        ) as con:
+            yield ThreadedUploadConnection(con, self._executor)
+
+
+async def _run_in_executor(
+    executor: Optional[Executor], func: Callable[..., T], *args: Any, **kwargs: Any
+) -> T:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        executor, functools.partial(func, *args, **kwargs)
+    )
+
+
+@asynccontextmanager
+async def _enter_in_executor(
+    executor: Optional[Executor], manager: ContextManager[T]
+) -> AsyncIterator[T]:
+    value = await _run_in_executor(executor, manager.__enter__)
+    try:
+        yield value
+    except BaseException:
+        if not await _run_in_executor(executor, manager.__exit__, *sys.exc_info()):
+            raise
+    else:
+        await _run_in_executor(executor, manager.__exit__, None, None, None)
@@ -4,7 +4,7 @@
 """Definitions for type checking."""
 
 from pathlib import Path
-from typing import ContextManager, List, Protocol
+from typing import AsyncContextManager, ContextManager, List, Protocol
 
 from .dataset import Dataset
 from .file import File
@@ -107,3 +107,102 @@ class Uploader(Protocol):
 
 class FileTransfer(Downloader, Uploader, Protocol):
     """Handler for file down-/uploads."""
+
+
+class AsyncDownloadConnection(Protocol):
+    """An open connection to the file server for asynchronous downloads."""
+
+    async def download_files(
+        self, *, remote: List[RemotePath], local: List[Path]
+    ) -> None:
+        """Download files from the file server.
+
+        Parameters
+        ----------
+        remote:
+            The full path to the file on the server.
+        local:
+            Desired path of the file on the local filesystem.
+        """
+
+
+class AsyncDownloader(Protocol):
+    """Handler for asynchronous file downloads."""
+
+    def connect_for_download(self) -> AsyncContextManager[AsyncDownloadConnection]:
+        """Open a connection to the file server.
+
+        Returns
+        -------
+        :
+            A connection object that can download files.
+        """
+
+
+class AsyncUploadConnection(Protocol):
+    """An open connection to the file server for asynchronous uploads."""
+
+    async def upload_files(self, *files: File) -> List[File]:
+        """Upload files to the file server.
+
+        Parameters
+        ----------
+        files:
+            Specify which files to upload including local and remote paths.
+
+        Returns
+        -------
+        :
+            Updated files with added remote parameters.
+            For each returned file, both ``file.is_on_remote`` and
+            ``file.is_on_local`` are true.
+        """
+
+    async def revert_upload(self, *files: File) -> None:
+        """Delete files uploaded by upload_file.
+
+        Only files uploaded by the same connection object may be handled.
+
+        Parameters
+        ----------
+        files:
+            Specify which files to delete.
+        """
+
+
+class AsyncUploader(Protocol):
+    """Handler for asynchronous file uploads."""
+
+    def source_folder_for(self, dataset: Dataset) -> RemotePath:
+        """Files are uploaded to this directory / location.
+
+        Parameters
+        ----------
+        dataset:
+            Determine the source folder for this dataset.
+
+        Returns
+        -------
+        :
+            The source folder for ``dataset``.
+        """
+
+    def connect_for_upload(
+        self, dataset: Dataset
+    ) -> AsyncContextManager[AsyncUploadConnection]:
+        """Open a connection to the file server.
+
+        Parameters
+        ----------
+        dataset:
+            Dataset whose files will be uploaded.
+
+        Returns
+        -------
+        :
+            A connection object that can upload files.
+        """
+
+
+class AsyncFileTransfer(AsyncDownloader, AsyncUploader, Protocol):
+    """Handler for asynchronous file down-/uploads."""
@@ -0,0 +1,137 @@
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright (c) 2023 SciCat Project (https://github.com/SciCatProject/scitacean)
+"""In-memory cache for metadata downloaded from SciCat."""
+from __future__ import annotations
+
+import dataclasses
+import datetime
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+
+@dataclasses.dataclass
+class _CacheEntry:
+    content: Any
+    expires_at: float
+    etag: Optional[str]
+    last_modified: Optional[str]
+    # Models constructed from `content`, keyed by how they were constructed.
+    models: Dict[Hashable, Any] = dataclasses.field(default_factory=dict)
+
+    def is_fresh(self, now: float) -> bool:
+        return now < self.expires_at
+
+    def can_revalidate(self) -> bool:
+        return self.etag is not None or self.last_modified is not None
+
+
+class MetadataCache:
+    """Cache for responses of GET requests to SciCat.
+
+    Used by :class:`scitacean.client.ScicatClient` to avoid repeatedly
+    downloading the same metadata and constructing the same models.
+
+    Entries are evicted when they are least recently used and the cache is full.
+    Entries older than ``ttl`` are not used directly.
+    Instead, the client asks the server whether the entry is still up-to-date
+    using ``ETag`` or ``Last-Modified`` headers if the server provided them.
+    Otherwise, the entry is downloaded again.
+
+    The cache is cleared whenever the client that uses it
+    creates something in SciCat.
+
+    A cache can be shared between multiple clients.
+    Entries are keyed by the SciCat URL and the login token of the client,
+    so clients of different users do not see each other's responses.
+
+    Parameters
+    ----------
+    max_size:
+        Maximum number of responses to store.
+    ttl:
+        Time for which responses are used without contacting the server.
+
+    Examples
+    --------
+    Reuse datasets that are downloaded repeatedly within one minute:
+
+    .. code-block:: python
+
+        client = Client(
+            client=ScicatClient.from_token(
+                url=url,
+                token=token,
+                cache=MetadataCache(ttl=datetime.timedelta(minutes=1)),
+            ),
+            file_transfer=None,
+        )
+    """
+
+    def __init__(
+        self,
+        *,
+        max_size: int = 1024,
+        ttl: datetime.timedelta = datetime.timedelta(minutes=5),
+    ) -> None:
+        if max_size < 1:
+            raise ValueError(f"max_size must be positive, got {max_size}")
+        self._max_size = max_size
+        self._ttl = ttl.total_seconds()
+        self._entries: OrderedDict[Tuple[str, ...], _CacheEntry] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def max_size(self) -> int:
+        """Maximum number of responses to store."""
+        return self._max_size
+
+    @property
+    def ttl(self) -> datetime.timedelta:
+        """Time for which responses are used without contacting the server."""
+        return datetime.timedelta(seconds=self._ttl)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        with self._lock:
+            self._entries.clear()
+
+    def _get(self, key: Tuple[str, ...]) -> Optional[_CacheEntry]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if not entry.is_fresh(time.monotonic()) and not entry.can_revalidate():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def _put(
+        self,
+        key: Tuple[str, ...],
+        content: Any,
+        *,
+        etag: Optional[str],
+        last_modified: Optional[str],
+    ) -> _CacheEntry:
+        entry = _CacheEntry(
+            content=content,
+            expires_at=time.monotonic() + self._ttl,
+            etag=etag,
+            last_modified=last_modified,
+        )
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_size:
+                self._entries.popitem(last=False)
+        return entry
+
+    def _refresh(self, entry: _CacheEntry) -> None:
+        entry.expires_at = time.monotonic() + self._ttl
@@ -4,7 +4,14 @@
 from __future__ import annotations
 
 import datetime
-from typing import NoReturn, Optional, Union
+import threading
+import time
+from typing import Callable, NoReturn, Optional, Tuple, Union
+
+from ..logging import get_logger
+
+# Seconds to wait before trying again when renewing a RenewingStr failed.
+_RENEW_RETRY_DELAY = 10
 
 
 class StrStorage:
@@ -125,3 +132,106 @@ class TimeLimitedStr(StrStorage):
             f"TimeLimitedStr(expires_at={self._expires_at.isoformat()}, "
             f"value={self._value!r}"
         )
+
+
+class RenewingStr(StrStorage):
+    """A secret string that is renewed shortly before it expires.
+
+    Intended for login tokens of long-running programs.
+    The string is obtained by calling ``renew`` which returns the new string
+    and its lifetime.
+    :meth:`RenewingStr.get_str` calls ``renew`` again once less than
+    ``renew_before`` of the lifetime is left, but not before half of the
+    lifetime has passed.
+    If renewing fails while the current string is still valid,
+    the current string is returned and renewal is retried on the next call.
+
+    This class is thread-safe.
+    When multiple threads need a renewed string at the same time,
+    only one of them calls ``renew`` and the others wait for the result.
+
+    Like :class:`SecretStr`, the string is not shown by ``str`` or ``repr``.
+
+    Parameters
+    ----------
+    renew:
+        Returns a new string and its lifetime or ``None`` if the lifetime
+        is unknown.
+        Called immediately to obtain the initial string.
+    renew_before:
+        Renew the string when less than this time is left before it expires.
+        Strings with a lifetime shorter than twice this time are renewed
+        after half of their lifetime.
+    max_lifetime:
+        Renew the string at least this often, even if ``renew`` reports a longer
+        or no lifetime.
+        If ``None``, strings with unknown lifetime are never renewed.
+    """
+
+    def __init__(
+        self,
+        *,
+        renew: Callable[[], Tuple[str, Optional[datetime.timedelta]]],
+        renew_before: datetime.timedelta = datetime.timedelta(minutes=5),
+        max_lifetime: Optional[datetime.timedelta] = None,
+    ):
+        super().__init__(None)
+        self._renew = renew
+        self._renew_before = renew_before.total_seconds()
+        self._max_lifetime = (
+            max_lifetime.total_seconds() if max_lifetime is not None else None
+        )
+        self._lock = threading.Lock()
+        self._secret = ""
+        self._expires_at: Optional[float] = None
+        self._renew_at: Optional[float] = None
+        self._do_renew()
+
+    def get_str(self) -> str:
+        """Return the stored plain str object, renewing it if needed."""
+        with self._lock:
+            now = time.monotonic()
+            if self._renew_at is not None and now >= self._renew_at:
+                try:
+                    self._do_renew()
+                except Exception:
+                    if self._expires_at is not None and now >= self._expires_at:
+                        raise
+                    get_logger().warning(
+                        "Failed to renew credentials, will try again in %ds.",
+                        _RENEW_RETRY_DELAY,
+                        exc_info=True,
+                    )
+                    self._renew_at = now + _RENEW_RETRY_DELAY
+                    if self._expires_at is not None:
+                        self._renew_at = min(self._renew_at, self._expires_at)
+            return self._secret
+
+    def _do_renew(self) -> None:
+        # Measure the lifetime from before the request that produced the secret.
+        now = time.monotonic()
+        secret, lifetime = self._renew()
+        self._secret = secret
+        renew_times = []
+        if lifetime is None:
+            self._expires_at = None
+        else:
+            seconds = lifetime.total_seconds()
+            self._expires_at = now + seconds
+            # Short-lived secrets would otherwise be renewed on every access.
+            renew_times.append(
+                max(self._expires_at - self._renew_before, now + seconds / 2)
+            )
+        if self._max_lifetime is not None:
+            renew_times.append(now + self._max_lifetime)
+        self._renew_at = min(renew_times, default=None)
+
+    def __str__(self) -> str:
+        return "***"
+
+    def __repr__(self) -> str:
+        return "RenewingStr(***)"
+
+    # prevent pickling
+    def __reduce_ex__(self, protocol: object) -> NoReturn:
+        raise TypeError("RenewingStr must not be pickled")
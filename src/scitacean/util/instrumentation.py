@@ -0,0 +1,224 @@
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright (c) 2023 SciCat Project (https://github.com/SciCatProject/scitacean)
+"""Instrumentation of calls to SciCat and file servers.
+
+:class:`scitacean.client.ScicatClient` reports every HTTP request to SciCat as a
+:class:`RequestEvent` and :class:`scitacean.Client` reports every file transfer
+as a :class:`TransferEvent`.
+Events are passed to the hooks of the client and to a built-in
+:class:`CallStats` which can be queried with :meth:`scitacean.Client.stats`.
+"""
+from __future__ import annotations
+
+import dataclasses
+import math
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Callable, Deque, Dict, Iterator, List, Optional, Union
+
+from ..logging import get_logger
+
+
+@dataclasses.dataclass(frozen=True)
+class RequestEvent:
+    """A completed HTTP request to SciCat.
+
+    Every attempt of a retried request produces a separate event.
+    """
+
+    operation: str
+    """Name of the client operation, e.g., ``'get_dataset_model'``."""
+    method: str
+    """HTTP method in upper case."""
+    url: str
+    """URL relative to the API base URL with dataset IDs replaced by ``{pid}``."""
+    status_code: Optional[int]
+    """HTTP status code or ``None`` if no response was received."""
+    bytes_sent: int
+    """Size of the request body."""
+    bytes_received: int
+    """Size of the response body.
+
+    For streamed responses, this is the ``Content-Length`` if the server sent one
+    and 0 otherwise.
+    """
+    duration: float
+    """Time in seconds until the response was received."""
+
+    @property
+    def succeeded(self) -> bool:
+        """Return True if the server responded with a success status."""
+        return self.status_code is not None and self.status_code < 400
+
+
+@dataclasses.dataclass(frozen=True)
+class TransferEvent:
+    """A completed up- or download of files to or from the file server."""
+
+    operation: str
+    """One of ``'upload_files'``, ``'download_files'``, or ``'revert_upload'``."""
+    n_files: int
+    """Number of transferred files."""
+    bytes_sent: int
+    """Total size of uploaded files."""
+    bytes_received: int
+    """Total size of downloaded files."""
+    duration: float
+    """Time in seconds taken by the transfer."""
+    succeeded: bool
+    """False if the transfer raised an exception."""
+
+
+Event = Union[RequestEvent, TransferEvent]
+"""Any event reported by the clients."""
+
+Hook = Callable[[Event], None]
+"""Callable that receives events."""
+
+
+@dataclasses.dataclass(frozen=True)
+class OperationStats:
+    """Aggregated statistics of one operation."""
+
+    count: int
+    """Number of calls."""
+    failures: int
+    """Number of failed calls."""
+    bytes_sent: int
+    """Total number of bytes sent."""
+    bytes_received: int
+    """Total number of bytes received."""
+    total_duration: float
+    """Total time in seconds spent in calls."""
+    p50: float
+    """Median of the latency in seconds."""
+    p90: float
+    """90th percentile of the latency in seconds."""
+    p99: float
+    """99th percentile of the latency in seconds."""
+
+
+class _OperationRecord:
+    def __init__(self, window: int) -> None:
+        self.count = 0
+        self.failures = 0
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.total_duration = 0.0
+        self.durations: Deque[float] = deque(maxlen=window)
+
+    def add(self, event: Event) -> None:
+        self.count += 1
+        self.failures += not event.succeeded
+        self.bytes_sent += event.bytes_sent
+        self.bytes_received += event.bytes_received
+        self.total_duration += event.duration
+        self.durations.append(event.duration)
+
+    def summarize(self) -> OperationStats:
+        durations = sorted(self.durations)
+        return OperationStats(
+            count=self.count,
+            failures=self.failures,
+            bytes_sent=self.bytes_sent,
+            bytes_received=self.bytes_received,
+            total_duration=self.total_duration,
+            p50=_percentile(durations, 50),
+            p90=_percentile(durations, 90),
+            p99=_percentile(durations, 99),
+        )
+
+
+class CallStats:
+    """Aggregate events per operation.
+
+    Counts, failures, and transferred bytes are accumulated over all events.
+    Latency percentiles are computed from the most recent ``window``
+    events of each operation.
+
+    Instances are hooks and can be passed to a client
+    in addition to the built-in one.
+
+    Parameters
+    ----------
+    window:
+        Number of events per operation used for latency percentiles.
+    """
+
+    def __init__(self, *, window: int = 1000) -> None:
+        if window < 1:
+            raise ValueError(f"window must be positive, got {window}")
+        self._window = window
+        self._records: Dict[str, _OperationRecord] = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, event: Event) -> None:
+        """Record an event."""
+        with self._lock:
+            record = self._records.get(event.operation)
+            if record is None:
+                record = self._records[event.operation] = _OperationRecord(self._window)
+            record.add(event)
+
+    def summary(self) -> Dict[str, OperationStats]:
+        """Return statistics for every recorded operation."""
+        with self._lock:
+            return {
+                operation: record.summarize()
+                for operation, record in sorted(self._records.items())
+            }
+
+    def reset(self) -> None:
+        """Forget all events."""
+        with self._lock:
+            self._records.clear()
+
+
+def _percentile(sorted_values: List[float], q: float) -> float:
+    # Nearest-rank percentile.
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(q / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def _emit(hooks: List[Hook], event: Event) -> None:
+    for hook in hooks:
+        try:
+            hook(event)
+        except Exception:
+            get_logger().exception(
+                "Instrumentation hook %r failed for operation '%s'",
+                hook,
+                event.operation,
+            )
+
+
+@contextmanager
+def _record_transfer(
+    hooks: List[Hook],
+    operation: str,
+    *,
+    n_files: int,
+    bytes_sent: int = 0,
+    bytes_received: int = 0,
+) -> Iterator[None]:
+    start = time.perf_counter()
+    succeeded = False
+    try:
+        yield
+        succeeded = True
+    finally:
+        _emit(
+            hooks,
+            TransferEvent(
+                operation=operation,
+                n_files=n_files,
+                bytes_sent=bytes_sent,
+                bytes_received=bytes_received,
+                duration=time.perf_counter() - start,
+                succeeded=succeeded,
+            ),
+        )
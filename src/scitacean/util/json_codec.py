@@ -0,0 +1,193 @@
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright (c) 2023 SciCat Project (https://github.com/SciCatProject/scitacean)
+"""JSON encoders and decoders for communication with SciCat.
+
+:class:`scitacean.client.ScicatClient` uses Python's builtin :mod:`json` module
+by default, see :func:`default_json_codec`.
+Faster codecs can be selected explicitly, e.g., using :func:`fastest_json_codec`.
+"""
+from __future__ import annotations
+
+import json
+from typing import Any, Callable, Optional, Union
+
+import pydantic
+
+from .._internal.pydantic_compat import is_pydantic_v1
+
+
+class JsonCodec:
+    """Encode and decode JSON using Python's builtin :mod:`json` module.
+
+    This is the base class for all codecs.
+    Subclasses can override :meth:`JsonCodec.dumps` and :meth:`JsonCodec.loads`
+    to use a different implementation.
+    """
+
+    name = "json"
+    """Name of the codec."""
+
+    def dumps(
+        self, obj: Any, *, default: Optional[Callable[[Any], Any]] = None
+    ) -> bytes:
+        """Encode an object as UTF-8 encoded JSON.
+
+        Parameters
+        ----------
+        obj:
+            Object to encode.
+        default:
+            Called for objects that cannot be encoded natively.
+            Must return an object that can be encoded.
+
+        Returns
+        -------
+        :
+            Encoded JSON.
+        """
+        return json.dumps(obj, default=default, separators=(",", ":")).encode("utf-8")
+
+    def loads(self, data: Union[bytes, str]) -> Any:
+        """Decode JSON.
+
+        Parameters
+        ----------
+        data:
+            Encoded JSON.
+
+        Returns
+        -------
+        :
+            Decoded object.
+        """
+        return json.loads(data)
+
+    def encode_model(self, model: pydantic.BaseModel) -> bytes:
+        """Encode a pydantic model, omitting fields that are ``None``.
+
+        With Pydantic v2, this always uses Pydantic's own serializer
+        as that is faster than converting the model to builtin types first.
+
+        Parameters
+        ----------
+        model:
+            Model to encode.
+
+        Returns
+        -------
+        :
+            Encoded JSON.
+        """
+        if is_pydantic_v1():
+            return self.dumps(
+                model.dict(exclude_none=True),
+                default=model.__json_encoder__,  # type: ignore[attr-defined]
+            )
+        return model.model_dump_json(exclude_none=True).encode("utf-8")
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}()"
+
+
+class OrjsonCodec(JsonCodec):
+    """Encode and decode JSON using `orjson <https://github.com/ijl/orjson>`_.
+
+    orjson does not support ``NaN`` and ``Infinity``.
+    Documents that contain them are decoded with Python's builtin :mod:`json` module.
+    Integers that do not fit into 64 bits are decoded as floats.
+    """
+
+    name = "orjson"
+
+    def __init__(self) -> None:
+        import orjson
+
+        self._orjson = orjson
+
+    def dumps(
+        self, obj: Any, *, default: Optional[Callable[[Any], Any]] = None
+    ) -> bytes:
+        """Encode an object as UTF-8 encoded JSON."""
+        return self._orjson.dumps(obj, default=default)
+
+    def loads(self, data: Union[bytes, str]) -> Any:
+        """Decode JSON."""
+        try:
+            return self._orjson.loads(data)
+        except self._orjson.JSONDecodeError:
+            return super().loads(data)
+
+
+class MsgspecCodec(JsonCodec):
+    """Encode and decode JSON using `msgspec <https://jcristharif.com/msgspec/>`_.
+
+    msgspec does not support ``NaN`` and ``Infinity``.
+    Documents that contain them are decoded with Python's builtin :mod:`json` module.
+    Integers that do not fit into 64 bits are decoded as floats.
+    """
+
+    name = "msgspec"
+
+    def __init__(self) -> None:
+        import msgspec
+
+        self._msgspec = msgspec
+
+    def dumps(
+        self, obj: Any, *, default: Optional[Callable[[Any], Any]] = None
+    ) -> bytes:
+        """Encode an object as UTF-8 encoded JSON."""
+        return self._msgspec.json.encode(  # type: ignore[no-any-return]
+            obj, enc_hook=default
+        )
+
+    def loads(self, data: Union[bytes, str]) -> Any:
+        """Decode JSON."""
+        try:
+            return self._msgspec.json.decode(data)
+        except self._msgspec.DecodeError:
+            return super().loads(data)
+
+
+def default_json_codec() -> JsonCodec:
+    """Return the default JSON codec.
+
+    This is always :class:`JsonCodec` because it supports all of JSON
+    as understood by Python, including ``NaN``, ``Infinity``,
+    and arbitrarily large integers.
+    Use :func:`fastest_json_codec` to opt into a faster codec.
+
+    Returns
+    -------
+    :
+        A new codec.
+    """
+    return JsonCodec()
+
+
+def fastest_json_codec() -> JsonCodec:
+    """Return the fastest available JSON codec.
+
+    Uses orjson if it is installed, otherwise msgspec if it is installed,
+    and falls back to Python's builtin :mod:`json` module.
+    See the codec classes for how they differ from :class:`JsonCodec`.
+
+    Returns
+    -------
+    :
+        A new codec.
+
+    Examples
+    --------
+    .. code-block:: python
+
+        client = ScicatClient.from_token(
+            url="...", token="...", json_codec=fastest_json_codec()
+        )
+    """
+    for codec in (OrjsonCodec, MsgspecCodec):
+        try:
+            return codec()
+        except ImportError:
+            pass
+    return JsonCodec()
@@ -0,0 +1,318 @@
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright (c) 2023 SciCat Project (https://github.com/SciCatProject/scitacean)
+"""Local mirror of metadata downloaded from SciCat."""
+from __future__ import annotations
+
+import datetime
+import json
+import os
+import sqlite3
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Union
+
+from .. import model
+from ..pid import PID
+from .json_codec import JsonCodec
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS datasets (
+    pid TEXT PRIMARY KEY,
+    owner TEXT,
+    proposal_id TEXT,
+    creation_time TEXT,
+    updated_at TEXT,
+    content TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS datasets_owner ON datasets (owner);
+CREATE INDEX IF NOT EXISTS datasets_proposal_id ON datasets (proposal_id);
+CREATE INDEX IF NOT EXISTS datasets_creation_time ON datasets (creation_time);
+CREATE TABLE IF NOT EXISTS orig_datablocks (
+    dataset_id TEXT PRIMARY KEY,
+    content TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS refreshes (
+    filter TEXT PRIMARY KEY,
+    updated_at TEXT NOT NULL
+);
+"""
+
+
+class MetadataMirror:
+    """Local copy of datasets and orig datablocks in an SQLite database.
+
+    Used by :class:`scitacean.client.ScicatClient` to store every dataset and
+    orig datablock that it downloads.
+    The mirror can be searched with :meth:`MetadataMirror.find_dataset_models`
+    without contacting SciCat, and :meth:`scitacean.Client.refresh_mirror`
+    downloads all datasets that have changed since the last refresh.
+
+    If ``offline`` is ``True``, the client reads datasets and orig datablocks
+    only from the mirror.
+    This way, :meth:`scitacean.Client.get_dataset` works without a connection
+    to SciCat.
+    Attachments are not mirrored.
+
+    The mirror can be used by multiple threads at the same time.
+
+    Parameters
+    ----------
+    path:
+        Database file.
+        The default, ``':memory:'``, keeps the database in memory
+        and loses it when the mirror is closed.
+    offline:
+        If ``True``, clients do not download datasets and orig datablocks
+        but read them from the mirror.
+
+    Examples
+    --------
+    Download all datasets of a proposal once and use them offline later:
+
+    .. code-block:: python
+
+        mirror = MetadataMirror("metadata.sqlite")
+        client = Client(
+            client=ScicatClient.from_token(url=url, token=token, mirror=mirror),
+            file_transfer=None,
+        )
+        client.refresh_mirror({"proposalId": "123456"})
+
+        # Later:
+        mirror = MetadataMirror("metadata.sqlite", offline=True)
+        client = Client(
+            client=ScicatClient.without_login(url=url, mirror=mirror),
+            file_transfer=None,
+        )
+        dset = client.get_dataset(pid)
+    """
+
+    def __init__(
+        self,
+        path: Union[str, os.PathLike[str]] = ":memory:",
+        *,
+        offline: bool = False,
+    ) -> None:
+        self.offline = offline
+        self._codec = JsonCodec()
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(os.fspath(path), check_same_thread=False)
+        with self._connection:
+            self._connection.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        """Close the database."""
+        with self._lock:
+            self._connection.close()
+
+    def __enter__(self) -> MetadataMirror:
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        with self._lock:
+            (count,) = self._connection.execute(
+                "SELECT COUNT(*) FROM datasets"
+            ).fetchone()
+        return int(count)
+
+    def __contains__(self, pid: Union[str, PID]) -> bool:
+        return (
+            self._fetchone("SELECT 1 FROM datasets WHERE pid = ?", (str(pid),))
+            is not None
+        )
+
+    def clear(self) -> None:
+        """Remove all datasets and orig datablocks."""
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM datasets")
+            self._connection.execute("DELETE FROM orig_datablocks")
+            self._connection.execute("DELETE FROM refreshes")
+
+    def get_dataset_model(
+        self, pid: Union[str, PID], strict_validation: bool = False
+    ) -> Optional[model.DownloadDataset]:
+        """Return a mirrored dataset.
+
+        Parameters
+        ----------
+        pid:
+            ID of the dataset.
+        strict_validation:
+            If ``True``, the dataset must pass validation.
+
+        Returns
+        -------
+        :
+            The dataset or ``None`` if it is not in the mirror.
+        """
+        row = self._fetchone("SELECT content FROM datasets WHERE pid = ?", (str(pid),))
+        if row is None:
+            return None
+        return self._decode_dataset(row[0], strict_validation)
+
+    def get_orig_datablocks(
+        self, pid: Union[str, PID], strict_validation: bool = False
+    ) -> Optional[List[model.DownloadOrigDatablock]]:
+        """Return the mirrored orig datablocks of a dataset.
+
+        Parameters
+        ----------
+        pid:
+            ID of the *dataset*.
+        strict_validation:
+            If ``True``, the datablocks must pass validation.
+
+        Returns
+        -------
+        :
+            The orig datablocks or ``None`` if they are not in the mirror.
+            An empty list means that the dataset has no orig datablocks.
+        """
+        row = self._fetchone(
+            "SELECT content FROM orig_datablocks WHERE dataset_id = ?", (str(pid),)
+        )
+        if row is None:
+            return None
+        return [
+            model.construct(
+                model.DownloadOrigDatablock,
+                _strict_validation=strict_validation,
+                **fields,
+            )
+            for fields in self._codec.loads(row[0])
+        ]
+
+    def find_dataset_models(
+        self,
+        *,
+        owner: Optional[str] = None,
+        proposal_id: Optional[str] = None,
+        created_after: Optional[datetime.datetime] = None,
+        created_before: Optional[datetime.datetime] = None,
+        limit: Optional[int] = None,
+        strict_validation: bool = False,
+    ) -> List[model.DownloadDataset]:
+        """Search the mirror for datasets.
+
+        Only datasets that match all given conditions are returned.
+
+        Parameters
+        ----------
+        owner:
+            Select datasets with this owner.
+        proposal_id:
+            Select datasets that belong to this proposal.
+        created_after:
+            Select datasets created at or after this time.
+        created_before:
+            Select datasets created before this time.
+        limit:
+            Maximum number of datasets to return.
+        strict_validation:
+            If ``True``, the datasets must pass validation.
+
+        Returns
+        -------
+        :
+            Matching datasets ordered by creation time.
+        """
+        conditions: List[str] = []
+        params: List[Any] = []
+        if owner is not None:
+            conditions.append("owner = ?")
+            params.append(owner)
+        if proposal_id is not None:
+            conditions.append("proposal_id = ?")
+            params.append(proposal_id)
+        if created_after is not None:
+            conditions.append("creation_time >= ?")
+            params.append(_format_time(created_after))
+        if created_before is not None:
+            conditions.append("creation_time < ?")
+            params.append(_format_time(created_before))
+        query = "SELECT content FROM datasets"
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY creation_time, pid"
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit)
+        with self._lock:
+            rows = self._connection.execute(query, params).fetchall()
+        return [self._decode_dataset(content, strict_validation) for (content,) in rows]
+
+    def _store_datasets(self, datasets: Iterable[model.DownloadDataset]) -> None:
+        rows = [
+            (
+                str(dset.pid),
+                dset.owner,
+                dset.proposalId,
+                _format_time(dset.creationTime),
+                _format_time(dset.updatedAt),
+                self._codec.encode_model(dset).decode("utf-8"),
+            )
+            for dset in datasets
+            if dset.pid is not None
+        ]
+        with self._lock, self._connection:
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO datasets VALUES (?, ?, ?, ?, ?, ?)", rows
+            )
+
+    def _store_orig_datablocks(
+        self, dblocks_per_dataset: Dict[str, List[model.DownloadOrigDatablock]]
+    ) -> None:
+        rows = [
+            (
+                pid,
+                "[" + ",".join(self._encode_models(dblocks)) + "]",
+            )
+            for pid, dblocks in dblocks_per_dataset.items()
+        ]
+        with self._lock, self._connection:
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO orig_datablocks VALUES (?, ?)", rows
+            )
+
+    def _last_refresh(self, filter_key: str) -> Optional[str]:
+        row = self._fetchone(
+            "SELECT updated_at FROM refreshes WHERE filter = ?", (filter_key,)
+        )
+        return None if row is None else str(row[0])
+
+    def _set_last_refresh(self, filter_key: str, updated_at: str) -> None:
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO refreshes VALUES (?, ?)",
+                (filter_key, updated_at),
+            )
+
+    def _fetchone(self, query: str, params: Iterable[Any]) -> Optional[Any]:
+        with self._lock:
+            return self._connection.execute(query, tuple(params)).fetchone()
+
+    def _encode_models(self, models: Iterable[model.BaseModel]) -> Iterable[str]:
+        return (self._codec.encode_model(m).decode("utf-8") for m in models)
+
+    def _decode_dataset(
+        self, content: str, strict_validation: bool
+    ) -> model.DownloadDataset:
+        return model.construct(
+            model.DownloadDataset,
+            _strict_validation=strict_validation,
+            **self._codec.loads(content),
+        )
+
+
+def _format_time(time: Optional[datetime.datetime]) -> Optional[str]:
+    # Use a fixed format in UTC so that times can be compared as strings.
+    # Naive times are interpreted as local times.
+    if time is None:
+        return None
+    return time.astimezone(datetime.timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+
+
+def _filter_key(filter: Optional[Dict[str, Any]]) -> str:
+    return json.dumps(filter or {}, sort_keys=True, default=str)
@@ -0,0 +1,176 @@
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright (c) 2023 SciCat Project (https://github.com/SciCatProject/scitacean)
+"""Policies for handling failing requests to SciCat."""
+from __future__ import annotations
+
+import dataclasses
+import datetime
+import email.utils
+import random
+import threading
+import time
+from typing import FrozenSet, Optional
+
+from ..error import ScicatCommError
+
+
+@dataclasses.dataclass(frozen=True)
+class RetryPolicy:
+    """Configuration for retrying failed requests.
+
+    Only requests that can be safely repeated, i.e., GET requests, are retried.
+    Requests are retried if the server responds with one of ``retry_on_status``
+    or if the connection fails.
+
+    The delay between attempts grows exponentially with full jitter,
+    i.e., the delay before attempt ``n+1`` is drawn uniformly from
+    ``[0, min(max_backoff, initial_backoff * 2**(n-1))]``.
+    If the server sends a ``Retry-After`` header, its value is used instead.
+
+    No more attempts are made once ``max_attempts`` requests have been sent
+    or if the next attempt would start after ``max_elapsed``
+    has passed since the first attempt.
+    """
+
+    max_attempts: int = 4
+    """Maximum number of attempts including the first one."""
+    initial_backoff: datetime.timedelta = datetime.timedelta(seconds=0.5)
+    """Upper bound of the delay before the first retry."""
+    max_backoff: datetime.timedelta = datetime.timedelta(seconds=30)
+    """Upper bound of the delay between any two attempts."""
+    max_elapsed: datetime.timedelta = datetime.timedelta(minutes=2)
+    """Maximum time to spend on attempts for one request."""
+    retry_on_status: FrozenSet[int] = frozenset({429, 502, 503, 504})
+    """HTTP status codes that trigger a retry."""
+
+    def __post_init__(self) -> None:
+        if self.max_attempts < 1:
+            raise ValueError(
+                f"max_attempts must be at least 1, got {self.max_attempts}"
+            )
+
+    def _delay(
+        self, *, attempt: int, elapsed: float, retry_after: Optional[float]
+    ) -> Optional[float]:
+        """Return the delay in seconds before the next attempt or None to give up."""
+        if attempt >= self.max_attempts:
+            return None
+        if retry_after is not None:
+            delay = retry_after
+        else:
+            bound = min(
+                self.max_backoff.total_seconds(),
+                self.initial_backoff.total_seconds() * 2 ** (attempt - 1),
+            )
+            delay = random.uniform(0, bound)  # noqa: S311
+        if elapsed + delay > self.max_elapsed.total_seconds():
+            return None
+        return delay
+
+
+class CircuitBreaker:
+    """Stop sending requests to a server that keeps failing.
+
+    The breaker counts consecutive failures, i.e., connection errors and
+    responses with status 429 or 5xx.
+    After ``failure_threshold`` failures, the breaker *opens* and all requests
+    fail immediately with :class:`scitacean.ScicatCommError` without
+    contacting the server.
+    After ``reset_timeout``, a single trial request is let through.
+    If it succeeds, the breaker closes and requests proceed normally.
+    Otherwise, it opens again for another ``reset_timeout``.
+
+    A breaker is thread-safe and can be shared between multiple clients
+    so that they all back off together.
+
+    Parameters
+    ----------
+    failure_threshold:
+        Number of consecutive failures that open the breaker.
+    reset_timeout:
+        Time to wait before sending a trial request when open.
+    """
+
+    def __init__(
+        self,
+        *,
+        failure_threshold: int = 5,
+        reset_timeout: datetime.timedelta = datetime.timedelta(seconds=30),
+    ) -> None:
+        if failure_threshold < 1:
+            raise ValueError(
+                f"failure_threshold must be at least 1, got {failure_threshold}"
+            )
+        self._failure_threshold = failure_threshold
+        self._reset_timeout = reset_timeout.total_seconds()
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._trial_in_progress = False
+        self._lock = threading.Lock()
+
+    @property
+    def is_open(self) -> bool:
+        """Return True if requests are currently blocked."""
+        with self._lock:
+            return self._opened_at is not None
+
+    def reset(self) -> None:
+        """Close the breaker and forget all failures."""
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_in_progress = False
+
+    def _before_request(self, operation: str) -> None:
+        with self._lock:
+            if self._opened_at is None:
+                return
+            if (
+                not self._trial_in_progress
+                and time.monotonic() - self._opened_at >= self._reset_timeout
+            ):
+                self._trial_in_progress = True
+                return
+        raise ScicatCommError(
+            f"Not calling SciCat for operation '{operation}' because the server "
+            f"failed {self._failure_threshold} times in a row. "
+            "Try again later."
+        )
+
+    def _cancel_trial(self) -> None:
+        # Allow another trial request without recording a result.
+        with self._lock:
+            self._trial_in_progress = False
+
+    def _record(self, *, failed: bool) -> None:
+        with self._lock:
+            self._trial_in_progress = False
+            if not failed:
+                self._failures = 0
+                self._opened_at = None
+                return
+            self._failures += 1
+            if self._failures >= self._failure_threshold:
+                self._opened_at = time.monotonic()
+
+
+def _is_server_failure(status_code: int) -> bool:
+    return status_code == 429 or status_code >= 500
+
+
+def _parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Return the delay in seconds encoded in a Retry-After header."""
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        date = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if date.tzinfo is None:
+        date = date.replace(tzinfo=datetime.timezone.utc)
+    now = datetime.datetime.now(tz=datetime.timezone.utc)
+    return max(0.0, (date - now).total_seconds())
@@ -0,0 +1,225 @@
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright (c) 2023 SciCat Project (https://github.com/SciCatProject/scitacean)
+"""On-disk cache for login tokens.
+
+A :class:`TokenCache` can be passed to
+:meth:`scitacean.Client.from_credentials` to share login tokens between
+processes of the same user.
+This avoids logging in again in every process.
+"""
+from __future__ import annotations
+
+import dataclasses
+import datetime
+import json
+import os
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, Union
+
+from ..logging import get_logger
+
+
+@dataclasses.dataclass(frozen=True)
+class CachedLogin:
+    """A cache entry for one user of one SciCat server."""
+
+    login_endpoint: str
+    """The login endpoint that succeeded for this user, e.g., ``'Users/login'``."""
+    token: Optional[str]
+    """The login token or ``None`` if there is no valid token."""
+    expires_at: Optional[float]
+    """Expiration time of the token in seconds since the epoch.
+
+    ``None`` if there is no valid token.
+    """
+
+    @property
+    def lifetime(self) -> Optional[datetime.timedelta]:
+        """Remaining lifetime of the token."""
+        if self.expires_at is None:
+            return None
+        return datetime.timedelta(seconds=max(0.0, self.expires_at - time.time()))
+
+
+class TokenCache:
+    """Store login tokens in a file that is shared between processes.
+
+    Entries are keyed by the SciCat URL and username.
+    Tokens are only cached if the server reports their lifetime,
+    and they are not returned by :meth:`TokenCache.get` when less than
+    ``min_remaining`` of their lifetime is left.
+    The cache also remembers which login endpoint worked for each user
+    so that clients do not try the other endpoints first.
+    This is retained after the token has expired.
+
+    Access to the file is synchronized with a lock file, see :meth:`TokenCache.lock`.
+    This requires `filelock <https://py-filelock.readthedocs.io>`_.
+
+    Attention
+    ---------
+    The tokens are stored unencrypted.
+    The file is only readable and writable by the current user but anyone
+    with access to the user's account can use the tokens.
+
+    Parameters
+    ----------
+    path:
+        File to store the tokens in.
+        Defaults to ``scitacean/tokens.json`` in the user's cache directory.
+    min_remaining:
+        Tokens with less remaining lifetime are treated as expired.
+    lock_timeout:
+        Maximum time to wait for the lock.
+        A ``filelock.Timeout`` exception is raised when it is exceeded.
+    """
+
+    def __init__(
+        self,
+        path: Optional[Union[str, os.PathLike[str]]] = None,
+        *,
+        min_remaining: datetime.timedelta = datetime.timedelta(minutes=5),
+        lock_timeout: datetime.timedelta = datetime.timedelta(seconds=60),
+    ) -> None:
+        import filelock
+
+        self._path = Path(path) if path is not None else _default_path()
+        self._min_remaining = min_remaining.total_seconds()
+        self._lock = filelock.FileLock(
+            str(self._path) + ".lock", timeout=lock_timeout.total_seconds()
+        )
+
+    @property
+    def path(self) -> Path:
+        """The file that stores the tokens."""
+        return self._path
+
+    @contextmanager
+    def lock(self) -> Iterator[None]:
+        """Lock the cache for exclusive use by the current thread.
+
+        Clients hold the lock while logging in so that concurrent processes
+        wait for and reuse the new token instead of logging in themselves.
+        The lock is reentrant.
+        """
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            yield
+
+    def get(self, *, url: str, username: str) -> Optional[CachedLogin]:
+        """Return the cache entry for a user.
+
+        Parameters
+        ----------
+        url:
+            URL of the SciCat API.
+        username:
+            Name of the user.
+
+        Returns
+        -------
+        :
+            The entry or ``None`` if nothing is cached for the user.
+            The entry has no token if the cached token has expired.
+        """
+        with self.lock():
+            entry = self._read().get(_key(url, username))
+        if entry is None:
+            return None
+        token, expires_at = entry.get("token"), entry.get("expires_at")
+        if expires_at is None or expires_at - time.time() < self._min_remaining:
+            token, expires_at = None, None
+        return CachedLogin(
+            login_endpoint=entry["login_endpoint"], token=token, expires_at=expires_at
+        )
+
+    def store(
+        self,
+        *,
+        url: str,
+        username: str,
+        login_endpoint: str,
+        token: str,
+        lifetime: Optional[datetime.timedelta],
+    ) -> None:
+        """Store the result of a successful login.
+
+        Parameters
+        ----------
+        url:
+            URL of the SciCat API.
+        username:
+            Name of the user.
+        login_endpoint:
+            The login endpoint that was used.
+        token:
+            The new token.
+        lifetime:
+            Lifetime of the token.
+            If ``None``, only the login endpoint is stored.
+        """
+        entry: Dict[str, Any] = {"login_endpoint": login_endpoint}
+        if lifetime is not None:
+            entry["token"] = token
+            entry["expires_at"] = time.time() + lifetime.total_seconds()
+        with self.lock():
+            entries = self._read()
+            entries[_key(url, username)] = entry
+            self._write(entries)
+
+    def remove(self, *, url: str, username: str) -> None:
+        """Remove the entry for a user, e.g., because the token was revoked."""
+        with self.lock():
+            entries = self._read()
+            if entries.pop(_key(url, username), None) is not None:
+                self._write(entries)
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        with self.lock():
+            self._path.unlink(missing_ok=True)
+
+    def _read(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            with self._path.open("r", encoding="utf-8") as f:
+                entries = json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError):
+            get_logger().warning(
+                "Ignoring unreadable token cache at %s", self._path, exc_info=True
+            )
+            return {}
+        return entries if isinstance(entries, dict) else {}
+
+    def _write(self, entries: Dict[str, Dict[str, Any]]) -> None:
+        # Write to a temporary file and move it into place so that a crash
+        # never leaves a partially written cache behind.
+        # mkstemp creates the file with permissions 0o600.
+        fd, tmp_name = tempfile.mkstemp(
+            dir=self._path.parent, prefix=self._path.name, suffix=".tmp"
+        )
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(entries, f)
+            os.replace(tmp_name, self._path)
+        except BaseException:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
+
+    def __repr__(self) -> str:
+        return f"TokenCache(path={str(self._path)!r})"
+
+
+def _key(url: str, username: str) -> str:
+    return f"{username}@{url.rstrip('/')}"
+
+
+def _default_path() -> Path:
+    if os.name == "nt":
+        base = Path(os.environ.get("LOCALAPPDATA", Path.home() / "AppData" / "Local"))
+    else:
+        base = Path(os.environ.get("XDG_CACHE_HOME", Path.home() / ".cache"))
+    return base / "scitacean" / "tokens.json"
@@ -0,0 +1,242 @@
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright (c) 2023 SciCat Project (https://github.com/SciCatProject/scitacean)
+
+import asyncio
+import json
+
+import pytest
+from dateutil.parser import parse as parse_date
+
+# httpx is only installed with the optional 'async' dependencies.
+httpx = pytest.importorskip("httpx")
+
+from scitacean import (  # noqa: E402
+    PID,
+    Dataset,
+    DatasetType,
+    RemotePath,
+    ScicatCommError,
+)
+from scitacean.async_client import AsyncClient, AsyncScicatClient  # noqa: E402
+from scitacean.testing.async_client import FakeAsyncClient  # noqa: E402
+from scitacean.testing.transfer import FakeFileTransfer  # noqa: E402
+from scitacean.transfer.util import ThreadedFileTransfer  # noqa: E402
+
+from ..common.files import make_file  # noqa: E402
+
+
+@pytest.fixture
+def dataset():
+    return Dataset(
+        access_groups=["group1"],
+        contact_email="p.stibbons@uu.am",
+        creation_time=parse_date("2011-08-24T12:34:56Z"),
+        input_datasets=[],
+        investigator="ridcully@uu.am",
+        owner="PonderStibbons",
+        owner_group="uu",
+        source_folder="/hex/source123",
+        type=DatasetType.DERIVED,
+        used_software=["EasyScience"],
+    )
+
+
+@pytest.fixture
+def dataset_with_files(dataset, fs):
+    make_file(fs, path="file.nxs", contents=b"contents of file.nxs")
+    make_file(fs, path="the_log_file.log", contents=b"this is a log file")
+    dataset.add_local_files("file.nxs", "the_log_file.log")
+    return dataset
+
+
+def mock_scicat_client(handler):
+    client = AsyncScicatClient.from_token(
+        url="https://scicat/api/v3", token="abc"  # noqa: S106
+    )
+    client._http = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return client
+
+
+def test_fake_upload_and_get_dataset(fs, dataset_with_files):
+    async def impl():
+        client = FakeAsyncClient(
+            file_transfer=ThreadedFileTransfer(FakeFileTransfer(fs=fs))
+        )
+        finalized = await client.upload_new_dataset_now(dataset_with_files)
+        assert finalized.pid is not None
+        downloaded = await client.get_dataset(finalized.pid, attachments=True)
+        return client, finalized, downloaded
+
+    client, finalized, downloaded = asyncio.run(impl())
+    assert finalized == downloaded
+    assert finalized.number_of_files == 2
+    source_folder = RemotePath("/hex/source123")
+    assert client.file_transfer.file_transfer.files == {
+        source_folder / "file.nxs": b"contents of file.nxs",
+        source_folder / "the_log_file.log": b"this is a log file",
+    }
+
+
+def test_fake_upload_reverts_files_if_dataset_ingestion_fails(fs, dataset_with_files):
+    transfer = FakeFileTransfer(fs=fs)
+    client = FakeAsyncClient(
+        disable={"create_dataset_model": ScicatCommError("Ingestion failed")},
+        file_transfer=ThreadedFileTransfer(transfer),
+    )
+    with pytest.raises(ScicatCommError):
+        asyncio.run(client.upload_new_dataset_now(dataset_with_files))
+    assert not client.datasets
+    assert not transfer.files
+    assert len(transfer.reverted) == 2
+
+
+def test_fake_get_many_datasets_concurrently(fs, dataset):
+    client = FakeAsyncClient()
+
+    async def impl():
+        finalized = [await client.upload_new_dataset_now(dataset) for _ in range(5)]
+        downloaded = await asyncio.gather(
+            *(client.get_dataset(str(dset.pid)) for dset in finalized)
+        )
+        return finalized, downloaded
+
+    client._file_transfer = ThreadedFileTransfer(FakeFileTransfer(fs=fs))
+    finalized, downloaded = asyncio.run(impl())
+    assert [d.pid for d in downloaded] == [d.pid for d in finalized]
+
+
+def test_fake_upload_new_datasets_reports_failures_per_dataset(
+    fs, dataset, monkeypatch
+):
+    file_transfer = FakeFileTransfer(fs=fs)
+    client = FakeAsyncClient(file_transfer=ThreadedFileTransfer(file_transfer))
+    create_dataset_model = client.scicat.create_dataset_model
+
+    async def failing_create_dataset_model(dset):
+        if dset.sourceFolder == RemotePath("/hex/source1"):
+            raise ScicatCommError("Ingestion failed")
+        return await create_dataset_model(dset)
+
+    monkeypatch.setattr(
+        client.scicat, "create_dataset_model", failing_create_dataset_model
+    )
+    datasets = []
+    for i in range(3):
+        make_file(fs, path=f"file{i}.nxs", contents=f"contents {i}".encode())
+        dset = dataset.replace(source_folder=f"/hex/source{i}")
+        dset.add_local_files(f"file{i}.nxs")
+        datasets.append(dset)
+
+    first, failed, last = asyncio.run(
+        client.upload_new_datasets(datasets, max_file_uploads=2)
+    )
+    assert isinstance(first, Dataset)
+    assert first.source_folder == RemotePath("/hex/source0")
+    assert isinstance(failed, ScicatCommError)
+    assert isinstance(last, Dataset)
+    assert last.source_folder == RemotePath("/hex/source2")
+    assert len(client.datasets) == 2
+    assert list(file_transfer.reverted) == [RemotePath("/hex/source1/file1.nxs")]
+
+
+def test_fake_download_files(fs, dataset_with_files):
+    async def impl():
+        client = FakeAsyncClient(
+            file_transfer=ThreadedFileTransfer(FakeFileTransfer(fs=fs))
+        )
+        finalized = await client.upload_new_dataset_now(dataset_with_files)
+        assert finalized.pid is not None
+        dset = await client.get_dataset(finalized.pid)
+        return await client.download_files(dset, target="download")
+
+    downloaded = asyncio.run(impl())
+    assert all(f.is_on_local for f in downloaded.files)
+    with open("download/file.nxs", "rb") as f:
+        assert f.read() == b"contents of file.nxs"
+
+
+def test_async_scicat_client_get_dataset_model():
+    def handler(request):
+        assert request.url.path == "/api/v3/datasets/PID.prefix/abcd"
+        assert request.headers["Authorization"] == "Bearer abc"
+        return httpx.Response(
+            200,
+            json={
+                "pid": "PID.prefix/abcd",
+                "type": "raw",
+                "owner": "me",
+                "ownerGroup": "mine",
+                "sourceFolder": "/data",
+                "contactEmail": "me@mine.mine",
+                "creationTime": "2023-09-30T12:00:00Z",
+                "principalInvestigator": "mine@mine.mine",
+            },
+        )
+
+    async def impl():
+        async with mock_scicat_client(handler) as client:
+            return await client.get_dataset_model(PID.parse("PID.prefix/abcd"))
+
+    dset = asyncio.run(impl())
+    assert dset.pid == PID.parse("PID.prefix/abcd")
+    assert dset.owner == "me"
+
+
+def test_async_scicat_client_raises_comm_error():
+    def handler(request):
+        return httpx.Response(404, content=json.dumps({"error": "not found"}))
+
+    async def impl():
+        async with mock_scicat_client(handler) as client:
+            await client.get_dataset_model(PID.parse("PID.prefix/abcd"))
+
+    with pytest.raises(ScicatCommError, match="404"):
+        asyncio.run(impl())
+
+
+def test_async_connection_error_does_not_contain_token():
+    async def impl():
+        async with AsyncClient.from_token(
+            url="https://not-actually-a_server",
+            token="the token/which_must-be.kept secret",  # noqa: S106
+        ) as client:
+            await client.get_dataset("does not exist")
+
+    try:
+        asyncio.run(impl())
+        assert False, "There must be an exception"  # noqa: B011
+    except Exception as exc:
+        assert "the token/which_must-be.kept secret" not in str(exc)
+        for arg in exc.args:
+            assert "the token/which_must-be.kept secret" not in str(arg)
+
+
+def test_fake_get_dataset_without_orig_datablocks_has_no_files(dataset, fs):
+    async def impl():
+        client = FakeAsyncClient(
+            file_transfer=ThreadedFileTransfer(FakeFileTransfer(fs=fs))
+        )
+        finalized = await client.upload_new_dataset_now(dataset)
+        assert finalized.pid is not None
+        return await client.get_dataset(
+            finalized.pid, attachments=True, max_concurrency=1
+        )
+
+    downloaded = asyncio.run(impl())
+    assert downloaded.files == ()
+    assert downloaded.attachments == []
+
+
+def test_fake_get_dataset_raises_if_dataset_does_not_exist():
+    client = FakeAsyncClient()
+    with pytest.raises(ScicatCommError):
+        asyncio.run(client.get_dataset(PID(pid="bad-pid"), attachments=True))
+
+
+def test_fake_client_does_not_open_http_client(monkeypatch):
+    def forbidden(*args, **kwargs):
+        raise AssertionError("Must not create an HTTP client")
+
+    monkeypatch.setattr(httpx, "AsyncClient", forbidden)
+    client = FakeAsyncClient()
+    asyncio.run(client.scicat.close())
@@ -0,0 +1,154 @@
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright (c) 2023 SciCat Project (https://github.com/SciCatProject/scitacean)
+
+import datetime
+
+import pytest
+
+from scitacean import PID, model
+from scitacean.util.cache import MetadataCache
+
+from ..common.http import DATASET_JSON, make_scripted_client
+
+
+def make_client(handler, *, token="abc", cache=None, **cache_args):  # noqa: S107
+    return make_scripted_client(
+        handler,
+        token=token,
+        cache=cache if cache is not None else MetadataCache(**cache_args),
+    )
+
+
+def test_cache_reuses_responses():
+    client = make_client(lambda *_: (200, DATASET_JSON, {}))
+    first = client.get_dataset_model(PID.parse("PID.prefix/abcd"))
+    second = client.get_dataset_model(PID.parse("PID.prefix/abcd"))
+    assert first == second
+    assert len(client._session.requests) == 1
+
+
+def test_cache_returns_independent_models():
+    client = make_client(lambda *_: (200, DATASET_JSON, {}))
+    first = client.get_dataset_model(PID.parse("PID.prefix/abcd"))
+    first.owner = "someone else"
+    second = client.get_dataset_model(PID.parse("PID.prefix/abcd"))
+    assert second.owner == "me"
+
+
+def test_cache_distinguishes_urls():
+    def handler(method, url, headers):
+        return 200, {**DATASET_JSON, "pid": url.rsplit("%2F", 1)[-1]}, {}
+
+    client = make_client(handler)
+    a = client.get_dataset_model(PID(prefix="PID.prefix", pid="a"))
+    b = client.get_dataset_model(PID(prefix="PID.prefix", pid="b"))
+    assert a.pid.pid == "a"
+    assert b.pid.pid == "b"
+    assert len(client._session.requests) == 2
+
+
+def test_cache_does_not_store_errors():
+    client = make_client(lambda *_: (404, {"error": "not found"}, {}))
+    for _ in range(2):
+        with pytest.raises(Exception, match="404"):
+            client.get_dataset_model(PID.parse("PID.prefix/abcd"))
+    assert len(client._session.requests) == 2
+
+
+def test_cache_revalidates_with_etag():
+    def handler(method, url, headers):
+        if headers.get("If-None-Match") == '"v1"':
+            return 304, None, {}
+        return 200, DATASET_JSON, {"ETag": '"v1"'}
+
+    client = make_client(handler, ttl=datetime.timedelta(seconds=0))
+    first = client.get_dataset_model(PID.parse("PID.prefix/abcd"))
+    second = client.get_dataset_model(PID.parse("PID.prefix/abcd"))
+    assert first == second
+    assert [r[2].get("If-None-Match") for r in client._session.requests] == [
+        None,
+        '"v1"',
+    ]
+
+
+def test_cache_revalidates_with_last_modified():
+    last_modified = "Sat, 30 Sep 2023 12:00:00 GMT"
+
+    def handler(method, url, headers):
+        if headers.get("If-Modified-Since") == last_modified:
+            return 304, None, {}
+        return 200, DATASET_JSON, {"Last-Modified": last_modified}
+
+    client = make_client(handler, ttl=datetime.timedelta(seconds=0))
+    client.get_dataset_model(PID.parse("PID.prefix/abcd"))
+    second = client.get_dataset_model(PID.parse("PID.prefix/abcd"))
+    assert second.owner == "me"
+    assert client._session.requests[1][2]["If-Modified-Since"] == last_modified
+
+
+def test_cache_replaces_modified_entries():
+    versions = iter(("v1", "v2"))
+
+    def handler(method, url, headers):
+        version = next(versions)
+        return 200, {**DATASET_JSON, "owner": version}, {"ETag": version}
+
+    client = make_client(handler, ttl=datetime.timedelta(seconds=0))
+    assert client.get_dataset_model(PID.parse("PID.prefix/abcd")).owner == "v1"
+    assert client.get_dataset_model(PID.parse("PID.prefix/abcd")).owner == "v2"
+
+
+def test_create_invalidates_cache():
+    def handler(method, url, headers):
+        if method == "post":
+            return 200, {"pid": "PID.prefix/abcd", "datasetId": "PID.prefix/abcd"}, {}
+        return 200, DATASET_JSON, {}
+
+    client = make_client(handler)
+    client.get_dataset_model(PID.parse("PID.prefix/abcd"))
+    client.create_orig_datablock(
+        model.UploadOrigDatablock(
+            datasetId=PID.parse("PID.prefix/abcd"),
+            size=0,
+            dataFileList=[],
+            ownerGroup="mine",
+        )
+    )
+    client.get_dataset_model(PID.parse("PID.prefix/abcd"))
+    assert [r[0] for r in client._session.requests] == ["get", "post", "get"]
+
+
+def test_cache_shared_between_users_does_not_mix_responses():
+    def handler(owner):
+        return lambda *_: (200, {**DATASET_JSON, "owner": owner}, {})
+
+    cache = MetadataCache()
+    alice = make_client(handler("alice"), token="token-a", cache=cache)  # noqa: S106
+    bob = make_client(handler("bob"), token="token-b", cache=cache)  # noqa: S106
+    assert alice.get_dataset_model(PID.parse("PID.prefix/abcd")).owner == "alice"
+    assert bob.get_dataset_model(PID.parse("PID.prefix/abcd")).owner == "bob"
+    assert alice.get_dataset_model(PID.parse("PID.prefix/abcd")).owner == "alice"
+    assert len(alice._session.requests) == 1
+    assert len(bob._session.requests) == 1
+
+
+def test_failed_create_invalidates_cache():
+    def handler(method, url, headers):
+        if method == "post":
+            return 504, {"error": "timeout"}, {}
+        return 200, DATASET_JSON, {}
+
+    client = make_client(handler)
+    client.get_dataset_model(PID.parse("PID.prefix/abcd"))
+    with pytest.raises(Exception, match="504"):
+        client.create_orig_datablock(
+            model.UploadOrigDatablock(
+                datasetId=PID.parse("PID.prefix/abcd"),
+                size=0,
+                dataFileList=[],
+                ownerGroup="mine",
+            )
+        )
+    client.get_dataset_model(PID.parse("PID.prefix/abcd"))
+    assert [r[0] for r in client._session.requests][-1] == "get"
+    assert [r[0] for r in client._session.requests].count("get") == 2
@@ -1,13 +1,20 @@
 # SPDX-License-Identifier: BSD-3-Clause
 # Copyright (c) 2023 SciCat Project (https://github.com/SciCatProject/scitacean)
 
+import datetime
 import pickle
+from typing import List
 
 import pytest
+import requests
 
 from scitacean import PID, Client
+from scitacean.client import ScicatClient, _get_token, _get_token_and_lifetime
 from scitacean.testing.client import FakeClient
-from scitacean.util.credentials import SecretStr
+from scitacean.util.credentials import RenewingStr, SecretStr
+from scitacean.util.token_cache import TokenCache
+
+from ..common.http import ScriptedSession
 
 
 def test_from_token_fake():
@@ -80,3 +87,223 @@ def test_fake_can_disable_functions():
         client.scicat.get_dataset_model(PID(pid="some-pid"))
     with pytest.raises(IndexError, match="custom index error"):
         client.scicat.get_orig_datablocks(PID(pid="some-pid"))
+
+
+def test_client_is_context_manager():
+    with Client.from_token(url="/", token="the-token") as client:  # noqa: S106
+        assert isinstance(client, Client)
+
+
+def test_scicat_client_uses_configured_pool_size():
+    client = ScicatClient.from_token(
+        url="https://not-actually-a_server",
+        token="the-token",  # noqa: S106
+        pool_size=3,
+    )
+    adapter = client._session.get_adapter("https://not-actually-a_server")
+    assert isinstance(adapter, requests.adapters.HTTPAdapter)
+    assert adapter._pool_maxsize == 3
+    client.close()
+
+
+def test_login_reuses_session():
+    class RecordingSession(requests.Session):
+        def __init__(self):
+            super().__init__()
+            self.urls = []
+
+        def post(self, url, **kwargs):  # type: ignore[override]
+            self.urls.append(url)
+            response = requests.Response()
+            response.status_code = 200
+            response._content = b'{"id": "the-token"}'
+            return response
+
+    session = RecordingSession()
+    token = _get_token(
+        url="https://not-actually-a_server/api/v3",
+        username=SecretStr("user"),
+        password=SecretStr("pass"),
+        timeout=datetime.timedelta(seconds=1),
+        session=session,
+    )
+    assert token == "the-token"  # noqa: S105
+    assert session.urls == ["https://not-actually-a_server/api/v3/Users/login"]
+
+
+@pytest.mark.parametrize(
+    ("content", "lifetime"),
+    (
+        ({"id": "the-token", "ttl": 3600}, datetime.timedelta(hours=1)),
+        ({"id": "the-token"}, None),
+    ),
+)
+def test_login_reports_token_lifetime(content, lifetime):
+    session = ScriptedSession(lambda *_: (200, content, {}))
+    token, actual_lifetime = _get_token_and_lifetime(
+        url="https://not-actually-a_server/api/v3",
+        username=SecretStr("user"),
+        password=SecretStr("pass"),
+        timeout=datetime.timedelta(seconds=1),
+        session=session,
+    )
+    assert token == "the-token"  # noqa: S105
+    assert actual_lifetime == lifetime
+
+
+def test_from_credentials_renews_token(monkeypatch):
+    logins: List[None] = []
+
+    def handler(method, url, headers):
+        if url.endswith("Users/login"):
+            logins.append(None)
+            return 200, {"id": f"token-{len(logins)}", "ttl": 600}, {}
+        return 200, [], {}
+
+    session = ScriptedSession(handler)
+    monkeypatch.setattr("scitacean.client._make_session", lambda pool_size: session)
+    client = ScicatClient.from_credentials(
+        url="https://scicat/api/v3",
+        username="user",
+        password="pass",  # noqa: S106
+        renew_token=True,
+    )
+    client.get_attachments_for_dataset(PID.parse("PID.prefix/abcd"))
+    # Within renew_before of the expiry.
+    assert isinstance(client._token, RenewingStr)
+    client._token._renew_at = 0
+    client.get_attachments_for_dataset(PID.parse("PID.prefix/abcd"))
+
+    assert len(logins) == 2
+    authorizations = [
+        headers["Authorization"]
+        for _, url, headers in session.requests
+        if "attachments" in url
+    ]
+    assert authorizations == ["Bearer token-1", "Bearer token-2"]
+
+
+def scripted_logins(accepted_endpoint):
+    logins = []
+
+    def handler(method, url, headers):
+        if "login" in url or "auth" in url:
+            endpoint = "auth/msad" if url.endswith("auth/msad") else "Users/login"
+            logins.append(endpoint)
+            if endpoint != accepted_endpoint:
+                return 401, {"error": "not this one"}, {}
+            if endpoint == "auth/msad":
+                return 200, {"access_token": "msad-token", "expires_in": 3600}, {}
+            return 200, {"id": "users-token", "ttl": 3600}, {}
+        return 200, [], {}
+
+    return ScriptedSession(handler), logins
+
+
+def test_from_credentials_reuses_cached_token(monkeypatch, tmp_path):
+    session, logins = scripted_logins("auth/msad")
+    monkeypatch.setattr("scitacean.client._make_session", lambda pool_size: session)
+    cache = TokenCache(tmp_path / "tokens.json")
+
+    for _ in range(3):
+        client = ScicatClient.from_credentials(
+            url="https://scicat/api/v3",
+            username="user",
+            password="pass",  # noqa: S106
+            token_cache=cache,
+        )
+        client.get_attachments_for_dataset(PID.parse("PID.prefix/abcd"))
+
+    assert logins == ["Users/login", "auth/msad"]
+    authorizations = [
+        headers["Authorization"]
+        for _, url, headers in session.requests
+        if "attachments" in url
+    ]
+    assert authorizations == ["Bearer msad-token"] * 3
+
+
+def test_from_credentials_remembers_login_endpoint(monkeypatch, tmp_path):
+    session, logins = scripted_logins("auth/msad")
+    monkeypatch.setattr("scitacean.client._make_session", lambda pool_size: session)
+    cache = TokenCache(tmp_path / "tokens.json")
+    cache.store(
+        url="https://scicat/api/v3",
+        username="user",
+        login_endpoint="auth/msad",
+        token="expired",  # noqa: S106
+        lifetime=datetime.timedelta(seconds=0),
+    )
+
+    ScicatClient.from_credentials(
+        url="https://scicat/api/v3",
+        username="user",
+        password="pass",  # noqa: S106
+        token_cache=cache,
+    )
+    assert logins == ["auth/msad"]
+    cached = cache.get(url="https://scicat/api/v3", username="user")
+    assert cached is not None
+    assert cached.token == "msad-token"  # noqa: S105
+
+
+def test_from_credentials_renews_token_despite_cache(monkeypatch, tmp_path):
+    logins: List[None] = []
+
+    def handler(method, url, headers):
+        if url.endswith("Users/login"):
+            logins.append(None)
+            return 200, {"id": f"token-{len(logins)}", "ttl": 600}, {}
+        return 200, [], {}
+
+    session = ScriptedSession(handler)
+    monkeypatch.setattr("scitacean.client._make_session", lambda pool_size: session)
+    # The cached token is still valid when it is due for renewal.
+    cache = TokenCache(tmp_path / "tokens.json", min_remaining=datetime.timedelta(0))
+    client = ScicatClient.from_credentials(
+        url="https://scicat/api/v3",
+        username="user",
+        password="pass",  # noqa: S106
+        renew_token=True,
+        token_cache=cache,
+    )
+    client.get_attachments_for_dataset(PID.parse("PID.prefix/abcd"))
+    assert isinstance(client._token, RenewingStr)
+    client._token._renew_at = 0
+    client.get_attachments_for_dataset(PID.parse("PID.prefix/abcd"))
+
+    assert len(logins) == 2
+    authorizations = [
+        headers["Authorization"]
+        for _, url, headers in session.requests
+        if "attachments" in url
+    ]
+    assert authorizations == ["Bearer token-1", "Bearer token-2"]
+    cached = cache.get(url="https://scicat/api/v3", username="user")
+    assert cached is not None
+    assert cached.token == "token-2"  # noqa: S105
+
+
+def test_login_falls_back_if_remembered_endpoint_fails(tmp_path):
+    session, logins = scripted_logins("Users/login")
+    cache = TokenCache(tmp_path / "tokens.json")
+    cache.store(
+        url="https://scicat/api/v3",
+        username="user",
+        login_endpoint="auth/msad",
+        token="unused",  # noqa: S106
+        lifetime=None,
+    )
+    token, _ = _get_token_and_lifetime(
+        url="https://scicat/api/v3",
+        username=SecretStr("user"),
+        password=SecretStr("pass"),
+        timeout=datetime.timedelta(seconds=1),
+        session=session,
+        token_cache=cache,
+    )
+    assert token == "users-token"  # noqa: S105
+    assert logins == ["auth/msad", "Users/login"]
+    cached = cache.get(url="https://scicat/api/v3", username="user")
+    assert cached is not None
+    assert cached.login_endpoint == "Users/login"
@@ -0,0 +1,68 @@
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright (c) 2023 SciCat Project (https://github.com/SciCatProject/scitacean)
+
+import gzip
+import json
+from datetime import datetime, timezone
+
+import pytest
+
+from scitacean import PID
+from scitacean.model import UploadDataFile, UploadOrigDatablock
+
+from ..common.http import ScriptedSession, make_scripted_client
+
+
+def make_orig_datablock(n_files):
+    return UploadOrigDatablock(
+        datasetId=PID.parse("PID.prefix/abcd"),
+        size=n_files,
+        ownerGroup="uu",
+        dataFileList=[
+            UploadDataFile(
+                path=f"file{i}.nxs",
+                size=1,
+                time=datetime(2023, 9, 30, 12, tzinfo=timezone.utc),
+            )
+            for i in range(n_files)
+        ],
+    )
+
+
+def make_client(**kwargs):
+    response = {"_id": "dblock-1", "datasetId": "PID.prefix/abcd", "size": 0}
+    return make_scripted_client(lambda *_: (200, response, {}), **kwargs)
+
+
+def test_request_bodies_are_not_compressed_by_default():
+    client = make_client()
+    client.create_orig_datablock(make_orig_datablock(100))
+    [(_, _, headers)] = client._session.requests
+    assert "Content-Encoding" not in headers
+    assert json.loads(client._session.bodies[0])["size"] == 100
+
+
+@pytest.mark.parametrize("n_files", (1, 100))
+def test_request_bodies_are_compressed_above_threshold(n_files):
+    client = make_client(gzip_threshold=1000)
+    dblock = make_orig_datablock(n_files)
+    client.create_orig_datablock(dblock)
+
+    [(_, _, headers)] = client._session.requests
+    body = client._session.bodies[0]
+    uncompressed = dblock.model_dump_json(exclude_none=True).encode()
+    if len(uncompressed) >= 1000:
+        assert headers["Content-Encoding"] == "gzip"
+        assert gzip.decompress(body) == uncompressed
+        assert len(body) < len(uncompressed)
+    else:
+        assert "Content-Encoding" not in headers
+        assert body == uncompressed
+
+
+def test_requests_accept_compressed_responses():
+    client = make_client()
+    client._session = ScriptedSession(lambda *_: (200, [], {}))
+    client.get_attachments_for_dataset(PID.parse("PID.prefix/abcd"))
+    [(_, _, headers)] = client._session.requests
+    assert "gzip" in headers["Accept-Encoding"]
@@ -2,6 +2,9 @@
 # Copyright (c) 2023 SciCat Project (https://github.com/SciCatProject/scitacean)
 # mypy: disable-error-code="arg-type, index"
 
+import json
+import threading
+
 import pydantic
 import pytest
 from dateutil.parser import parse as parse_date
@@ -17,6 +20,8 @@ from scitacean.testing.backend.seed import (
     INITIAL_ORIG_DATABLOCKS,
 )
 
+from ..common.http import ScriptedSession
+
 
 @pytest.fixture()
 def scicat_client(client: Client) -> ScicatClient:
@@ -130,3 +135,412 @@ def test_get_broken_dataset_strict_validation(real_client, require_scicat_backen
     dset = INITIAL_DATASETS["partially-broken"]
     with pytest.raises(pydantic.ValidationError):
         real_client.get_dataset(dset.pid, strict_validation=True)
+
+
+def test_get_dataset_requests_models_concurrently(scicat_backend, fake_client):
+    dset = INITIAL_DATASETS["raw"]
+    # Both calls must be waiting at the same time for the barrier to be passed.
+    barrier = threading.Barrier(2, timeout=5)
+    get_dataset_model = fake_client.scicat.get_dataset_model
+    iter_orig_datablocks = fake_client.scicat.iter_orig_datablocks
+
+    def waiting_get_dataset_model(*args, **kwargs):
+        barrier.wait()
+        return get_dataset_model(*args, **kwargs)
+
+    def waiting_iter_orig_datablocks(*args, **kwargs):
+        barrier.wait()
+        return iter_orig_datablocks(*args, **kwargs)
+
+    fake_client.scicat.get_dataset_model = waiting_get_dataset_model
+    fake_client.scicat.iter_orig_datablocks = waiting_iter_orig_datablocks
+
+    downloaded = fake_client.get_dataset(dset.pid)
+    assert downloaded.pid == dset.pid
+    assert downloaded.number_of_files == len(
+        INITIAL_ORIG_DATABLOCKS["raw"][0].dataFileList
+    )
+
+
+@pytest.mark.parametrize("max_concurrency", (1, 2, 3))
+def test_get_dataset_max_concurrency(scicat_backend, fake_client, max_concurrency):
+    dset = INITIAL_DATASETS["raw"]
+    downloaded = fake_client.get_dataset(
+        dset.pid, attachments=True, max_concurrency=max_concurrency
+    )
+    assert downloaded.pid == dset.pid
+    assert downloaded.attachments is not None
+
+
+def test_get_dataset_without_orig_datablocks_has_no_files(scicat_backend, fake_client):
+    dset = INITIAL_DATASETS["raw"]
+    fake_client.orig_datablocks.pop(dset.pid)
+    downloaded = fake_client.get_dataset(dset.pid)
+    assert downloaded.pid == dset.pid
+    assert downloaded.files == ()
+
+
+def test_get_dataset_raises_if_dataset_does_not_exist(fake_client):
+    with pytest.raises(ScicatCommError):
+        fake_client.get_dataset(PID(pid="bad-pid"), attachments=True)
+
+
+def test_get_dataset_models(scicat_client):
+    dsets = [INITIAL_DATASETS["raw"], INITIAL_DATASETS["derived"]]
+    downloaded = scicat_client.get_dataset_models([dset.pid for dset in dsets])
+    assert sorted(str(d.pid) for d in downloaded) == sorted(str(d.pid) for d in dsets)
+
+
+def test_get_dataset_models_skips_missing(scicat_client):
+    dset = INITIAL_DATASETS["raw"]
+    downloaded = scicat_client.get_dataset_models([PID(pid="bad-pid"), dset.pid])
+    assert [d.pid for d in downloaded] == [dset.pid]
+
+
+def test_get_dataset_models_no_pids(scicat_client):
+    assert scicat_client.get_dataset_models([]) == []
+
+
+def test_get_orig_datablocks_for_datasets(scicat_client):
+    dblocks = scicat_client.get_orig_datablocks_for_datasets(
+        [INITIAL_DATASETS["raw"].pid, INITIAL_DATASETS["derived"].pid]
+    )
+    expected = INITIAL_ORIG_DATABLOCKS["raw"] + INITIAL_ORIG_DATABLOCKS["derived"]
+    assert sorted(str(d.datasetId) for d in dblocks) == sorted(
+        str(d.datasetId) for d in expected
+    )
+
+
+def scicat_with_page_size(page_size, documents):
+    client = ScicatClient.from_token(
+        url="https://scicat/api/v3", token="abc"  # noqa: S106
+    )
+
+    def handler(method, url, headers):
+        limits = json.loads(session.query_params[-1]["filter"]).get("limits", {})
+        skip = limits.get("skip", 0)
+        # Like SciCat, never return more than one page.
+        limit = min(limits.get("limit", page_size), page_size)
+        return 200, documents[skip : skip + limit], {}
+
+    session = ScriptedSession(handler)
+    client._session = session
+    return client
+
+
+@pytest.mark.parametrize(
+    ("method", "id_key", "document"),
+    [
+        (
+            "get_orig_datablocks_for_datasets",
+            "_id",
+            {"ownerGroup": "uu", "size": 1, "dataFileList": []},
+        ),
+        (
+            "get_attachments_for_datasets",
+            "id",
+            {"ownerGroup": "uu", "caption": "c"},
+        ),
+    ],
+)
+def test_get_models_for_datasets_pages_through_results(
+    monkeypatch, method, id_key, document
+):
+    monkeypatch.setattr("scitacean.client._INQ_PAGE_SIZE", 2)
+    documents = [
+        {id_key: f"id{i}", "datasetId": f"PID.prefix/{i % 2}", **document}
+        for i in range(5)
+    ]
+    client = scicat_with_page_size(2, documents)
+    models = getattr(client, method)(
+        [PID.parse("PID.prefix/0"), PID.parse("PID.prefix/1")]
+    )
+    assert [m.id for m in models] == [f"id{i}" for i in range(5)]
+    limits = [
+        json.loads(params["filter"])["limits"]
+        for params in client._session.query_params
+    ]
+    assert limits == [
+        {"skip": skip, "limit": 2, "order": "_id:asc"} for skip in (0, 2, 4)
+    ]
+
+
+def test_get_dataset_models_pages_through_results(monkeypatch):
+    monkeypatch.setattr("scitacean.client._INQ_PAGE_SIZE", 2)
+    documents = [{"pid": f"PID.prefix/{i}", "type": "raw"} for i in range(4)]
+    client = scicat_with_page_size(2, documents)
+    models = client.get_dataset_models([PID.parse(d["pid"]) for d in documents])
+    assert [str(m.pid) for m in models] == [d["pid"] for d in documents]
+    # The last page is empty.
+    assert len(client._session.query_params) == 3
+
+
+def test_get_datasets_returns_datasets_in_input_order(client):
+    pids = [
+        INITIAL_DATASETS["derived"].pid,
+        INITIAL_DATASETS["raw"].pid,
+        INITIAL_DATASETS["derived"].pid,
+    ]
+    downloaded = client.get_datasets(pids)
+    assert [d.pid for d in downloaded] == pids
+    for dset in downloaded:
+        assert dset == client.get_dataset(dset.pid)
+
+
+@pytest.mark.parametrize("batch_size", (1, 2, 100))
+def test_get_datasets_batch_size(client, batch_size):
+    pids = [INITIAL_DATASETS["raw"].pid, INITIAL_DATASETS["derived"].pid]
+    downloaded = client.get_datasets(pids, batch_size=batch_size)
+    assert [d.pid for d in downloaded] == pids
+
+
+def test_get_datasets_with_attachments(client):
+    pids = [INITIAL_DATASETS["raw"].pid, INITIAL_DATASETS["derived"].pid]
+    downloaded = client.get_datasets(pids, attachments=True)
+    for dset in downloaded:
+        assert dset == client.get_dataset(dset.pid, attachments=True)
+
+
+def test_get_datasets_reports_missing_dataset(client):
+    pids = [INITIAL_DATASETS["raw"].pid, PID(pid="bad-pid")]
+    downloaded = client.get_datasets(pids)
+    assert downloaded[0].pid == pids[0]
+    assert isinstance(downloaded[1], ScicatCommError)
+
+
+def test_get_datasets_reports_failed_batches(scicat_backend, fake_client):
+    pids = [INITIAL_DATASETS["raw"].pid, INITIAL_DATASETS["derived"].pid]
+    failing = fake_client.scicat.get_dataset_models
+
+    def get_dataset_models(batch, **kwargs):
+        if INITIAL_DATASETS["raw"].pid in batch:
+            raise ScicatCommError("Request failed")
+        return failing(batch, **kwargs)
+
+    fake_client.scicat.get_dataset_models = get_dataset_models
+    downloaded = fake_client.get_datasets(pids, batch_size=1)
+    assert isinstance(downloaded[0], ScicatCommError)
+    assert downloaded[1].pid == pids[1]
+
+
+def test_get_datasets_coalesces_requests(scicat_backend, fake_client):
+    calls = []
+    get_dataset_models = fake_client.scicat.get_dataset_models
+
+    def recording_get_dataset_models(batch, **kwargs):
+        calls.append(list(batch))
+        return get_dataset_models(batch, **kwargs)
+
+    fake_client.scicat.get_dataset_models = recording_get_dataset_models
+    pids = [dset.pid for dset in INITIAL_DATASETS.values()] * 2
+    fake_client.get_datasets(pids, batch_size=2)
+    unique_pids = list(dict.fromkeys(pids))
+    assert calls == [unique_pids[i : i + 2] for i in range(0, len(unique_pids), 2)]
+
+
+def test_query_dataset_models_filter(scicat_client):
+    dset = INITIAL_DATASETS["raw"]
+    downloaded = scicat_client.query_dataset_models({"pid": str(dset.pid)})
+    assert [d.pid for d in downloaded] == [dset.pid]
+
+
+def test_query_dataset_models_fields(scicat_client):
+    dset = INITIAL_DATASETS["raw"]
+    (downloaded,) = scicat_client.query_dataset_models(
+        {"pid": str(dset.pid)}, fields=["pid", "sourceFolder"]
+    )
+    assert downloaded.sourceFolder == dset.sourceFolder
+    assert downloaded.owner is None
+
+
+def test_query_datasets_yields_all_matches(client):
+    dset = INITIAL_DATASETS["derived"]
+    downloaded = list(client.query_datasets({"owner": dset.owner}))
+    assert dset.pid in [d.pid for d in downloaded]
+    for d in downloaded:
+        assert d.owner == dset.owner
+
+
+@pytest.mark.parametrize("prefetch", (True, False))
+@pytest.mark.parametrize("page_size", (1, 2, 3, 100))
+def test_query_datasets_pages(fake_client, page_size, prefetch):
+    downloaded = list(
+        fake_client.query_datasets(
+            page_size=page_size, prefetch=prefetch, order="pid:asc"
+        )
+    )
+    assert [d.pid for d in downloaded] == sorted(
+        fake_client.datasets, key=lambda pid: str(pid)
+    )
+
+
+def test_query_datasets_includes_files(scicat_backend, fake_client):
+    dset = INITIAL_DATASETS["raw"]
+    (downloaded,) = fake_client.query_datasets({"pid": str(dset.pid)})
+    assert downloaded == fake_client.get_dataset(dset.pid)
+
+
+def test_query_datasets_fields(scicat_backend, fake_client):
+    dset = INITIAL_DATASETS["raw"]
+    (downloaded,) = fake_client.query_datasets(
+        {"pid": str(dset.pid)}, fields=["sourceFolder"]
+    )
+    assert downloaded.pid == dset.pid
+    assert downloaded.type == dset.type
+    assert downloaded.source_folder == dset.sourceFolder
+    assert downloaded.owner is None
+
+
+def test_get_dataset_fields(scicat_backend, fake_client):
+    dset = INITIAL_DATASETS["raw"]
+    downloaded = fake_client.get_dataset(dset.pid, fields=["owner"])
+    assert downloaded.pid == dset.pid
+    assert downloaded.type == dset.type
+    assert downloaded.owner == dset.owner
+    assert downloaded.source_folder is None
+    assert downloaded.meta == {}
+    assert "source_folder" in downloaded.unfetched_fields
+    assert "meta" in downloaded.unfetched_fields
+    assert "owner" not in downloaded.unfetched_fields
+    assert "pid" not in downloaded.unfetched_fields
+
+
+def test_get_dataset_all_fields_are_fetched_by_default(scicat_backend, fake_client):
+    downloaded = fake_client.get_dataset(INITIAL_DATASETS["raw"].pid)
+    assert downloaded.unfetched_fields == frozenset()
+
+
+def test_get_datasets_fields(scicat_backend, fake_client):
+    pids = [dset.pid for dset in INITIAL_DATASETS.values()]
+    downloaded = fake_client.get_datasets(pids, fields=["sourceFolder"])
+    for dset, expected in zip(downloaded, INITIAL_DATASETS.values()):
+        assert dset.pid == expected.pid
+        assert dset.source_folder == expected.sourceFolder
+        assert dset.owner is None
+        assert "owner" in dset.unfetched_fields
+
+
+def test_get_dataset_model_fields_sends_projection():
+    dset = INITIAL_DATASETS["raw"]
+    client = ScicatClient.from_token(
+        url="https://scicat/api/v3", token="abc"  # noqa: S106
+    )
+    client._session = ScriptedSession(
+        lambda *_: (200, [{"pid": str(dset.pid), "type": "raw", "owner": "me"}], {})
+    )
+    downloaded = client.get_dataset_model(dset.pid, fields=["pid", "type", "owner"])
+    assert downloaded.owner == "me"
+    assert downloaded.sourceFolder is None
+
+    (params,) = client._session.query_params
+    assert json.loads(params["filter"]) == {
+        "where": {"pid": {"inq": [str(dset.pid)]}},
+        "fields": ["pid", "type", "owner"],
+    }
+
+
+def test_query_datasets_is_lazy(scicat_backend, fake_client):
+    skips = []
+    query_dataset_models = fake_client.scicat.query_dataset_models
+
+    def recording_query_dataset_models(*args, **kwargs):
+        skips.append(kwargs["skip"])
+        return query_dataset_models(*args, **kwargs)
+
+    fake_client.scicat.query_dataset_models = recording_query_dataset_models
+    datasets = fake_client.query_datasets(page_size=1, prefetch=False)
+    assert skips == []
+    next(datasets)
+    assert skips == [0]
+    next(datasets)
+    assert skips == [0, 1]
+    datasets.close()
+
+
+def record_calls(fake_client, name):
+    calls = []
+    method = getattr(fake_client.scicat, name)
+
+    def recording(*args, **kwargs):
+        calls.append(args)
+        return method(*args, **kwargs)
+
+    setattr(fake_client.scicat, name, recording)
+    return calls
+
+
+def test_get_dataset_lazy_files_loads_on_access(scicat_backend, fake_client):
+    calls = record_calls(fake_client, "iter_orig_datablocks")
+    pid = INITIAL_DATASETS["raw"].pid
+    dset = fake_client.get_dataset(pid, lazy_files=True)
+
+    assert dset.pid == pid
+    assert not dset.files_are_loaded
+    assert not calls
+
+    assert dset.number_of_files == len(INITIAL_ORIG_DATABLOCKS["raw"][0].dataFileList)
+    assert dset.files_are_loaded
+    assert dset == fake_client.get_dataset(pid)
+    assert len(calls) == 2  # lazy access + eager comparison
+
+
+def test_comparing_lazy_dataset_does_not_load_files(scicat_backend, fake_client):
+    calls = record_calls(fake_client, "iter_orig_datablocks")
+    pid = INITIAL_DATASETS["raw"].pid
+    dset = fake_client.get_dataset(pid, lazy_files=True)
+    eager = fake_client.get_dataset(pid)
+    calls.clear()
+
+    assert dset == dset
+    assert dset != eager
+    assert eager != dset
+    assert dset != fake_client.get_dataset(pid, lazy_files=True)
+    assert not calls
+    assert not dset.files_are_loaded
+
+    dset.number_of_files  # noqa: B018
+    assert dset == eager
+
+
+def test_replacing_fields_of_lazy_dataset_does_not_load_files(
+    scicat_backend, fake_client
+):
+    calls = record_calls(fake_client, "iter_orig_datablocks")
+    pid = INITIAL_DATASETS["raw"].pid
+    dset = fake_client.get_dataset(pid, lazy_files=True)
+
+    replaced = dset.replace(name="new name")
+    assert not calls
+    assert not dset.files_are_loaded
+    assert not replaced.files_are_loaded
+    assert replaced.name == "new name"
+
+    assert replaced.number_of_files == len(
+        INITIAL_ORIG_DATABLOCKS["raw"][0].dataFileList
+    )
+    assert len(calls) == 1
+
+
+def test_load_files_loads_in_batches(scicat_backend, fake_client):
+    calls = record_calls(fake_client, "get_orig_datablocks_for_datasets")
+    lazy_calls = record_calls(fake_client, "iter_orig_datablocks")
+    pids = [dset.pid for dset in INITIAL_DATASETS.values()]
+    datasets = [fake_client.get_dataset(pid, lazy_files=True) for pid in pids]
+
+    fake_client.load_files(*datasets, datasets[0], batch_size=2)
+
+    assert [list(batch) for (batch,) in calls] == [
+        pids[i : i + 2] for i in range(0, len(pids), 2)
+    ]
+    assert all(dset.files_are_loaded for dset in datasets)
+    for dset in datasets:
+        assert dset == fake_client.get_dataset(dset.pid)
+    # Only the eager downloads for comparison.
+    assert len(lazy_calls) == len(datasets)
+
+
+def test_load_files_skips_loaded_datasets(scicat_backend, fake_client):
+    calls = record_calls(fake_client, "get_orig_datablocks_for_datasets")
+    dset = fake_client.get_dataset(INITIAL_DATASETS["raw"].pid)
+    fake_client.load_files(dset)
+    assert not calls
@@ -0,0 +1,116 @@
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright (c) 2023 SciCat Project (https://github.com/SciCatProject/scitacean)
+
+import datetime
+from typing import List
+
+import pytest
+import requests
+from dateutil.parser import parse as parse_date
+
+from scitacean import PID, Dataset, DatasetType, ScicatCommError
+from scitacean.testing.client import FakeClient
+from scitacean.testing.transfer import FakeFileTransfer
+from scitacean.util.instrumentation import Event, RequestEvent, TransferEvent
+from scitacean.util.retry import RetryPolicy
+
+from ..common.files import make_file
+from ..common.http import DATASET_JSON, make_scripted_client
+
+
+def test_hooks_receive_request_events():
+    events: List[Event] = []
+    client = make_scripted_client(
+        lambda *_: (200, DATASET_JSON, {}), hooks=[events.append]
+    )
+    client.get_dataset_model(PID.parse("PID.prefix/abcd"))
+
+    [event] = events
+    assert isinstance(event, RequestEvent)
+    assert event.operation == "get_dataset_model"
+    assert event.method == "GET"
+    assert event.url == "datasets/{pid}"
+    assert event.status_code == 200
+    assert event.bytes_received > 0
+    assert event.duration >= 0
+
+
+def test_url_template_keeps_sub_resource():
+    events: List[Event] = []
+    client = make_scripted_client(lambda *_: (200, [], {}), hooks=[events.append])
+    client.get_attachments_for_dataset(PID.parse("PID.prefix/abcd"))
+    [event] = events
+    assert isinstance(event, RequestEvent)
+    assert event.url == "datasets/{pid}/attachments"
+
+
+def test_failed_requests_are_reported():
+    events: List[Event] = []
+    client = make_scripted_client(
+        lambda *_: (404, {"error": "nope"}, {}), hooks=[events.append]
+    )
+    with pytest.raises(ScicatCommError):
+        client.get_dataset_model(PID.parse("PID.prefix/abcd"))
+    [event] = events
+    assert isinstance(event, RequestEvent)
+    assert event.status_code == 404
+    assert not event.succeeded
+
+
+def test_connection_errors_are_reported_per_attempt():
+    def handler(*_):
+        raise requests.ConnectionError("no connection")
+
+    events: List[Event] = []
+    client = make_scripted_client(
+        handler,
+        hooks=[events.append],
+        retry=RetryPolicy(
+            max_attempts=2, initial_backoff=datetime.timedelta(seconds=0)
+        ),
+    )
+    with pytest.raises(requests.ConnectionError):
+        client.get_dataset_model(PID.parse("PID.prefix/abcd"))
+    assert len(events) == 2
+    for event in events:
+        assert isinstance(event, RequestEvent)
+        assert event.status_code is None
+    assert client.stats()["get_dataset_model"].failures == 2
+
+
+def test_stats_count_requests():
+    client = make_scripted_client(lambda *_: (200, DATASET_JSON, {}))
+    for _ in range(3):
+        client.get_dataset_model(PID.parse("PID.prefix/abcd"))
+    stats = client.stats()["get_dataset_model"]
+    assert stats.count == 3
+    assert stats.failures == 0
+    assert stats.p50 <= stats.p99
+
+
+def test_client_stats_include_file_transfers(fs):
+    make_file(fs, path="file.nxs", contents=b"contents of file.nxs")
+    dataset = Dataset(
+        contact_email="p.stibbons@uu.am",
+        creation_time=parse_date("2011-08-24T12:34:56Z"),
+        investigator="ridcully@uu.am",
+        owner="PonderStibbons",
+        owner_group="uu",
+        source_folder="/hex/source123",
+        type=DatasetType.DERIVED,
+        input_datasets=[],
+        used_software=["EasyScience"],
+    )
+    dataset.add_local_files("file.nxs")
+    events: List[Event] = []
+    client = FakeClient(file_transfer=FakeFileTransfer(fs=fs))
+    client.scicat._hooks.append(events.append)
+
+    finalized = client.upload_new_dataset_now(dataset)
+    client.download_files(finalized, target="download")
+
+    assert [e.operation for e in events] == ["upload_files", "download_files"]
+    assert all(isinstance(e, TransferEvent) for e in events)
+    assert events[0].bytes_sent == len(b"contents of file.nxs")
+    assert events[1].bytes_received == len(b"contents of file.nxs")
+    assert client.stats()["upload_files"].count == 1
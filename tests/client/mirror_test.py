@@ -0,0 +1,246 @@
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright (c) 2023 SciCat Project (https://github.com/SciCatProject/scitacean)
+
+import json
+from urllib.parse import unquote
+
+import pytest
+import requests
+from dateutil.parser import parse as parse_date
+
+from scitacean import PID, Client, ScicatCommError
+from scitacean.util.mirror import MetadataMirror
+
+from ..common.http import ScriptedSession, make_scripted_client
+
+
+def make_dataset_json(i, *, updated_at="2023-10-01T00:00:00Z"):
+    return {
+        "pid": f"PID.prefix/{i:04d}",
+        "type": "raw",
+        "owner": "me",
+        "ownerGroup": "mine",
+        "sourceFolder": f"/data/{i}",
+        "contactEmail": "me@mine.mine",
+        "creationTime": f"2023-09-{i + 1:02d}T12:00:00Z",
+        "updatedAt": updated_at,
+        "principalInvestigator": "mine@mine.mine",
+        "scientificMetadata": {"index": i},
+    }
+
+
+def make_orig_datablock_json(pid):
+    return {
+        "id": f"dblock-{pid}",
+        "datasetId": pid,
+        "size": 10,
+        "ownerGroup": "mine",
+        "dataFileList": [
+            {"path": "file.nxs", "size": 10, "time": "2023-10-01T12:00:00Z"}
+        ],
+    }
+
+
+class Server:
+    """Minimal SciCat backend for the requests made by the mirror."""
+
+    def __init__(self, n_datasets):
+        self.datasets = {
+            dset["pid"]: dset for dset in map(make_dataset_json, range(n_datasets))
+        }
+        self.orig_datablocks = {
+            pid: [make_orig_datablock_json(pid)] for pid in self.datasets
+        }
+        self.session = ScriptedSession(self.handle)
+        self.online = True
+
+    @property
+    def filters(self):
+        return [
+            json.loads(params["filter"])
+            for params in self.session.query_params
+            if params and "filter" in params
+        ]
+
+    def handle(self, method, url, headers):
+        if not self.online:
+            raise requests.ConnectionError("offline")
+        path = unquote(url.split("/api/v3/", 1)[1])
+        if path.startswith("datasets/") and path.endswith("/origdatablocks"):
+            pid = path[len("datasets/") : -len("/origdatablocks")]
+            return 200, self.orig_datablocks.get(pid, []), {}
+        if path.startswith("datasets/"):
+            pid = path[len("datasets/") :]
+            if pid not in self.datasets:
+                return 404, {"error": "not found"}, {}
+            return 200, self.datasets[pid], {}
+        query = self.filters[-1]
+        if path == "origdatablocks":
+            pids = query["where"]["datasetId"]["inq"]
+            return (
+                200,
+                [d for pid in pids for d in self.orig_datablocks.get(pid, [])],
+                {},
+            )
+        return 200, self.query_datasets(query), {}
+
+    def query_datasets(self, query):
+        matches = list(self.datasets.values())
+        for key, condition in query.get("where", {}).items():
+            if isinstance(condition, dict) and "gte" in condition:
+                matches = [
+                    d
+                    for d in matches
+                    if parse_date(d[key]) >= parse_date(condition["gte"])
+                ]
+            elif isinstance(condition, dict) and "inq" in condition:
+                matches = [d for d in matches if d[key] in condition["inq"]]
+            else:
+                matches = [d for d in matches if d[key] == condition]
+        limits = query.get("limits", {})
+        for order in reversed(limits.get("order", "").split(",")):
+            if order:
+                key, direction = order.split(":")
+                matches.sort(key=lambda d: d[key], reverse=direction == "desc")
+        skip = limits.get("skip", 0)
+        limit = limits.get("limit", len(matches))
+        return matches[skip : skip + limit]
+
+
+def make_client(server, mirror):
+    scicat = make_scripted_client(server.handle, mirror=mirror)
+    # Clients share the session of the server which records all requests.
+    scicat._session = server.session
+    return Client(client=scicat, file_transfer=None)
+
+
+def test_get_dataset_stores_dataset_in_mirror():
+    server = Server(2)
+    mirror = MetadataMirror()
+    client = make_client(server, mirror)
+    pid = PID.parse("PID.prefix/0001")
+    client.get_dataset(pid)
+    assert pid in mirror
+    assert len(mirror) == 1
+    orig_datablocks = mirror.get_orig_datablocks(pid)
+    assert orig_datablocks is not None
+    assert len(orig_datablocks) == 1
+
+
+def test_offline_mirror_serves_get_dataset():
+    server = Server(2)
+    mirror = MetadataMirror()
+    client = make_client(server, mirror)
+    pid = PID.parse("PID.prefix/0001")
+    online = client.get_dataset(pid)
+
+    server.online = False
+    mirror.offline = True
+    offline = client.get_dataset(pid)
+    assert offline == online
+    assert offline.meta == {"index": 1}
+    assert [f.remote_path.posix for f in offline.files] == ["file.nxs"]
+
+
+def test_offline_mirror_raises_for_missing_dataset():
+    server = Server(1)
+    server.online = False
+    client = make_client(server, MetadataMirror(offline=True))
+    with pytest.raises(ScicatCommError):
+        client.get_dataset(PID.parse("PID.prefix/0000"))
+
+
+def test_offline_mirror_serves_get_datasets():
+    server = Server(3)
+    mirror = MetadataMirror()
+    client = make_client(server, mirror)
+    client.refresh_mirror()
+
+    server.online = False
+    mirror.offline = True
+    pids = [PID.parse(pid) for pid in server.datasets] + [PID.parse("PID.prefix/x")]
+    downloaded = client.get_datasets(pids)
+    assert [d.pid for d in downloaded[:3]] == pids[:3]
+    assert all(len(list(d.files)) == 1 for d in downloaded[:3])
+    assert isinstance(downloaded[3], ScicatCommError)
+
+
+def test_refresh_mirror_downloads_all_datasets():
+    server = Server(5)
+    mirror = MetadataMirror()
+    client = make_client(server, mirror)
+    assert client.refresh_mirror(page_size=2) == 5
+    assert len(mirror) == 5
+    for pid in server.datasets:
+        assert mirror.get_orig_datablocks(pid) is not None
+    assert all(f.get("limits", {}).get("skip", 0) == 0 for f in server.filters)
+
+
+def test_refresh_mirror_does_not_skip_datasets_updated_during_refresh():
+    server = Server(5)
+    for i, pid in enumerate(server.datasets):
+        server.datasets[pid]["updatedAt"] = f"2023-10-0{i + 1}T00:00:00Z"
+    mirror = MetadataMirror()
+    client = make_client(server, mirror)
+
+    handle = server.handle
+
+    def update_first_dataset_after_first_page(method, url, headers):
+        if len(server.filters) == 2:
+            pid = "PID.prefix/0000"
+            server.datasets[pid] = {
+                **server.datasets[pid],
+                "owner": "someone else",
+                "updatedAt": "2023-10-09T00:00:00Z",
+            }
+        return handle(method, url, headers)
+
+    server.session.handler = update_first_dataset_after_first_page
+    assert client.refresh_mirror(page_size=2) == 6
+    assert len(mirror) == 5
+    updated = mirror.get_dataset_model("PID.prefix/0000")
+    assert updated is not None
+    assert updated.owner == "someone else"
+
+
+def test_refresh_mirror_only_downloads_updated_datasets():
+    server = Server(5)
+    mirror = MetadataMirror()
+    client = make_client(server, mirror)
+    client.refresh_mirror()
+
+    updated_pid = "PID.prefix/0002"
+    server.datasets[updated_pid] = {
+        **server.datasets[updated_pid],
+        "owner": "someone else",
+        "updatedAt": "2023-10-02T00:00:00Z",
+    }
+    # Datasets updated at the same time as the last refresh are downloaded again.
+    assert client.refresh_mirror() == 1 + 4
+    assert server.filters[-2]["where"]["updatedAt"] == {
+        "gte": "2023-10-01T00:00:00.000000Z"
+    }
+    updated = mirror.get_dataset_model(updated_pid)
+    assert updated is not None
+    assert updated.owner == "someone else"
+
+    # Only the most recently updated dataset is downloaded again.
+    assert client.refresh_mirror() == 1
+
+
+def test_refresh_mirror_tracks_filters_separately():
+    server = Server(3)
+    mirror = MetadataMirror()
+    client = make_client(server, mirror)
+    client.refresh_mirror({"pid": "PID.prefix/0000"})
+    assert len(mirror) == 1
+    assert client.refresh_mirror() == 3
+    assert len(mirror) == 3
+
+
+def test_refresh_mirror_requires_online_mirror():
+    server = Server(1)
+    with pytest.raises(ValueError, match="mirror"):
+        make_client(server, None).refresh_mirror()
+    with pytest.raises(ValueError, match="mirror"):
+        make_client(server, MetadataMirror(offline=True)).refresh_mirror()
@@ -0,0 +1,185 @@
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright (c) 2023 SciCat Project (https://github.com/SciCatProject/scitacean)
+
+import datetime
+from typing import List
+
+import pytest
+import requests
+
+from scitacean import PID, ScicatCommError, model
+from scitacean.util.retry import CircuitBreaker, RetryPolicy
+
+from ..common.http import DATASET_JSON, make_scripted_client
+
+PID_ = PID.parse("PID.prefix/abcd")
+
+
+@pytest.fixture(autouse=True)
+def sleeps(monkeypatch):
+    sleeps: List[float] = []
+    monkeypatch.setattr("scitacean.client.time.sleep", sleeps.append)
+    return sleeps
+
+
+def make_client(responses, **kwargs):
+    responses = iter(responses)
+
+    def handler(method, url, headers):
+        response = next(responses)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    return make_scripted_client(handler, **kwargs)
+
+
+def test_no_retry_by_default():
+    client = make_client([(503, None, {}), (200, DATASET_JSON, {})])
+    with pytest.raises(ScicatCommError, match="503"):
+        client.get_dataset_model(PID_)
+    assert len(client._session.requests) == 1
+
+
+@pytest.mark.parametrize("status", (429, 502, 503, 504))
+def test_retries_get_on_retryable_status(status, sleeps):
+    client = make_client(
+        [(status, None, {}), (status, None, {}), (200, DATASET_JSON, {})],
+        retry=RetryPolicy(),
+    )
+    assert client.get_dataset_model(PID_).owner == "me"
+    assert len(client._session.requests) == 3
+    assert len(sleeps) == 2
+
+
+def test_does_not_retry_client_errors():
+    client = make_client(
+        [(404, None, {}), (200, DATASET_JSON, {})], retry=RetryPolicy()
+    )
+    with pytest.raises(ScicatCommError, match="404"):
+        client.get_dataset_model(PID_)
+    assert len(client._session.requests) == 1
+
+
+def test_retries_connection_errors():
+    client = make_client(
+        [requests.ConnectionError("dropped"), (200, DATASET_JSON, {})],
+        retry=RetryPolicy(),
+    )
+    assert client.get_dataset_model(PID_).owner == "me"
+    assert len(client._session.requests) == 2
+
+
+def test_does_not_retry_post():
+    client = make_client([(503, None, {}), (200, {}, {})], retry=RetryPolicy())
+    with pytest.raises(ScicatCommError, match="503"):
+        client.create_orig_datablock(
+            model.UploadOrigDatablock(
+                datasetId=PID_, size=0, dataFileList=[], ownerGroup="mine"
+            )
+        )
+    assert len(client._session.requests) == 1
+
+
+def test_gives_up_after_max_attempts():
+    client = make_client(
+        [(503, None, {})] * 3 + [(200, DATASET_JSON, {})],
+        retry=RetryPolicy(max_attempts=3),
+    )
+    with pytest.raises(ScicatCommError, match="503"):
+        client.get_dataset_model(PID_)
+    assert len(client._session.requests) == 3
+
+
+def test_uses_jittered_exponential_backoff(sleeps):
+    client = make_client(
+        [(503, None, {})] * 4 + [(200, DATASET_JSON, {})],
+        retry=RetryPolicy(
+            max_attempts=5,
+            initial_backoff=datetime.timedelta(seconds=1),
+            max_backoff=datetime.timedelta(seconds=3),
+        ),
+    )
+    client.get_dataset_model(PID_)
+    assert len(sleeps) == 4
+    for sleep, bound in zip(sleeps, (1, 2, 3, 3)):
+        assert 0 <= sleep <= bound
+
+
+def test_honors_retry_after(sleeps):
+    client = make_client(
+        [(429, None, {"Retry-After": "7"}), (200, DATASET_JSON, {})],
+        retry=RetryPolicy(),
+    )
+    client.get_dataset_model(PID_)
+    assert sleeps == [7.0]
+
+
+def test_gives_up_if_retry_after_exceeds_max_elapsed(sleeps):
+    client = make_client(
+        [(503, None, {"Retry-After": "120"}), (200, DATASET_JSON, {})],
+        retry=RetryPolicy(max_elapsed=datetime.timedelta(seconds=60)),
+    )
+    with pytest.raises(ScicatCommError, match="503"):
+        client.get_dataset_model(PID_)
+    assert sleeps == []
+
+
+def test_circuit_breaker_blocks_requests_after_failures():
+    breaker = CircuitBreaker(failure_threshold=2)
+    client = make_client([(503, None, {})] * 3, circuit_breaker=breaker)
+    for _ in range(2):
+        with pytest.raises(ScicatCommError, match="503"):
+            client.get_dataset_model(PID_)
+    assert breaker.is_open
+    with pytest.raises(ScicatCommError, match="failed 2 times in a row"):
+        client.get_dataset_model(PID_)
+    assert len(client._session.requests) == 2
+
+
+def test_circuit_breaker_is_shared_between_clients():
+    breaker = CircuitBreaker(failure_threshold=1)
+    failing = make_client([(502, None, {})], circuit_breaker=breaker)
+    other = make_client([(200, DATASET_JSON, {})], circuit_breaker=breaker)
+    with pytest.raises(ScicatCommError, match="502"):
+        failing.get_dataset_model(PID_)
+    with pytest.raises(ScicatCommError, match="in a row"):
+        other.get_dataset_model(PID_)
+    assert not other._session.requests
+
+
+def test_circuit_breaker_closes_after_successful_trial():
+    breaker = CircuitBreaker(
+        failure_threshold=1, reset_timeout=datetime.timedelta(seconds=0)
+    )
+    client = make_client(
+        [(503, None, {}), (200, DATASET_JSON, {}), (200, DATASET_JSON, {})],
+        circuit_breaker=breaker,
+    )
+    with pytest.raises(ScicatCommError, match="503"):
+        client.get_dataset_model(PID_)
+    states = [breaker.is_open]
+    client.get_dataset_model(PID_)
+    states.append(breaker.is_open)
+    client.get_dataset_model(PID_)
+    assert states == [True, False]
+
+
+@pytest.mark.parametrize(
+    "error",
+    [requests.exceptions.ChunkedEncodingError("broken"), RuntimeError("hook failed")],
+    ids=["request-error", "other-error"],
+)
+def test_circuit_breaker_allows_new_trial_after_trial_raised(error):
+    breaker = CircuitBreaker(
+        failure_threshold=1, reset_timeout=datetime.timedelta(seconds=0)
+    )
+    client = make_client(
+        [(503, None, {}), error, (200, DATASET_JSON, {})], circuit_breaker=breaker
+    )
+    with pytest.raises(ScicatCommError, match="503"):
+        client.get_dataset_model(PID_)
+    with pytest.raises(type(error)):
+        client.get_dataset_model(PID_)
+    client.get_dataset_model(PID_)
+    assert not breaker.is_open
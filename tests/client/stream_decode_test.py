@@ -0,0 +1,166 @@
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright (c) 2023 SciCat Project (https://github.com/SciCatProject/scitacean)
+
+import json
+
+import pytest
+from hypothesis import given
+from hypothesis import strategies as st
+
+from scitacean import PID, File, RemotePath
+from scitacean._internal.json_stream import iter_objects_with_streamed_list
+from scitacean.datablock import OrigDatablock
+from scitacean.util.cache import MetadataCache
+
+from ..common.http import make_scripted_client
+
+DATABLOCKS = [
+    {
+        "_id": "dblock-1",
+        "datasetId": "PID.prefix/abcd",
+        "size": 1234,
+        "ownerGroup": "uu",
+        "accessGroups": ["faculty", "wizards"],
+        "dataFileList": [
+            {"path": "a.nxs", "size": 1000, "time": "2023-09-30T12:00:00Z"},
+            {"path": "sub/b.log", "size": 234, "time": "2023-09-30T12:00:01Z"},
+        ],
+        "chkAlg": "md5",
+    },
+    {
+        "_id": "dblock-2",
+        "datasetId": "PID.prefix/abcd",
+        "chkAlg": "sha256",
+        "size": 0,
+        "ownerGroup": "uu",
+        "dataFileList": [],
+    },
+    {
+        "_id": "dblock-3",
+        "datasetId": "PID.prefix/abcd",
+        "size": 1.5e3,
+        "ownerGroup": "uu",
+        "dataFileList": [{"path": "c", "size": 1500, "time": "2023-09-30T12:00:02Z"}],
+    },
+]
+
+
+def split(data, sizes):
+    chunks = []
+    for size in sizes:
+        if not data:
+            break
+        chunks.append(data[:size])
+        data = data[size:]
+    if data:
+        chunks.append(data)
+    return chunks
+
+
+def decode(chunks):
+    return [
+        (fields, items)
+        for fields, items in iter_objects_with_streamed_list(
+            chunks, key="dataFileList", convert=lambda item, _: item
+        )
+    ]
+
+
+def expected_decoded(datablocks):
+    return [
+        (
+            {key: val for key, val in dblock.items() if key != "dataFileList"},
+            dblock.get("dataFileList", []),
+        )
+        for dblock in datablocks
+    ]
+
+
+@given(sizes=st.lists(st.integers(min_value=1, max_value=64), max_size=100))
+def test_decode_arbitrary_chunks(sizes):
+    data = json.dumps(DATABLOCKS).encode()
+    assert decode(split(data, sizes)) == expected_decoded(DATABLOCKS)
+
+
+@given(sizes=st.lists(st.integers(min_value=1, max_value=8), max_size=200))
+def test_decode_splits_multibyte_characters(sizes):
+    datablocks = [{"owner": "Ponder Stibbons ÄÖÜ ⛺", "dataFileList": [{"path": "ö"}]}]
+    data = json.dumps(datablocks, ensure_ascii=False, indent=2).encode()
+    assert decode(split(data, sizes)) == expected_decoded(datablocks)
+
+
+@pytest.mark.parametrize("number", ("1.5e3", "-12.25", "1E-2", "100"))
+def test_decode_number_split_at_every_position(number):
+    data = f'[{{"size": {number}}}]'.encode()
+    start = data.index(number.encode())
+    for cut in range(start + 1, start + len(number)):
+        assert decode([data[:cut], data[cut:]]) == [({"size": json.loads(number)}, [])]
+
+
+@pytest.mark.parametrize("document", ("[]", " [ ] ", ""))
+def test_decode_empty(document):
+    assert decode([document.encode()]) == []
+
+
+def test_decode_object_without_list():
+    assert decode([b'[{"a": 1}, {}]']) == [({"a": 1}, []), ({}, [])]
+
+
+def test_convert_receives_preceding_fields():
+    seen = []
+
+    def convert(item, fields):
+        seen.append(dict(fields))
+        return item
+
+    list(
+        iter_objects_with_streamed_list(
+            [json.dumps(DATABLOCKS[:1]).encode()], key="dataFileList", convert=convert
+        )
+    )
+    assert all(s["accessGroups"] == ["faculty", "wizards"] for s in seen)
+    assert all("chkAlg" not in s for s in seen)
+
+
+@pytest.mark.parametrize("document", ('{"a": 1}', "[{]", '[{"a": 1} {"b": 2}]', "[1"))
+def test_decode_invalid(document):
+    with pytest.raises(json.JSONDecodeError):
+        decode([document.encode()])
+
+
+def make_client(**kwargs):
+    return make_scripted_client(lambda *_: (200, DATABLOCKS, {}), **kwargs)
+
+
+@pytest.mark.parametrize("cache", (None, MetadataCache()))
+def test_iter_orig_datablocks(cache):
+    client = make_client(cache=cache)
+    dblocks = list(client.iter_orig_datablocks(PID.parse("PID.prefix/abcd")))
+    assert [dblock.datablock_id for dblock in dblocks] == [
+        "dblock-1",
+        "dblock-2",
+        "dblock-3",
+    ]
+    assert [dblock.checksum_algorithm for dblock in dblocks] == ["md5", "sha256", None]
+    assert dblocks[0].access_groups == ["faculty", "wizards"]
+
+    files = list(dblocks[0].files)
+    assert all(isinstance(file, File) for file in files)
+    assert [file.remote_path for file in files] == [
+        RemotePath("a.nxs"),
+        RemotePath("sub/b.log"),
+    ]
+    assert [file.size for file in files] == [1000, 234]
+    # chkAlg comes after dataFileList in the response.
+    assert all(file.checksum_algorithm == "md5" for file in files)
+    assert not list(dblocks[1].files)
+
+
+def test_iter_orig_datablocks_matches_get_orig_datablocks():
+    client = make_client()
+    streamed = list(client.iter_orig_datablocks(PID.parse("PID.prefix/abcd")))
+    loaded = [
+        OrigDatablock.from_download_model(dblock)
+        for dblock in client.get_orig_datablocks(PID.parse("PID.prefix/abcd"))
+    ]
+    assert streamed == loaded
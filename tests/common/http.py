@@ -0,0 +1,76 @@
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright (c) 2023 SciCat Project (https://github.com/SciCatProject/scitacean)
+
+import io
+import json
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import requests
+
+from scitacean.client import ScicatClient
+
+Handler = Callable[[str, str, Dict[str, str]], Tuple[int, Any, Dict[str, str]]]
+
+
+class ScriptedSession(requests.Session):
+    """Session that answers requests with a handler instead of a server.
+
+    The handler receives the method, URL, and headers of a request and returns
+    the status code, JSON content, and headers of the response.
+    It may also raise an exception to simulate a connection error.
+    Request bodies and query parameters are recorded in ``bodies``
+    and ``query_params``.
+    """
+
+    def __init__(self, handler: Handler) -> None:
+        super().__init__()
+        self.handler = handler
+        self.requests: List[Tuple[str, str, Dict[str, str]]] = []
+        self.bodies: List[Optional[bytes]] = []
+        self.query_params: List[Optional[Dict[str, Any]]] = []
+
+    def request(  # type: ignore[override]
+        self,
+        method: str,
+        url: str,
+        *,
+        headers: Optional[Dict[str, str]] = None,
+        **kwargs: Any,
+    ) -> requests.Response:
+        headers = headers or {}
+        self.requests.append((method, url, headers))
+        self.bodies.append(kwargs.get("data"))
+        self.query_params.append(kwargs.get("params"))
+        status, content, response_headers = self.handler(method, url, headers)
+        response = requests.Response()
+        response.status_code = status
+        response.raw = io.BytesIO(json.dumps(content).encode() if content else b"")
+        response.headers.update(response_headers)
+        return response
+
+
+# Minimal download model of a raw dataset.
+DATASET_JSON = {
+    "pid": "PID.prefix/abcd",
+    "type": "raw",
+    "owner": "me",
+    "ownerGroup": "mine",
+    "sourceFolder": "/data",
+    "contactEmail": "me@mine.mine",
+    "creationTime": "2023-09-30T12:00:00Z",
+    "principalInvestigator": "mine@mine.mine",
+}
+
+
+def make_scripted_client(
+    handler: Handler, *, token: str = "abc", **kwargs: Any  # noqa: S107
+) -> ScicatClient:
+    """Return a client whose requests are answered by ``handler``.
+
+    Additional keyword arguments are forwarded to
+    :meth:`scitacean.client.ScicatClient.from_token`.
+    The session is available as ``client._session``.
+    """
+    client = ScicatClient.from_token(url="https://scicat/api/v3", token=token, **kwargs)
+    client._session = ScriptedSession(handler)
+    return client
@@ -0,0 +1,167 @@
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright (c) 2023 SciCat Project (https://github.com/SciCatProject/scitacean)
+
+import hashlib
+import os
+import shutil
+import threading
+from pathlib import Path
+from typing import Any, Callable, List, Optional, Tuple
+
+from paramiko import SFTPAttributes
+
+
+class LocalSFTPClient:
+    """Stand-in for paramiko.SFTPClient that operates on a local directory.
+
+    Remote paths are interpreted relative to ``root``.
+    Implements the subset of the SFTPClient interface used by
+    ``scitacean.transfer.sftp``.
+    Every call is recorded in ``calls`` as a tuple of the method name and
+    remote path.
+    ``fail_on`` can be set to a predicate of the method name and remote path
+    to make calls raise an ``OSError``.
+    ``read_limit`` and ``write_limit`` can be set to make reads from and writes
+    to files returned by ``open`` raise an ``OSError`` after the given total
+    number of bytes was transferred.
+    ``supports_check_file`` selects whether the simulated server supports
+    the 'check-file' extension used by ``SFTPFile.check``.
+    """
+
+    def __init__(self, root: Path, *, name: str = "client") -> None:
+        self.root = root
+        self.name = name
+        self.calls: List[Tuple[str, str]] = []
+        self.closed = False
+        self.fail_on: Optional[Callable[[str, str], bool]] = None
+        self.read_limit: Optional[int] = None
+        self.write_limit: Optional[int] = None
+        self.bytes_read = 0
+        self.bytes_written = 0
+        self.supports_check_file = False
+        self._lock = threading.Lock()
+
+    def _path(self, method: str, remotepath: str) -> Path:
+        with self._lock:
+            self.calls.append((method, remotepath))
+        if self.closed:
+            raise OSError("Socket is closed")
+        if self.fail_on is not None and self.fail_on(method, remotepath):
+            raise OSError(f"Simulated failure in {method}({remotepath})")
+        return self.root / remotepath.lstrip("/")
+
+    def get(self, remotepath: str, localpath: str, **kwargs: Any) -> None:
+        shutil.copyfile(self._path("get", remotepath), localpath)
+
+    def put(self, localpath: str, remotepath: str, **kwargs: Any) -> SFTPAttributes:
+        path = self._path("put", remotepath)
+        shutil.copyfile(localpath, path)
+        return SFTPAttributes.from_stat(path.stat())
+
+    def open(
+        self, filename: str, mode: str = "r", bufsize: int = -1
+    ) -> "LocalSFTPFile":
+        return LocalSFTPFile(self, self._path("open", filename).open(mode))
+
+    def stat(self, path: str) -> SFTPAttributes:
+        local = self._path("stat", path)
+        if not local.exists():
+            raise FileNotFoundError(path)
+        return SFTPAttributes.from_stat(local.stat())
+
+    def posix_rename(self, oldpath: str, newpath: str) -> None:
+        os.replace(self._path("posix_rename", oldpath), self._path("", newpath))
+
+    def mkdir(self, path: str, mode: int = 0o777) -> None:
+        self._path("mkdir", path).mkdir()
+
+    def listdir(self, path: str = ".") -> List[str]:
+        return os.listdir(self._path("listdir", path))
+
+    def remove(self, path: str) -> None:
+        self._path("remove", path).unlink()
+
+    def rmdir(self, path: str) -> None:
+        self._path("rmdir", path).rmdir()
+
+    def get_channel(self) -> None:
+        # There is no SSH channel, so keepalive and channel checks are skipped.
+        return None
+
+    def close(self) -> None:
+        self.closed = True
+
+
+class LocalSFTPFile:
+    """Stand-in for paramiko.SFTPFile."""
+
+    def __init__(self, client: LocalSFTPClient, file: Any) -> None:
+        self._client = client
+        self._file = file
+
+    def __enter__(self) -> "LocalSFTPFile":
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        self._file.close()
+
+    def seek(self, offset: int, whence: int = os.SEEK_SET) -> None:
+        self._file.seek(offset, whence)
+
+    def prefetch(self, file_size: Optional[int] = None) -> None:
+        pass
+
+    def set_pipelined(self, pipelined: bool = True) -> None:
+        pass
+
+    def check(
+        self, hash_algorithm: str, offset: int = 0, length: int = 0, block_size: int = 0
+    ) -> bytes:
+        if not self._client.supports_check_file:
+            raise OSError("Operation unsupported")
+        position = self._file.tell()
+        self._file.seek(offset)
+        data = self._file.read(length or -1)
+        self._file.seek(position)
+        return hashlib.new(hash_algorithm, data).digest()
+
+    def write(self, data: bytes) -> None:
+        limit = self._client.write_limit
+        if limit is not None:
+            remaining = limit - self._client.bytes_written
+            if remaining < len(data):
+                self._file.write(data[: max(remaining, 0)])
+                self._client.bytes_written = limit
+                raise OSError("Simulated connection loss")
+        self._file.write(data)
+        self._client.bytes_written += len(data)
+
+    def read(self, size: int = -1) -> bytes:
+        limit = self._client.read_limit
+        if limit is not None:
+            remaining = limit - self._client.bytes_read
+            if remaining <= 0:
+                raise OSError("Simulated connection loss")
+            size = remaining if size < 0 else min(size, remaining)
+        data: bytes = self._file.read(size)
+        self._client.bytes_read += len(data)
+        return data
+
+
+class LocalSFTPConnector:
+    """Connect function for SFTPFileTransfer that returns LocalSFTPClients.
+
+    All clients share the same root directory.
+    """
+
+    def __init__(self, root: Path, *, max_clients: Optional[int] = None) -> None:
+        self.root = root
+        self.max_clients = max_clients
+        self.clients: List[LocalSFTPClient] = []
+
+    def __call__(self, host: str, port: Optional[int]) -> LocalSFTPClient:
+        if self.max_clients is not None and len(self.clients) >= self.max_clients:
+            raise OSError("Too many sessions")
+        client = LocalSFTPClient(self.root, name=f"client{len(self.clients)}")
+        self.clients.append(client)
+        return client
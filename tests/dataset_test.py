@@ -765,3 +765,16 @@ def test_derive_removes_attachments(initial, attachments):
     initial.attachments = attachments
     derived = initial.derive()
     assert derived.attachments == []
+
+
+def test_replace_removes_replaced_fields_from_unfetched_fields():
+    dset = Dataset.from_download_models(
+        model.DownloadDataset.model_construct(pid=PID(pid="abc"), type="raw"),
+        orig_datablock_models=[],
+        fetched_fields=["pid", "type"],
+    )
+    assert {"owner", "meta"} <= dset.unfetched_fields
+    replaced = dset.replace(owner="me")
+    assert "owner" not in replaced.unfetched_fields
+    assert "meta" in replaced.unfetched_fields
+    assert "source_folder" in replaced.unfetched_fields
@@ -327,6 +327,39 @@ def test_download_does_not_download_up_to_date_file_manual_checksum(
     assert all(file.local_path is not None for file in downloaded.files)
 
 
+def test_download_downloads_incomplete_file_without_computing_checksum(
+    fs, dataset_and_files, monkeypatch
+):
+    dataset, contents = dataset_and_files
+    client = Client.without_login(
+        url="/", file_transfer=FakeFileTransfer(fs=fs, files=contents)
+    )
+    client.download_files(dataset, target="./download", select="thaum.dat")
+    with open("download/thaum.dat", "r+b") as f:
+        f.truncate(3)
+
+    def no_checksum(*args, **kwargs):
+        raise AssertionError("Must not compute checksum")
+
+    monkeypatch.setattr(
+        File, "_local_is_up_to_date_with_checksum_algorithm", no_checksum
+    )
+
+    class RaisingDownloader(FakeFileTransfer):
+        source_dir = "/"
+
+        @contextmanager
+        def connect_for_download(self):
+            raise RuntimeError("Download disabled")
+
+    client = Client.without_login(
+        url="/",
+        file_transfer=RaisingDownloader(fs=fs),
+    )
+    with pytest.raises(RuntimeError, match="Download disabled"):
+        client.download_files(dataset, target="./download", select="thaum.dat")
+
+
 def test_override_datablock_checksum(fs, dataset_and_files):
     # Ensure the file exists locally
     dataset, contents = dataset_and_files
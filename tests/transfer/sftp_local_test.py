@@ -0,0 +1,747 @@
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright (c) 2023 SciCat Project (https://github.com/SciCatProject/scitacean)
+"""Tests of SFTPFileTransfer that do not need an SFTP server.
+
+These use ``LocalSFTPClient`` which operates on a local directory.
+"""
+
+import dataclasses
+import hashlib
+import threading
+from datetime import timedelta
+from typing import List
+
+import pytest
+
+from scitacean import Client, Dataset, File, FileUploadError, RemotePath
+from scitacean.transfer.sftp import SFTPFileTransfer
+
+from ..common.sftp import LocalSFTPConnector
+
+
+@pytest.fixture()
+def remote_root(tmp_path):
+    root = tmp_path / "remote"
+    root.mkdir()
+    return root
+
+
+def make_remote_files(remote_root, n):
+    folder = remote_root / "data"
+    folder.mkdir(exist_ok=True)
+    for i in range(n):
+        folder.joinpath(f"file{i}.dat").write_bytes(bytes([i]) * (100 + i))
+    return [RemotePath(f"/data/file{i}.dat") for i in range(n)]
+
+
+def test_download_files_single_connection(remote_root, tmp_path):
+    remote = make_remote_files(remote_root, 3)
+    connector = LocalSFTPConnector(remote_root)
+    sftp = SFTPFileTransfer(host="fileserver", connect=connector)
+    local = [tmp_path / f"file{i}.dat" for i in range(3)]
+    with sftp.connect_for_download() as con:
+        con.download_files(remote=remote, local=local)
+
+    assert len(connector.clients) == 1
+    for i, path in enumerate(local):
+        assert path.read_bytes() == bytes([i]) * (100 + i)
+
+
+def test_download_files_parallel(remote_root, tmp_path):
+    remote = make_remote_files(remote_root, 8)
+    connector = LocalSFTPConnector(remote_root)
+    sftp = SFTPFileTransfer(host="fileserver", connect=connector, n_connections=3)
+    local = [tmp_path / f"file{i}.dat" for i in range(8)]
+    with sftp.connect_for_download() as con:
+        con.download_files(remote=remote, local=local)
+
+    assert len(connector.clients) == 3
+    assert all(client.closed for client in connector.clients)
+    for i, path in enumerate(local):
+        assert path.read_bytes() == bytes([i]) * (100 + i)
+    downloaded = sorted(
+        path for client in connector.clients for method, path in client.calls
+    )
+    assert downloaded == sorted(r.posix for r in remote)
+
+
+def test_download_files_parallel_idle_connections_take_remaining_files(
+    remote_root, tmp_path
+):
+    remote = make_remote_files(remote_root, 4)
+    connector = LocalSFTPConnector(remote_root)
+    sftp = SFTPFileTransfer(host="fileserver", connect=connector, n_connections=2)
+    local = [tmp_path / f"file{i}.dat" for i in range(4)]
+
+    # The first connection is stuck on its first file until
+    # the second connection has downloaded all other files.
+    fast_downloads = []
+    release = threading.Event()
+
+    def patch(client, *, slow):
+        original_get = client.get
+
+        def get(remotepath, localpath, **kwargs):
+            if slow:
+                assert release.wait(5)
+            original_get(remotepath, localpath)
+            if not slow:
+                fast_downloads.append(remotepath)
+                if len(fast_downloads) == 3:
+                    release.set()
+
+        client.get = get
+
+    with sftp.connect_for_download() as con:
+        con._extra_clients.get(1)
+        patch(connector.clients[0], slow=True)
+        patch(connector.clients[1], slow=False)
+        con.download_files(remote=remote, local=local)
+
+    assert len(fast_downloads) == 3
+    for i, path in enumerate(local):
+        assert path.read_bytes() == bytes([i]) * (100 + i)
+
+
+def test_download_files_opens_at_most_one_connection_per_file(remote_root, tmp_path):
+    remote = make_remote_files(remote_root, 2)
+    connector = LocalSFTPConnector(remote_root)
+    sftp = SFTPFileTransfer(host="fileserver", connect=connector, n_connections=4)
+    with sftp.connect_for_download() as con:
+        con.download_files(
+            remote=remote, local=[tmp_path / "a.dat", tmp_path / "b.dat"]
+        )
+    assert len(connector.clients) == 2
+
+
+def test_download_files_uses_available_connections_if_server_refuses_more(
+    remote_root, tmp_path
+):
+    remote = make_remote_files(remote_root, 5)
+    connector = LocalSFTPConnector(remote_root, max_clients=2)
+    sftp = SFTPFileTransfer(host="fileserver", connect=connector, n_connections=4)
+    local = [tmp_path / f"file{i}.dat" for i in range(5)]
+    with sftp.connect_for_download() as con:
+        con.download_files(remote=remote, local=local)
+    assert len(connector.clients) == 2
+    assert all(path.exists() for path in local)
+
+
+def test_download_files_parallel_raises_first_error(remote_root, tmp_path):
+    remote = make_remote_files(remote_root, 6)
+    remote.append(RemotePath("/data/does-not-exist.dat"))
+    connector = LocalSFTPConnector(remote_root)
+    sftp = SFTPFileTransfer(host="fileserver", connect=connector, n_connections=3)
+    local = [tmp_path / f"file{i}.dat" for i in range(7)]
+    with pytest.raises(FileNotFoundError, match="does-not-exist"):
+        with sftp.connect_for_download() as con:
+            con.download_files(remote=remote, local=local)
+    assert all(client.closed for client in connector.clients)
+
+
+def test_n_connections_must_be_positive():
+    with pytest.raises(ValueError, match="n_connections"):
+        SFTPFileTransfer(host="fileserver", n_connections=0)
+
+
+@pytest.mark.parametrize(
+    "source_folder", ["/upload/{uid}", "/upload/{owner}-{uid}", RemotePath("/{uid}")]
+)
+def test_resumable_rejects_source_folder_with_uid(source_folder):
+    with pytest.raises(ValueError, match="uid"):
+        SFTPFileTransfer(host="fileserver", source_folder=source_folder, resumable=True)
+
+
+@pytest.mark.parametrize("source_folder", [None, "/upload/{owner}", "/upload/{uids}"])
+def test_resumable_accepts_source_folder_without_uid(source_folder):
+    SFTPFileTransfer(host="fileserver", source_folder=source_folder, resumable=True)
+
+
+def interrupted_connector(connector, *, read_limit=None, write_limit=None):
+    def connect(host, port):
+        client = connector(host, port)
+        client.read_limit = read_limit
+        client.write_limit = write_limit
+        return client
+
+    return connect
+
+
+def test_download_files_resumable_resumes_interrupted_download(remote_root, tmp_path):
+    (remote,) = make_remote_files(remote_root, 1)
+    local = tmp_path / "file0.dat"
+    connector = LocalSFTPConnector(remote_root)
+    sftp = SFTPFileTransfer(
+        host="fileserver",
+        connect=interrupted_connector(connector, read_limit=60),
+        resumable=True,
+    )
+    with pytest.raises(OSError, match="connection loss"):
+        with sftp.connect_for_download() as con:
+            con.download_files(remote=[remote], local=[local])
+    assert not local.exists()
+    assert tmp_path.joinpath("file0.dat.part").read_bytes() == bytes([0]) * 60
+
+    sftp = SFTPFileTransfer(host="fileserver", connect=connector, resumable=True)
+    with sftp.connect_for_download() as con:
+        con.download_files(remote=[remote], local=[local])
+    assert local.read_bytes() == bytes([0]) * 100
+    assert connector.clients[-1].bytes_read == 40
+    assert sorted(tmp_path.iterdir()) == [local, remote_root]
+
+
+def test_download_files_resumable_restarts_if_remote_file_changed(
+    remote_root, tmp_path
+):
+    (remote,) = make_remote_files(remote_root, 1)
+    local = tmp_path / "file0.dat"
+    connector = LocalSFTPConnector(remote_root)
+    sftp = SFTPFileTransfer(
+        host="fileserver",
+        connect=interrupted_connector(connector, read_limit=60),
+        resumable=True,
+    )
+    with pytest.raises(OSError, match="connection loss"):
+        with sftp.connect_for_download() as con:
+            con.download_files(remote=[remote], local=[local])
+
+    remote_root.joinpath("data", "file0.dat").write_bytes(b"new content" * 10)
+    sftp = SFTPFileTransfer(host="fileserver", connect=connector, resumable=True)
+    with sftp.connect_for_download() as con:
+        con.download_files(remote=[remote], local=[local])
+    assert local.read_bytes() == b"new content" * 10
+    assert connector.clients[-1].bytes_read == 110
+
+
+def test_download_files_resumable_replaces_existing_file(remote_root, tmp_path):
+    remote = make_remote_files(remote_root, 3)
+    local = [tmp_path / f"file{i}.dat" for i in range(3)]
+    local[1].write_bytes(b"old content")
+    connector = LocalSFTPConnector(remote_root)
+    sftp = SFTPFileTransfer(
+        host="fileserver", connect=connector, n_connections=2, resumable=True
+    )
+    with sftp.connect_for_download() as con:
+        con.download_files(remote=remote, local=local)
+    for i, path in enumerate(local):
+        assert path.read_bytes() == bytes([i]) * (100 + i)
+    assert sorted(tmp_path.iterdir()) == [*local, remote_root]
+
+
+def make_large_remote_file(remote_root, size):
+    content = bytes(i % 251 for i in range(size))
+    remote_root.joinpath("data").mkdir(exist_ok=True)
+    remote_root.joinpath("data", "large.nxs").write_bytes(content)
+    return RemotePath("/data/large.nxs"), content
+
+
+def synchronized_connector(connector, n_clients, *, fail_client=None):
+    # Make all connections wait in their first call to open until all have
+    # started, so that each of them downloads one of the byte ranges.
+    barrier = threading.Barrier(n_clients, timeout=5)
+
+    def connect(host, port):
+        client = connector(host, port)
+        original_open = client.open
+
+        def open_(filename, mode="r", bufsize=-1):
+            if not any(method == "open" for method, _ in client.calls):
+                barrier.wait()
+            return original_open(filename, mode)
+
+        client.open = open_
+        if len(connector.clients) - 1 == fail_client:
+            client.fail_on = lambda method, path: method == "open"
+        return client
+
+    return connect
+
+
+def test_download_files_striped(remote_root, tmp_path):
+    small = make_remote_files(remote_root, 2)
+    large, content = make_large_remote_file(remote_root, 1000)
+    connector = LocalSFTPConnector(remote_root)
+    sftp = SFTPFileTransfer(
+        host="fileserver",
+        connect=synchronized_connector(connector, 3),
+        n_connections=3,
+        stripe_threshold=500,
+    )
+    local = [tmp_path / "file0.dat", tmp_path / "large.nxs", tmp_path / "file1.dat"]
+    with sftp.connect_for_download() as con:
+        con.download_files(remote=[small[0], large, small[1]], local=local)
+
+    assert local[0].read_bytes() == bytes([0]) * 100
+    assert local[1].read_bytes() == content
+    assert local[2].read_bytes() == bytes([1]) * 101
+    assert sorted(tmp_path.iterdir()) == sorted([*local, remote_root])
+    # Every connection has downloaded a part of the large file.
+    assert len(connector.clients) == 3
+    for client in connector.clients:
+        assert ("open", large.posix) in client.calls
+        assert ("get", large.posix) not in client.calls
+
+
+def test_download_files_striped_ignores_small_files(remote_root, tmp_path):
+    large, content = make_large_remote_file(remote_root, 1000)
+    connector = LocalSFTPConnector(remote_root)
+    sftp = SFTPFileTransfer(
+        host="fileserver", connect=connector, n_connections=3, stripe_threshold=1001
+    )
+    local = tmp_path / "large.nxs"
+    with sftp.connect_for_download() as con:
+        con.download_files(remote=[large], local=[local])
+
+    assert local.read_bytes() == content
+    assert len(connector.clients) == 1
+    assert ("get", large.posix) in connector.clients[0].calls
+
+
+def test_download_files_striped_stats_files_over_all_connections(remote_root, tmp_path):
+    remote = make_remote_files(remote_root, 3)
+    connector = LocalSFTPConnector(remote_root)
+    # Fails with a timeout if the files are stat'ed one after the other.
+    barrier = threading.Barrier(3, timeout=5)
+
+    def connect(host, port):
+        client = connector(host, port)
+        original_stat = client.stat
+
+        def stat(path):
+            if not any(method == "stat" for method, _ in client.calls):
+                barrier.wait()
+            return original_stat(path)
+
+        client.stat = stat  # type: ignore[method-assign]
+        return client
+
+    sftp = SFTPFileTransfer(
+        host="fileserver", connect=connect, n_connections=3, stripe_threshold=500
+    )
+    local = [tmp_path / path.name for path in remote]
+    with sftp.connect_for_download() as con:
+        con.download_files(remote=remote, local=local)
+
+    assert len(connector.clients) == 3
+    for client in connector.clients:
+        assert sum(method == "stat" for method, _ in client.calls) == 1
+
+
+def test_download_files_striped_removes_partial_file_on_error(remote_root, tmp_path):
+    large, _ = make_large_remote_file(remote_root, 1000)
+    connector = LocalSFTPConnector(remote_root)
+    sftp = SFTPFileTransfer(
+        host="fileserver",
+        connect=synchronized_connector(connector, 3, fail_client=1),
+        n_connections=3,
+        stripe_threshold=500,
+    )
+    local = tmp_path / "large.nxs"
+    with pytest.raises(OSError, match="Simulated failure"):
+        with sftp.connect_for_download() as con:
+            con.download_files(remote=[large], local=[local])
+
+    assert sorted(tmp_path.iterdir()) == [remote_root]
+    assert all(client.closed for client in connector.clients)
+
+
+def make_local_files(tmp_path, sizes, checksum_algorithm=None):
+    folder = tmp_path / "local"
+    folder.mkdir(exist_ok=True)
+    files = []
+    for i, size in enumerate(sizes):
+        path = folder / f"file{i}.dat"
+        path.write_bytes(bytes([i]) * size)
+        file = File.from_local(path, remote_path=f"file{i}.dat")
+        files.append(dataclasses.replace(file, checksum_algorithm=checksum_algorithm))
+    return files
+
+
+def upload_dataset():
+    return Dataset(type="raw", source_folder=RemotePath("/upload"))
+
+
+@pytest.mark.parametrize("n_connections", (1, 3))
+def test_upload_files(remote_root, tmp_path, n_connections):
+    sizes = [10, 300, 20, 200, 30]
+    files = make_local_files(tmp_path, sizes)
+    connector = LocalSFTPConnector(remote_root)
+    sftp = SFTPFileTransfer(
+        host="fileserver", connect=connector, n_connections=n_connections
+    )
+    with sftp.connect_for_upload(upload_dataset()) as con:
+        uploaded = con.upload_files(*files)
+
+    assert len(connector.clients) == n_connections
+    assert [f.remote_path for f in uploaded] == [f.remote_path for f in files]
+    assert [f.size for f in uploaded] == sizes
+    for i, size in enumerate(sizes):
+        assert remote_root.joinpath("upload", f"file{i}.dat").read_bytes() == (
+            bytes([i]) * size
+        )
+
+
+def test_upload_files_parallel_starts_with_largest_files(remote_root, tmp_path):
+    files = make_local_files(tmp_path, [10, 300, 20, 200, 30])
+    connector = LocalSFTPConnector(remote_root)
+    sftp = SFTPFileTransfer(host="fileserver", connect=connector, n_connections=2)
+    # Make both connections wait in their first upload until the other one
+    # has started, so that each of them gets one of the first two files.
+    barrier = threading.Barrier(2, timeout=5)
+
+    def patch(client):
+        original_put = client.put
+
+        def put(localpath, remotepath, **kwargs):
+            if sum(method == "put" for method, _ in client.calls) == 0:
+                barrier.wait()
+            return original_put(localpath, remotepath)
+
+        client.put = put
+
+    with sftp.connect_for_upload(upload_dataset()) as con:
+        for client in [connector.clients[0], *con._extra_clients.get(1)]:
+            patch(client)
+        con.upload_files(*files)
+
+    first_uploads = {
+        next(path for method, path in client.calls if method == "put")
+        for client in connector.clients
+    }
+    assert first_uploads == {"/upload/file1.dat", "/upload/file3.dat"}
+
+
+@pytest.mark.parametrize("n_connections", (1, 3))
+def test_upload_files_reverts_all_files_if_one_fails(
+    remote_root, tmp_path, n_connections
+):
+    files = make_local_files(tmp_path, [10, 300, 20, 200, 30])
+    connector = LocalSFTPConnector(remote_root)
+    sftp = SFTPFileTransfer(
+        host="fileserver", connect=connector, n_connections=n_connections
+    )
+    with pytest.raises(OSError, match="Simulated failure"):
+        with sftp.connect_for_upload(upload_dataset()) as con:
+            for client in [connector.clients[0], *con._extra_clients.get(4)]:
+                client.fail_on = lambda method, path: (
+                    method == "put" and path.endswith("file2.dat")
+                )
+            con.upload_files(*files)
+
+    assert not remote_root.joinpath("upload").exists()
+    assert all(client.closed for client in connector.clients)
+
+
+def test_upload_files_resumable_keeps_partial_files_on_failure(remote_root, tmp_path):
+    files = make_local_files(tmp_path, [100, 200])
+    connector = LocalSFTPConnector(remote_root)
+    sftp = SFTPFileTransfer(
+        host="fileserver",
+        connect=interrupted_connector(connector, write_limit=150),
+        resumable=True,
+    )
+    with pytest.raises(OSError, match="connection loss"):
+        with sftp.connect_for_upload(upload_dataset()) as con:
+            con.upload_files(*files)
+
+    assert sorted(p.name for p in remote_root.joinpath("upload").iterdir()) == [
+        "file0.dat.part",
+        "file1.dat.part",
+    ]
+    assert remote_root.joinpath("upload", "file0.dat.part").stat().st_size == 100
+    assert remote_root.joinpath("upload", "file1.dat.part").stat().st_size == 50
+
+
+def test_upload_files_resumable_keeps_staged_files_if_rename_fails(
+    remote_root, tmp_path
+):
+    files = make_local_files(tmp_path, [100, 200, 300])
+    connector = LocalSFTPConnector(remote_root)
+    sftp = SFTPFileTransfer(host="fileserver", connect=connector, resumable=True)
+    with pytest.raises(FileUploadError, match=r"file1\.dat") as exc_info:
+        with sftp.connect_for_upload(upload_dataset()) as con:
+            connector.clients[0].fail_on = lambda method, path: (
+                method == "posix_rename" and path.endswith("file1.dat.part")
+            )
+            con.upload_files(*files)
+
+    assert "Renamed files: /upload/file0.dat\n" in str(exc_info.value)
+    assert "still staged: /upload/file1.dat.part, /upload/file2.dat.part" in str(
+        exc_info.value
+    )
+    assert sorted(p.name for p in remote_root.joinpath("upload").iterdir()) == [
+        "file0.dat",
+        "file1.dat.part",
+        "file2.dat.part",
+    ]
+
+    sftp = SFTPFileTransfer(host="fileserver", connect=connector, resumable=True)
+    with sftp.connect_for_upload(upload_dataset()) as con:
+        con.upload_files(*files)
+    assert sorted(p.name for p in remote_root.joinpath("upload").iterdir()) == [
+        "file0.dat",
+        "file1.dat",
+        "file2.dat",
+    ]
+    assert remote_root.joinpath("upload", "file2.dat").read_bytes() == bytes([2]) * 300
+
+
+@pytest.mark.parametrize("supports_check_file", (True, False))
+def test_upload_files_resumable_resumes_interrupted_upload(
+    remote_root, tmp_path, supports_check_file
+):
+    files = make_local_files(tmp_path, [100, 200])
+    connector = LocalSFTPConnector(remote_root)
+    sftp = SFTPFileTransfer(
+        host="fileserver",
+        connect=interrupted_connector(connector, write_limit=150),
+        resumable=True,
+    )
+    with pytest.raises(OSError, match="connection loss"):
+        with sftp.connect_for_upload(upload_dataset()) as con:
+            con.upload_files(*files)
+
+    def connect(host, port):
+        client = connector(host, port)
+        client.supports_check_file = supports_check_file
+        return client
+
+    sftp = SFTPFileTransfer(host="fileserver", connect=connect, resumable=True)
+    with sftp.connect_for_upload(upload_dataset()) as con:
+        uploaded = con.upload_files(*files)
+
+    assert connector.clients[-1].bytes_written == 150
+    assert [f.size for f in uploaded] == [100, 200]
+    assert sorted(p.name for p in remote_root.joinpath("upload").iterdir()) == [
+        "file0.dat",
+        "file1.dat",
+    ]
+    assert remote_root.joinpath("upload", "file0.dat").read_bytes() == bytes([0]) * 100
+    assert remote_root.joinpath("upload", "file1.dat").read_bytes() == bytes([1]) * 200
+
+
+def test_upload_files_resumable_restarts_if_partial_file_does_not_match(
+    remote_root, tmp_path
+):
+    (file,) = make_local_files(tmp_path, [100])
+    remote_root.joinpath("upload").mkdir()
+    remote_root.joinpath("upload", "file0.dat.part").write_bytes(b"garbage")
+    connector = LocalSFTPConnector(remote_root)
+    sftp = SFTPFileTransfer(host="fileserver", connect=connector, resumable=True)
+    with sftp.connect_for_upload(upload_dataset()) as con:
+        con.upload_files(file)
+
+    assert connector.clients[-1].bytes_written == 100
+    assert remote_root.joinpath("upload", "file0.dat").read_bytes() == bytes([0]) * 100
+    assert not remote_root.joinpath("upload", "file0.dat.part").exists()
+
+
+def forbid_checksum_of_file(monkeypatch):
+    def checksum_of_file(*args, **kwargs):
+        raise AssertionError("Files must not be read again to compute the checksum")
+
+    monkeypatch.setattr("scitacean.file.checksum_of_file", checksum_of_file)
+
+
+def test_upload_files_computes_checksum_while_uploading(
+    remote_root, tmp_path, monkeypatch
+):
+    files = make_local_files(tmp_path, [100, 200], checksum_algorithm="md5")
+    connector = LocalSFTPConnector(remote_root)
+    sftp = SFTPFileTransfer(host="fileserver", connect=connector)
+    forbid_checksum_of_file(monkeypatch)
+    with sftp.connect_for_upload(upload_dataset()) as con:
+        uploaded = con.upload_files(*files)
+
+    for i, (file, size) in enumerate(zip(uploaded, [100, 200])):
+        expected = hashlib.md5(bytes([i]) * size).hexdigest()
+        assert file.checksum() == expected
+        assert file.make_model().chk == expected
+    assert not any(method == "put" for method, _ in connector.clients[0].calls)
+
+
+def test_upload_files_resumable_computes_checksum_of_whole_file(
+    remote_root, tmp_path, monkeypatch
+):
+    files = make_local_files(tmp_path, [100, 200], checksum_algorithm="sha256")
+    connector = LocalSFTPConnector(remote_root)
+    sftp = SFTPFileTransfer(
+        host="fileserver",
+        connect=interrupted_connector(connector, write_limit=150),
+        resumable=True,
+    )
+    with pytest.raises(OSError, match="connection loss"):
+        with sftp.connect_for_upload(upload_dataset()) as con:
+            con.upload_files(*files)
+
+    sftp = SFTPFileTransfer(host="fileserver", connect=connector, resumable=True)
+    forbid_checksum_of_file(monkeypatch)
+    with sftp.connect_for_upload(upload_dataset()) as con:
+        uploaded = con.upload_files(*files)
+
+    for i, (file, size) in enumerate(zip(uploaded, [100, 200])):
+        assert file.checksum() == hashlib.sha256(bytes([i]) * size).hexdigest()
+
+
+def download_all(sftp, remote, tmp_path):
+    local = [tmp_path / path.name for path in remote]
+    with sftp.connect_for_download() as con:
+        con.download_files(remote=remote, local=local)
+
+
+def test_pool_reuses_connections(remote_root, tmp_path):
+    remote = make_remote_files(remote_root, 3)
+    connector = LocalSFTPConnector(remote_root)
+    sftp = SFTPFileTransfer(host="fileserver", connect=connector, pool_size=2)
+    download_all(sftp, remote, tmp_path)
+    with sftp.connect_for_upload(upload_dataset()) as con:
+        con.upload_files(*make_local_files(tmp_path, [10]))
+    download_all(sftp, remote, tmp_path)
+
+    assert len(connector.clients) == 1
+    assert not connector.clients[0].closed
+    sftp.close()
+    assert connector.clients[0].closed
+
+
+def test_pool_reuses_parallel_connections(remote_root, tmp_path):
+    remote = make_remote_files(remote_root, 3)
+    connector = LocalSFTPConnector(remote_root)
+    sftp = SFTPFileTransfer(
+        host="fileserver", connect=connector, n_connections=3, pool_size=3
+    )
+    download_all(sftp, remote, tmp_path)
+    n_clients = len(connector.clients)
+    download_all(sftp, remote, tmp_path)
+
+    assert len(connector.clients) == n_clients
+    assert not any(client.closed for client in connector.clients)
+    sftp.close()
+    assert all(client.closed for client in connector.clients)
+
+
+def test_pool_closes_connections_beyond_pool_size(remote_root, tmp_path):
+    remote = make_remote_files(remote_root, 3)
+    connector = LocalSFTPConnector(remote_root)
+    sftp = SFTPFileTransfer(
+        host="fileserver",
+        connect=synchronized_connector(connector, 3),
+        n_connections=3,
+        stripe_threshold=1,
+        pool_size=1,
+    )
+    download_all(sftp, remote[:1], tmp_path)
+
+    assert len(connector.clients) == 3
+    assert sum(not client.closed for client in connector.clients) == 1
+
+
+class FakeTransport:
+    def __init__(self):
+        self.closed = False
+
+    def is_active(self):
+        return not self.closed
+
+    def set_keepalive(self, interval):
+        pass
+
+    def close(self):
+        self.closed = True
+
+
+class FakeChannel:
+    def __init__(self):
+        self.transport = FakeTransport()
+
+    @property
+    def closed(self):
+        return self.transport.closed
+
+    def get_transport(self):
+        return self.transport
+
+
+def connector_with_transports(connector, transports):
+    def connect(host, port):
+        client = connector(host, port)
+        channel = FakeChannel()
+        transports.append(channel.transport)
+        client.get_channel = lambda: channel
+        return client
+
+    return connect
+
+
+def test_pool_closes_transports(remote_root, tmp_path):
+    remote = make_remote_files(remote_root, 3)
+    connector = LocalSFTPConnector(remote_root)
+    transports: List[FakeTransport] = []
+    sftp = SFTPFileTransfer(
+        host="fileserver",
+        connect=connector_with_transports(
+            synchronized_connector(connector, 3), transports
+        ),
+        n_connections=3,
+        stripe_threshold=1,
+        pool_size=1,
+    )
+    download_all(sftp, remote[:1], tmp_path)
+    # Evicted when released to the full pool.
+    assert sum(transport.closed for transport in transports) == 2
+
+    sftp.close()
+    assert all(transport.closed for transport in transports)
+    assert all(client.closed for client in connector.clients)
+
+
+def test_pool_replaces_broken_connections(remote_root, tmp_path):
+    remote = make_remote_files(remote_root, 1)
+    connector = LocalSFTPConnector(remote_root)
+    sftp = SFTPFileTransfer(host="fileserver", connect=connector, pool_size=1)
+    download_all(sftp, remote, tmp_path)
+    connector.clients[0].fail_on = lambda method, path: True
+    download_all(sftp, remote, tmp_path)
+
+    assert len(connector.clients) == 2
+    assert connector.clients[0].closed
+    assert not connector.clients[1].closed
+
+
+def test_pool_closes_connections_after_idle_timeout(remote_root, tmp_path):
+    remote = make_remote_files(remote_root, 1)
+    connector = LocalSFTPConnector(remote_root)
+    sftp = SFTPFileTransfer(
+        host="fileserver",
+        connect=connector,
+        pool_size=1,
+        idle_timeout=timedelta(seconds=-1),
+    )
+    download_all(sftp, remote, tmp_path)
+    download_all(sftp, remote, tmp_path)
+
+    assert len(connector.clients) == 2
+    assert connector.clients[0].closed
+
+
+def test_context_manager_closes_pool(remote_root, tmp_path):
+    remote = make_remote_files(remote_root, 1)
+    connector = LocalSFTPConnector(remote_root)
+    with SFTPFileTransfer(host="fileserver", connect=connector, pool_size=1) as sftp:
+        download_all(sftp, remote, tmp_path)
+        assert [client.closed for client in connector.clients] == [False]
+    assert [client.closed for client in connector.clients] == [True]
+
+    # Connections are no longer pooled after closing.
+    download_all(sftp, remote, tmp_path)
+    assert len(connector.clients) == 2
+    assert connector.clients[1].closed
+
+
+def test_client_close_closes_pool(remote_root, tmp_path):
+    remote = make_remote_files(remote_root, 1)
+    connector = LocalSFTPConnector(remote_root)
+    sftp = SFTPFileTransfer(host="fileserver", connect=connector, pool_size=1)
+    download_all(sftp, remote, tmp_path)
+    Client.without_login(url="/", file_transfer=sftp).close()
+    assert connector.clients[0].closed
@@ -1,6 +1,7 @@
 # SPDX-License-Identifier: BSD-3-Clause
 # Copyright (c) 2023 SciCat Project (https://github.com/SciCatProject/scitacean)
 
+import threading
 from contextlib import contextmanager
 
 import pytest
@@ -11,6 +12,7 @@ from scitacean import (
     Client,
     Dataset,
     DatasetType,
+    RemotePath,
     ScicatCommError,
     Thumbnail,
 )
@@ -97,7 +99,8 @@ def test_upload_returns_updated_dataset_with_attachments(
     client, dataset_with_files, attachments
 ):
     dataset_with_files.attachments = attachments
-    finalized = client.upload_new_dataset_now(dataset_with_files)
+    # Concurrent uploads may store the attachments in any order.
+    finalized = client.upload_new_dataset_now(dataset_with_files, max_concurrency=1)
     expected = client.get_dataset(finalized.pid, attachments=True).replace(
         # The backend may update the dataset after upload
         _read_only={
@@ -136,7 +139,8 @@ def test_upload_creates_dataset_and_datablock(client, dataset_with_files):
 
 def test_upload_creates_attachments(client, dataset, attachments):
     dataset.attachments = attachments
-    finalized = client.upload_new_dataset_now(dataset)
+    # Concurrent uploads may store the attachments in any order.
+    finalized = client.upload_new_dataset_now(dataset, max_concurrency=1)
 
     uploaded = client.attachments[finalized.pid]
     assert len(uploaded) == len(attachments)
@@ -258,3 +262,143 @@ def test_failed_attachment_upload_does_not_revert(attachments, dataset_with_file
 
     assert get_file_transfer(client).files
     assert not get_file_transfer(client).reverted
+
+
+def test_upload_creates_attachments_concurrently(client, dataset):
+    dataset.attachments = [
+        Attachment(caption=f"Attachment no {i}", owner_group="uu") for i in range(9)
+    ]
+    # Requires 3 attachments to be created at the same time.
+    barrier = threading.Barrier(3, timeout=5)
+    create_attachment = client.scicat.create_attachment_for_dataset
+
+    def waiting_create_attachment(*args, **kwargs):
+        barrier.wait()
+        return create_attachment(*args, **kwargs)
+
+    client.scicat.create_attachment_for_dataset = waiting_create_attachment
+    finalized = client.upload_new_dataset_now(dataset, max_concurrency=3)
+
+    # Returned in input order, stored in any order.
+    assert [a.caption for a in finalized.attachments] == [
+        f"Attachment no {i}" for i in range(9)
+    ]
+    assert sorted(a.caption for a in client.attachments[finalized.pid]) == [
+        f"Attachment no {i}" for i in range(9)
+    ]
+
+
+@pytest.mark.parametrize("max_concurrency", (1, 4))
+def test_failed_concurrent_attachment_upload_reports_error(
+    dataset, fs, max_concurrency, monkeypatch
+):
+    dataset.attachments = [
+        Attachment(caption=f"Attachment no {i}", owner_group="uu") for i in range(5)
+    ]
+    client = FakeClient(file_transfer=FakeFileTransfer(fs=fs))
+    create_attachment = client.scicat.create_attachment_for_dataset
+
+    def failing_create_attachment(attachment, **kwargs):
+        if attachment.caption == "Attachment no 2":
+            raise ScicatCommError("Ingestion failed")
+        return create_attachment(attachment, **kwargs)
+
+    monkeypatch.setattr(
+        client.scicat, "create_attachment_for_dataset", failing_create_attachment
+    )
+    with pytest.raises(RuntimeError, match="Please upload the attachments manually"):
+        client.upload_new_dataset_now(dataset, max_concurrency=max_concurrency)
+    assert client.datasets
+
+
+def test_upload_creates_datablocks_concurrently(client, dataset_with_files):
+    finalized = client.upload_new_dataset_now(dataset_with_files, max_concurrency=4)
+    assert client.orig_datablocks[finalized.pid][0].datasetId == finalized.pid
+
+
+def make_datasets_with_files(dataset, fs, n):
+    datasets = []
+    for i in range(n):
+        make_file(fs, path=f"file{i}.nxs", contents=f"contents of file {i}".encode())
+        dset = dataset.replace(name=f"Data {i}", source_folder=f"/hex/source{i}")
+        dset.add_local_files(f"file{i}.nxs")
+        datasets.append(dset)
+    return datasets
+
+
+def test_upload_new_datasets_returns_datasets_in_order(client, dataset, fs):
+    datasets = make_datasets_with_files(dataset, fs, 5)
+    finalized = client.upload_new_datasets(datasets, max_file_uploads=2)
+
+    assert [dset.name for dset in finalized] == [f"Data {i}" for i in range(5)]
+    for dset in finalized:
+        assert client.datasets[dset.pid].datasetName == dset.name
+        assert client.orig_datablocks[dset.pid][0].datasetId == dset.pid
+    assert len(get_file_transfer(client).files) == 5
+
+
+def test_upload_new_datasets_reports_failures_per_dataset(dataset, fs, monkeypatch):
+    client = FakeClient(file_transfer=FakeFileTransfer(fs=fs))
+    create_dataset_model = client.scicat.create_dataset_model
+
+    def failing_create_dataset_model(dset):
+        if dset.datasetName == "Data 1":
+            raise ScicatCommError("Ingestion failed")
+        return create_dataset_model(dset)
+
+    monkeypatch.setattr(
+        client.scicat, "create_dataset_model", failing_create_dataset_model
+    )
+    datasets = make_datasets_with_files(dataset, fs, 3)
+    first, failed, last = client.upload_new_datasets(datasets)
+
+    assert isinstance(first, Dataset)
+    assert first.name == "Data 0"
+    assert isinstance(failed, ScicatCommError)
+    assert isinstance(last, Dataset)
+    assert last.name == "Data 2"
+    assert len(client.datasets) == 2
+    # Only the files of the failed dataset are reverted.
+    assert list(get_file_transfer(client).reverted) == [
+        RemotePath("/hex/source1/file1.nxs")
+    ]
+    assert len(get_file_transfer(client).files) == 2
+
+
+def test_upload_new_datasets_reports_failed_datablock_upload(dataset, fs):
+    client = FakeClient(
+        disable={"create_orig_datablock": ScicatCommError("Ingestion failed")},
+        file_transfer=FakeFileTransfer(fs=fs),
+    )
+    datasets = make_datasets_with_files(dataset, fs, 2)
+    finalized = client.upload_new_datasets(datasets)
+
+    assert all(isinstance(result, RuntimeError) for result in finalized)
+    assert len(client.datasets) == 2
+    assert not get_file_transfer(client).reverted
+
+
+def test_upload_new_datasets_uploads_files_while_creating_metadata(client, dataset, fs):
+    datasets = make_datasets_with_files(dataset, fs, 2)
+    # The datablock of the first dataset can only be created once the
+    # second dataset has been created, i.e., after its files were uploaded.
+    second_dataset_created = threading.Event()
+    create_dataset_model = client.scicat.create_dataset_model
+    create_orig_datablock = client.scicat.create_orig_datablock
+
+    def signalling_create_dataset_model(dset):
+        result = create_dataset_model(dset)
+        if dset.datasetName == "Data 1":
+            second_dataset_created.set()
+        return result
+
+    def waiting_create_orig_datablock(dblock):
+        if client.datasets[dblock.datasetId].datasetName == "Data 0":
+            assert second_dataset_created.wait(timeout=5)
+        return create_orig_datablock(dblock)
+
+    client.scicat.create_dataset_model = signalling_create_dataset_model
+    client.scicat.create_orig_datablock = waiting_create_orig_datablock
+    finalized = client.upload_new_datasets(datasets, max_file_uploads=1)
+
+    assert [dset.name for dset in finalized] == ["Data 0", "Data 1"]
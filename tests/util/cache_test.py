@@ -0,0 +1,57 @@
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright (c) 2023 SciCat Project (https://github.com/SciCatProject/scitacean)
+
+import datetime
+
+import pytest
+
+from scitacean.util.cache import MetadataCache
+
+
+def test_cache_stores_entries():
+    cache = MetadataCache()
+    cache._put(("a", ""), {"x": 1}, etag=None, last_modified=None)
+    entry = cache._get(("a", ""))
+    assert entry is not None
+    assert entry.content == {"x": 1}
+    assert len(cache) == 1
+
+
+def test_cache_evicts_least_recently_used():
+    cache = MetadataCache(max_size=2)
+    cache._put(("a", ""), 1, etag=None, last_modified=None)
+    cache._put(("b", ""), 2, etag=None, last_modified=None)
+    cache._get(("a", ""))
+    cache._put(("c", ""), 3, etag=None, last_modified=None)
+    assert cache._get(("b", "")) is None
+    entries = [cache._get(("a", "")), cache._get(("c", ""))]
+    assert [entry.content for entry in entries if entry is not None] == [1, 3]
+    assert len(cache) == 2
+
+
+def test_cache_drops_expired_entries_without_validators():
+    cache = MetadataCache(ttl=datetime.timedelta(seconds=0))
+    cache._put(("a", ""), 1, etag=None, last_modified=None)
+    assert cache._get(("a", "")) is None
+    assert len(cache) == 0
+
+
+def test_cache_keeps_expired_entries_with_validators():
+    cache = MetadataCache(ttl=datetime.timedelta(seconds=0))
+    cache._put(("a", ""), 1, etag='"v1"', last_modified=None)
+    entry = cache._get(("a", ""))
+    assert entry is not None
+    assert entry.content == 1
+    assert entry.etag == '"v1"'
+
+
+def test_cache_clear():
+    cache = MetadataCache()
+    cache._put(("a", ""), 1, etag=None, last_modified=None)
+    cache.clear()
+    assert len(cache) == 0
+
+
+def test_cache_max_size_must_be_positive():
+    with pytest.raises(ValueError, match="max_size"):
+        MetadataCache(max_size=0)
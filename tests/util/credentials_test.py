@@ -0,0 +1,161 @@
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright (c) 2023 SciCat Project (https://github.com/SciCatProject/scitacean)
+
+import datetime
+import pickle
+import threading
+import time
+from typing import List
+
+import pytest
+
+from scitacean.util import credentials
+from scitacean.util.credentials import RenewingStr
+
+
+class Renewer:
+    def __init__(self, lifetime=None):
+        self.lifetime = lifetime
+        self.calls = 0
+        self.fail = False
+
+    def __call__(self):
+        if self.fail:
+            raise RuntimeError("login failed")
+        self.calls += 1
+        return f"token-{self.calls}", self.lifetime
+
+
+class FakeClock:
+    def __init__(self, monkeypatch):
+        self.now = 1000.0
+        monkeypatch.setattr(
+            "scitacean.util.credentials.time.monotonic", lambda: self.now
+        )
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+def test_renewing_str_renews_on_init():
+    renew = Renewer()
+    storage = RenewingStr(renew=renew)
+    assert renew.calls == 1
+    assert storage.get_str() == "token-1"
+
+
+def test_renewing_str_renews_before_expiry(monkeypatch):
+    clock = FakeClock(monkeypatch)
+    renew = Renewer(lifetime=datetime.timedelta(minutes=60))
+    storage = RenewingStr(renew=renew, renew_before=datetime.timedelta(minutes=5))
+
+    clock.advance(54 * 60)
+    assert storage.get_str() == "token-1"
+    clock.advance(2 * 60)
+    assert storage.get_str() == "token-2"
+    assert storage.get_str() == "token-2"
+    assert renew.calls == 2
+
+
+def test_renewing_str_renews_short_lived_value_after_half_lifetime(monkeypatch):
+    clock = FakeClock(monkeypatch)
+    renew = Renewer(lifetime=datetime.timedelta(minutes=2))
+    storage = RenewingStr(renew=renew, renew_before=datetime.timedelta(minutes=5))
+
+    assert storage.get_str() == "token-1"
+    clock.advance(59)
+    assert storage.get_str() == "token-1"
+    assert renew.calls == 1
+    clock.advance(1)
+    assert storage.get_str() == "token-2"
+    assert storage.get_str() == "token-2"
+    assert renew.calls == 2
+
+
+def test_renewing_str_measures_lifetime_from_before_renew(monkeypatch):
+    clock = FakeClock(monkeypatch)
+    renew = Renewer(lifetime=datetime.timedelta(minutes=60))
+
+    def slow_renew():
+        clock.advance(10 * 60)
+        return renew()
+
+    storage = RenewingStr(renew=slow_renew, renew_before=datetime.timedelta(minutes=5))
+    # The value expires 60min after renew was called, not after it returned.
+    clock.advance(44 * 60)
+    assert storage.get_str() == "token-1"
+    clock.advance(2 * 60)
+    assert storage.get_str() == "token-2"
+
+
+def test_renewing_str_without_lifetime_uses_max_lifetime(monkeypatch):
+    clock = FakeClock(monkeypatch)
+    renew = Renewer(lifetime=None)
+    storage = RenewingStr(renew=renew, max_lifetime=datetime.timedelta(hours=1))
+    clock.advance(3601)
+    assert storage.get_str() == "token-2"
+
+
+def test_renewing_str_without_any_lifetime_is_never_renewed(monkeypatch):
+    clock = FakeClock(monkeypatch)
+    renew = Renewer(lifetime=None)
+    storage = RenewingStr(renew=renew)
+    clock.advance(10**6)
+    assert storage.get_str() == "token-1"
+
+
+def test_renewing_str_keeps_valid_value_if_renewal_fails(monkeypatch):
+    clock = FakeClock(monkeypatch)
+    renew = Renewer(lifetime=datetime.timedelta(minutes=60))
+    storage = RenewingStr(renew=renew, renew_before=datetime.timedelta(minutes=5))
+
+    renew.fail = True
+    clock.advance(56 * 60)
+    assert storage.get_str() == "token-1"
+    renew.fail = False
+    # Not retried immediately.
+    assert storage.get_str() == "token-1"
+    clock.advance(credentials._RENEW_RETRY_DELAY)
+    assert storage.get_str() == "token-2"
+
+
+def test_renewing_str_raises_if_renewal_fails_after_expiry(monkeypatch):
+    clock = FakeClock(monkeypatch)
+    renew = Renewer(lifetime=datetime.timedelta(minutes=60))
+    storage = RenewingStr(renew=renew)
+    renew.fail = True
+    clock.advance(61 * 60)
+    with pytest.raises(RuntimeError, match="login failed"):
+        storage.get_str()
+
+
+def test_renewing_str_renews_once_for_concurrent_callers(monkeypatch):
+    clock = FakeClock(monkeypatch)
+    calls: List[None] = []
+
+    def slow_renew():
+        calls.append(None)
+        time.sleep(0.01)
+        return f"token-{len(calls)}", datetime.timedelta(minutes=60)
+
+    storage = RenewingStr(renew=slow_renew)
+    clock.advance(59 * 60)
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(storage.get_str()))
+        for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == ["token-2"] * 8
+    assert len(calls) == 2
+
+
+def test_renewing_str_hides_value():
+    storage = RenewingStr(renew=Renewer())
+    assert "token" not in str(storage)
+    assert "token" not in repr(storage)
+    with pytest.raises(TypeError):
+        pickle.dumps(storage)
@@ -0,0 +1,89 @@
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright (c) 2023 SciCat Project (https://github.com/SciCatProject/scitacean)
+
+from typing import List
+
+import pytest
+
+from scitacean.util.instrumentation import (
+    CallStats,
+    Event,
+    RequestEvent,
+    TransferEvent,
+    _emit,
+    _record_transfer,
+)
+
+
+def request_event(operation="get_dataset_model", status_code=200, duration=0.1):
+    return RequestEvent(
+        operation=operation,
+        method="GET",
+        url="datasets/{pid}",
+        status_code=status_code,
+        bytes_sent=0,
+        bytes_received=10,
+        duration=duration,
+    )
+
+
+def test_call_stats_aggregates_per_operation():
+    stats = CallStats()
+    stats(request_event(status_code=200))
+    stats(request_event(status_code=404))
+    stats(request_event(operation="create_dataset_model", status_code=None))
+
+    summary = stats.summary()
+    assert list(summary) == ["create_dataset_model", "get_dataset_model"]
+    assert summary["get_dataset_model"].count == 2
+    assert summary["get_dataset_model"].failures == 1
+    assert summary["get_dataset_model"].bytes_received == 20
+    assert summary["create_dataset_model"].failures == 1
+
+
+def test_call_stats_percentiles():
+    stats = CallStats()
+    for i in range(1, 101):
+        stats(request_event(duration=i / 100))
+    summary = stats.summary()["get_dataset_model"]
+    assert summary.p50 == pytest.approx(0.5)
+    assert summary.p90 == pytest.approx(0.9)
+    assert summary.p99 == pytest.approx(0.99)
+    assert summary.total_duration == pytest.approx(50.5)
+
+
+def test_call_stats_percentiles_use_window():
+    stats = CallStats(window=2)
+    for duration in (10.0, 1.0, 2.0):
+        stats(request_event(duration=duration))
+    summary = stats.summary()["get_dataset_model"]
+    assert summary.count == 3
+    assert summary.p99 == 2.0
+
+
+def test_call_stats_reset():
+    stats = CallStats()
+    stats(request_event())
+    stats.reset()
+    assert stats.summary() == {}
+
+
+def test_emit_ignores_failing_hooks():
+    received: List[Event] = []
+
+    def failing_hook(event):
+        raise RuntimeError("hook failed")
+
+    _emit([failing_hook, received.append], request_event())
+    assert len(received) == 1
+
+
+def test_record_transfer_reports_failure():
+    received: List[Event] = []
+    with pytest.raises(ValueError):
+        with _record_transfer([received.append], "upload_files", n_files=2):
+            raise ValueError("transfer failed")
+    [event] = received
+    assert isinstance(event, TransferEvent)
+    assert event.n_files == 2
+    assert not event.succeeded
@@ -0,0 +1,127 @@
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright (c) 2023 SciCat Project (https://github.com/SciCatProject/scitacean)
+
+import json
+import math
+from datetime import datetime, timezone
+
+import pytest
+
+from scitacean import PID
+from scitacean.client import ScicatClient
+from scitacean.model import UploadDataFile, UploadOrigDatablock
+from scitacean.util.json_codec import (
+    JsonCodec,
+    MsgspecCodec,
+    OrjsonCodec,
+    default_json_codec,
+    fastest_json_codec,
+)
+
+from ..common.http import ScriptedSession
+
+
+def available_codecs():
+    codecs = [JsonCodec()]
+    for codec in (OrjsonCodec, MsgspecCodec):
+        try:
+            codecs.append(codec())
+        except ImportError:
+            pass
+    return codecs
+
+
+@pytest.fixture(params=available_codecs(), ids=lambda codec: codec.name)
+def codec(request):
+    return request.param
+
+
+def make_orig_datablock():
+    return UploadOrigDatablock(
+        datasetId=PID.parse("PID.prefix/abcd"),
+        size=1234,
+        chkAlg="md5",
+        ownerGroup="uu",
+        dataFileList=[
+            UploadDataFile(
+                path=f"sub/file{i}.nxs",
+                size=i,
+                time=datetime(2023, 9, 30, 12, i, tzinfo=timezone.utc),
+            )
+            for i in range(3)
+        ],
+    )
+
+
+def test_codec_round_trips_builtin_types(codec):
+    obj = {"a": [1, 2.5, None, True], "b": "ÄÖÜ ⛺", "c": {}}
+    assert codec.loads(codec.dumps(obj)) == obj
+
+
+def test_codec_loads_str_and_bytes(codec):
+    assert codec.loads('{"x": 1}') == {"x": 1}
+    assert codec.loads(b'{"x": 1}') == {"x": 1}
+
+
+def test_codec_dumps_uses_default(codec):
+    encoded = codec.dumps({"t": PID.parse("PID.prefix/abcd")}, default=str)
+    assert codec.loads(encoded) == {"t": "PID.prefix/abcd"}
+
+
+def test_codec_encode_model_matches_pydantic(codec):
+    model = make_orig_datablock()
+    expected = json.loads(model.model_dump_json(exclude_none=True))
+    assert json.loads(codec.encode_model(model)) == expected
+
+
+def test_codec_loads_nan_and_infinity(codec):
+    decoded = codec.loads(b'{"a": NaN, "b": [Infinity, -Infinity]}')
+    assert math.isnan(decoded["a"])
+    assert decoded["b"] == [math.inf, -math.inf]
+
+
+def test_default_json_codec_is_builtin_json():
+    assert type(default_json_codec()) is JsonCodec
+
+
+def test_default_json_codec_loads_large_ints_exactly():
+    large = 2**64 + 1
+    decoded = default_json_codec().loads(f'{{"a": {large}, "b": NaN}}')
+    assert decoded["a"] == large
+    assert math.isnan(decoded["b"])
+
+
+def test_fastest_json_codec_prefers_fast_codec():
+    try:
+        import orjson  # noqa: F401
+    except ImportError:
+        pytest.skip("orjson is not installed")
+    assert isinstance(fastest_json_codec(), OrjsonCodec)
+
+
+class CountingCodec(JsonCodec):
+    def __init__(self):
+        self.n_loads = 0
+        self.n_encoded = 0
+
+    def loads(self, data):
+        self.n_loads += 1
+        return super().loads(data)
+
+    def encode_model(self, model):
+        self.n_encoded += 1
+        return super().encode_model(model)
+
+
+def test_client_uses_given_codec():
+    codec = CountingCodec()
+    client = ScicatClient.from_token(
+        url="https://scicat/api/v3", token="abc", json_codec=codec  # noqa: S106
+    )
+    uploaded = json.loads(make_orig_datablock().model_dump_json())
+    client._session = ScriptedSession(
+        lambda *_: (200, {"_id": "dblock-1", **uploaded}, {})
+    )
+    client.create_orig_datablock(make_orig_datablock())
+    assert codec.n_encoded == 1
+    assert codec.n_loads == 1
@@ -0,0 +1,147 @@
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright (c) 2023 SciCat Project (https://github.com/SciCatProject/scitacean)
+
+import threading
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from scitacean import PID, model
+from scitacean.util.mirror import MetadataMirror
+
+
+def make_dataset(i, *, owner="ponder", proposal_id="p1", updated_at=None):
+    created = datetime(2023, 10, 1, tzinfo=timezone.utc) + timedelta(days=i)
+    return model.construct(
+        model.DownloadDataset,
+        _strict_validation=False,
+        pid=f"PID.prefix/{i:04d}",
+        type="raw",
+        owner=owner,
+        proposalId=proposal_id,
+        creationTime=created.isoformat(),
+        updatedAt=(updated_at or created).isoformat(),
+        sourceFolder=f"/data/{i}",
+        scientificMetadata={"temperature": {"value": i, "unit": "K"}},
+    )
+
+
+def make_orig_datablock(pid, n_files=2):
+    return model.construct(
+        model.DownloadOrigDatablock,
+        _strict_validation=False,
+        id=f"dblock-{pid}",
+        datasetId=pid,
+        size=n_files * 10,
+        dataFileList=[
+            {"path": f"file{i}.nxs", "size": 10, "time": "2023-10-01T12:00:00Z"}
+            for i in range(n_files)
+        ],
+    )
+
+
+@pytest.fixture()
+def mirror():
+    with MetadataMirror() as m:
+        yield m
+
+
+def test_get_dataset_model_returns_stored_dataset(mirror):
+    dset = make_dataset(1)
+    mirror._store_datasets([dset])
+    assert mirror.get_dataset_model(dset.pid) == dset
+    assert mirror.get_dataset_model(str(dset.pid)) == dset
+    assert dset.pid in mirror
+    assert len(mirror) == 1
+
+
+def test_get_dataset_model_returns_none_if_missing(mirror):
+    assert mirror.get_dataset_model(PID.parse("PID.prefix/missing")) is None
+    assert PID.parse("PID.prefix/missing") not in mirror
+
+
+def test_storing_dataset_replaces_old_version(mirror):
+    mirror._store_datasets([make_dataset(1)])
+    updated = make_dataset(1, owner="ridcully")
+    mirror._store_datasets([updated])
+    assert mirror.get_dataset_model(updated.pid).owner == "ridcully"
+    assert len(mirror) == 1
+
+
+def test_get_orig_datablocks(mirror):
+    pid = make_dataset(1).pid
+    assert mirror.get_orig_datablocks(pid) is None
+    dblock = make_orig_datablock(pid)
+    mirror._store_orig_datablocks({str(pid): [dblock]})
+    assert mirror.get_orig_datablocks(pid) == [dblock]
+
+
+def test_get_orig_datablocks_distinguishes_empty_from_missing(mirror):
+    pid = make_dataset(1).pid
+    mirror._store_orig_datablocks({str(pid): []})
+    assert mirror.get_orig_datablocks(pid) == []
+
+
+def test_find_dataset_models(mirror):
+    datasets = [
+        make_dataset(0, owner="ponder", proposal_id="p1"),
+        make_dataset(1, owner="ridcully", proposal_id="p1"),
+        make_dataset(2, owner="ponder", proposal_id="p2"),
+        make_dataset(3, owner="ponder", proposal_id="p1"),
+    ]
+    mirror._store_datasets(reversed(datasets))
+
+    def find(**kwargs):
+        return [dset.pid for dset in mirror.find_dataset_models(**kwargs)]
+
+    assert find() == [dset.pid for dset in datasets]
+    assert find(owner="ponder") == [datasets[i].pid for i in (0, 2, 3)]
+    assert find(owner="ponder", proposal_id="p1") == [datasets[i].pid for i in (0, 3)]
+    assert find(
+        created_after=datasets[1].creationTime,
+        created_before=datasets[3].creationTime,
+    ) == [datasets[i].pid for i in (1, 2)]
+    assert find(owner="ponder", limit=2) == [datasets[i].pid for i in (0, 2)]
+
+
+def test_find_dataset_models_compares_times_across_timezones(mirror):
+    dset = make_dataset(0)
+    mirror._store_datasets([dset])
+    tz = timezone(timedelta(hours=5))
+    after = dset.creationTime.astimezone(tz) - timedelta(seconds=1)
+    assert [d.pid for d in mirror.find_dataset_models(created_after=after)] == [
+        dset.pid
+    ]
+    assert not mirror.find_dataset_models(created_before=after)
+
+
+def test_persists_in_file(tmp_path):
+    path = tmp_path / "mirror.sqlite"
+    dset = make_dataset(1)
+    with MetadataMirror(path) as mirror:
+        mirror._store_datasets([dset])
+    with MetadataMirror(path, offline=True) as mirror:
+        assert mirror.get_dataset_model(dset.pid) == dset
+
+
+def test_clear(mirror):
+    dset = make_dataset(1)
+    mirror._store_datasets([dset])
+    mirror._store_orig_datablocks({str(dset.pid): []})
+    mirror._set_last_refresh("{}", "2023-10-01T00:00:00.000000Z")
+    mirror.clear()
+    assert len(mirror) == 0
+    assert mirror.get_orig_datablocks(dset.pid) is None
+    assert mirror._last_refresh("{}") is None
+
+
+def test_can_be_used_from_multiple_threads(mirror):
+    def store(i):
+        mirror._store_datasets([make_dataset(i)])
+
+    threads = [threading.Thread(target=store, args=(i,)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(mirror) == 8
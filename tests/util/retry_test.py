@@ -0,0 +1,93 @@
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright (c) 2023 SciCat Project (https://github.com/SciCatProject/scitacean)
+
+import datetime
+import email.utils
+
+import pytest
+
+from scitacean import ScicatCommError
+from scitacean.util.retry import CircuitBreaker, RetryPolicy, _parse_retry_after
+
+
+def test_retry_policy_delay_is_bounded():
+    policy = RetryPolicy(
+        initial_backoff=datetime.timedelta(seconds=2),
+        max_backoff=datetime.timedelta(seconds=5),
+    )
+    for attempt, bound in ((1, 2), (2, 4), (3, 5)):
+        delay = policy._delay(attempt=attempt, elapsed=0, retry_after=None)
+        assert delay is not None
+        assert 0 <= delay <= bound
+
+
+def test_retry_policy_gives_up_after_max_attempts():
+    policy = RetryPolicy(max_attempts=2)
+    assert policy._delay(attempt=1, elapsed=0, retry_after=None) is not None
+    assert policy._delay(attempt=2, elapsed=0, retry_after=None) is None
+
+
+def test_retry_policy_respects_max_elapsed():
+    policy = RetryPolicy(max_elapsed=datetime.timedelta(seconds=10))
+    assert policy._delay(attempt=1, elapsed=5, retry_after=4) == 4
+    assert policy._delay(attempt=1, elapsed=5, retry_after=6) is None
+
+
+def test_retry_policy_requires_an_attempt():
+    with pytest.raises(ValueError, match="max_attempts"):
+        RetryPolicy(max_attempts=0)
+
+
+def test_parse_retry_after_seconds():
+    assert _parse_retry_after("12") == 12.0
+    assert _parse_retry_after(None) is None
+    assert _parse_retry_after("not a date") is None
+
+
+def test_parse_retry_after_date():
+    date = datetime.datetime.now(tz=datetime.timezone.utc) + datetime.timedelta(
+        seconds=30
+    )
+    delay = _parse_retry_after(email.utils.format_datetime(date, usegmt=True))
+    assert delay is not None
+    assert 25 <= delay <= 30
+
+
+def test_circuit_breaker_opens_after_threshold():
+    breaker = CircuitBreaker(failure_threshold=3)
+    for _ in range(2):
+        breaker._record(failed=True)
+    states = [breaker.is_open]
+    breaker._record(failed=True)
+    states.append(breaker.is_open)
+    assert states == [False, True]
+    with pytest.raises(ScicatCommError):
+        breaker._before_request("op")
+
+
+def test_circuit_breaker_success_resets_failures():
+    breaker = CircuitBreaker(failure_threshold=2)
+    breaker._record(failed=True)
+    breaker._record(failed=False)
+    breaker._record(failed=True)
+    assert not breaker.is_open
+
+
+def test_circuit_breaker_allows_single_trial():
+    breaker = CircuitBreaker(
+        failure_threshold=1, reset_timeout=datetime.timedelta(seconds=0)
+    )
+    breaker._record(failed=True)
+    breaker._before_request("op")
+    with pytest.raises(ScicatCommError):
+        breaker._before_request("op")
+    breaker._record(failed=True)
+    assert breaker.is_open
+
+
+def test_circuit_breaker_reset():
+    breaker = CircuitBreaker(failure_threshold=1)
+    breaker._record(failed=True)
+    breaker.reset()
+    assert not breaker.is_open
+    breaker._before_request("op")
@@ -0,0 +1,167 @@
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright (c) 2023 SciCat Project (https://github.com/SciCatProject/scitacean)
+
+import datetime
+import os
+import threading
+
+import pytest
+
+from scitacean.util.token_cache import TokenCache
+
+URL = "https://scicat/api/v3"
+
+
+@pytest.fixture()
+def clock(monkeypatch):
+    class Clock:
+        now = 1000.0
+
+    monkeypatch.setattr("scitacean.util.token_cache.time.time", lambda: Clock.now)
+    return Clock
+
+
+@pytest.fixture()
+def cache(tmp_path):
+    return TokenCache(tmp_path / "tokens.json")
+
+
+def test_get_returns_none_if_empty(cache):
+    assert cache.get(url=URL, username="user") is None
+
+
+def test_get_returns_stored_token(cache, clock):
+    cache.store(
+        url=URL,
+        username="user",
+        login_endpoint="auth/msad",
+        token="the-token",  # noqa: S106
+        lifetime=datetime.timedelta(hours=1),
+    )
+    cached = cache.get(url=URL, username="user")
+    assert cached.token == "the-token"  # noqa: S105
+    assert cached.login_endpoint == "auth/msad"
+    assert cached.lifetime == datetime.timedelta(hours=1)
+
+
+def test_entries_are_shared_between_instances(cache, clock):
+    cache.store(
+        url=URL,
+        username="user",
+        login_endpoint="Users/login",
+        token="the-token",  # noqa: S106
+        lifetime=datetime.timedelta(hours=1),
+    )
+    cached = TokenCache(cache.path).get(url=URL, username="user")
+    assert cached is not None
+    assert cached.token == "the-token"  # noqa: S105
+
+
+def test_entries_are_keyed_by_url_and_username(cache, clock):
+    cache.store(
+        url=URL,
+        username="user",
+        login_endpoint="Users/login",
+        token="the-token",  # noqa: S106
+        lifetime=datetime.timedelta(hours=1),
+    )
+    assert cache.get(url=URL, username="other") is None
+    assert cache.get(url="https://other/api/v3", username="user") is None
+    assert cache.get(url=URL + "/", username="user") is not None
+
+
+def test_token_expires_before_min_remaining(tmp_path, clock):
+    cache = TokenCache(
+        tmp_path / "tokens.json", min_remaining=datetime.timedelta(minutes=5)
+    )
+    cache.store(
+        url=URL,
+        username="user",
+        login_endpoint="Users/login",
+        token="the-token",  # noqa: S106
+        lifetime=datetime.timedelta(minutes=10),
+    )
+    clock.now += 4 * 60
+    cached = cache.get(url=URL, username="user")
+    assert cached is not None
+    assert cached.token == "the-token"  # noqa: S105
+    clock.now += 2 * 60
+    cached = cache.get(url=URL, username="user")
+    assert cached is not None
+    assert cached.token is None
+    assert cached.lifetime is None
+    assert cached.login_endpoint == "Users/login"
+
+
+def test_token_without_lifetime_is_not_stored(cache):
+    cache.store(
+        url=URL,
+        username="user",
+        login_endpoint="auth/msad",
+        token="the-token",  # noqa: S106
+        lifetime=None,
+    )
+    cached = cache.get(url=URL, username="user")
+    assert cached.token is None
+    assert cached.login_endpoint == "auth/msad"
+    assert "the-token" not in cache.path.read_text()
+
+
+def test_remove_and_clear(cache):
+    for username in ("user1", "user2"):
+        cache.store(
+            url=URL,
+            username=username,
+            login_endpoint="auth/msad",
+            token="the-token",  # noqa: S106
+            lifetime=datetime.timedelta(hours=1),
+        )
+    cache.remove(url=URL, username="user1")
+    assert cache.get(url=URL, username="user1") is None
+    assert cache.get(url=URL, username="user2") is not None
+    cache.clear()
+    assert cache.get(url=URL, username="user2") is None
+
+
+def test_corrupt_file_is_ignored(cache):
+    cache.path.write_text("{not json")
+    assert cache.get(url=URL, username="user") is None
+
+
+@pytest.mark.skipif(os.name == "nt", reason="POSIX permissions")
+def test_file_is_private(cache):
+    cache.store(
+        url=URL,
+        username="user",
+        login_endpoint="auth/msad",
+        token="the-token",  # noqa: S106
+        lifetime=datetime.timedelta(hours=1),
+    )
+    assert cache.path.stat().st_mode & 0o777 == 0o600
+
+
+def test_lock_excludes_other_instances(cache):
+    other = TokenCache(cache.path)
+    acquired = threading.Event()
+
+    def lock_other():
+        with other.lock():
+            acquired.set()
+
+    with cache.lock():
+        thread = threading.Thread(target=lock_other)
+        thread.start()
+        assert not acquired.wait(0.1)
+    thread.join()
+    assert acquired.is_set()
+
+
+def test_repr_does_not_contain_tokens(cache):
+    cache.store(
+        url=URL,
+        username="user",
+        login_endpoint="auth/msad",
+        token="the-token",  # noqa: S106
+        lifetime=datetime.timedelta(hours=1),
+    )
+    assert "the-token" not in repr(cache)
@@ -0,0 +1,84 @@
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright (c) 2023 SciCat Project (https://github.com/SciCatProject/scitacean)
+
+"""Compare the speed of the JSON codecs in scitacean.util.json_codec.
+
+Encodes and decodes an orig datablock with many files.
+The model is converted to builtin types before encoding
+so that only the codecs themselves are timed.
+"""
+import argparse
+import timeit
+from datetime import datetime, timezone
+
+from scitacean import PID
+from scitacean.model import UploadDataFile, UploadOrigDatablock
+from scitacean.util.json_codec import JsonCodec, MsgspecCodec, OrjsonCodec
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="benchmark_json_codec.py", description="Benchmark JSON codecs"
+    )
+    parser.add_argument(
+        "--n-files", type=int, default=100_000, help="Number of files in the datablock"
+    )
+    parser.add_argument(
+        "--repeat", type=int, default=5, help="Number of repetitions per measurement"
+    )
+    return parser.parse_args()
+
+
+def _make_datablock(n_files: int) -> UploadOrigDatablock:
+    time = datetime(2023, 9, 30, 12, tzinfo=timezone.utc)
+    return UploadOrigDatablock(
+        datasetId=PID.parse("PID.prefix/abcd"),
+        size=n_files * 1024,
+        chkAlg="blake2b",
+        ownerGroup="uu",
+        accessGroups=["faculty", "wizards"],
+        dataFileList=[
+            UploadDataFile(
+                path=f"run{i // 1000}/file{i}.nxs",
+                size=1024,
+                time=time,
+                chk="0123456789abcdef" * 8,
+            )
+            for i in range(n_files)
+        ],
+    )
+
+
+def _available_codecs() -> list:
+    codecs = [JsonCodec()]
+    for codec in (OrjsonCodec, MsgspecCodec):
+        try:
+            codecs.append(codec())
+        except ImportError:
+            print(f"Skipping {codec.name}: not installed")  # noqa: T201
+    return codecs
+
+
+def main() -> None:
+    args = _parse_args()
+    datablock = _make_datablock(args.n_files)
+    data = datablock.model_dump(mode="json", exclude_none=True)
+    encoded = JsonCodec().dumps(data)
+    print(  # noqa: T201
+        f"Datablock with {args.n_files} files, {len(encoded) / 1e6:.1f} MB of JSON"
+    )
+    print(f"{'codec':<10}{'encode [s]':>12}{'decode [s]':>12}")  # noqa: T201
+    for codec in _available_codecs():
+        encode = min(
+            timeit.repeat(lambda c=codec: c.dumps(data), number=1, repeat=args.repeat)
+        )
+        decode = min(
+            timeit.repeat(
+                lambda c=codec: c.loads(encoded), number=1, repeat=args.repeat
+            )
+        )
+        print(f"{codec.name:<10}{encode:>12.3f}{decode:>12.3f}")  # noqa: T201
+
+
+if __name__ == "__main__":
+    main()